@@ -8,15 +8,39 @@ import fitz  # PyMuPDF
 import re
 from PIL import Image as PILImage
 from .ocr_engine import OCREngine
-from .parser import parse_gcv_annotations, parse_gcv_blocks, extract_voter_from_block, extract_header_info, extract_page_header
-from .corrections import apply_marathi_corrections, transliterate_marathi
-from .gemini_transliterate import batch_transliterate_gemini
+from .concurrency import OCRDispatcher
+from .renderer import render_page
+from .encoding import selected_profile_for, DEFAULT_ENCODING_PROFILE
+from .retry import OCRError
+from .parser import parse_gcv_annotations, parse_gcv_blocks, extract_voter_from_block, extract_header_info, extract_page_header, to_relative_template
+from .corrections import apply_marathi_corrections, transliterate_marathi_many, set_learned_corrections
+from .correction_store import CorrectionStore
+from .gemini_transliterate import TransliterationBatcher, transliteration_stats
 from .excel_export import export_to_excel
+from .flat_export import IncrementalExportSink, WorkbookExportSink, WORKBOOK_FORMAT, available_batch_formats
+from .consolidated_export import export_consolidated, group_by_source, use_consolidated_layout, EXCEL_MAX_DATA_ROWS
+from .export_jobs import ExportJob
+from .progress_events import ProgressEvents
+from .session_import import import_export_file
 import json
+import threading
+from collections import deque
 
 # Load template
 def load_template(template_name='boothlist_division'):
-    """Load OCR template from config"""
+    """
+    Load OCR template from config.
+    
+    Margins below are the calibrated pixel values for A4 @ 300 DPI; the
+    returned template is converted to page-relative units so it applies to
+    any render DPI, clip region or embedded scan resolution.
+    'render_profile' selects a renderer.RENDER_PROFILES entry and
+    'encoding_profile' an encoding.ENCODING_PROFILES entry.
+    'photo_excl_width' (300 DPI px, 0 = off) whites out the photo at the
+    right edge of each voter cell before upload; 'photo_excl_top' and
+    'photo_excl_bottom' are the fractions of the cell height kept intact
+    above/below it (measure with measure_photo_mask.py before enabling).
+    """
     # Base template from OCR_Samruddhi template_300dpi.json (A4 @ 300 DPI)
     # Page size: 2480 x 3509
     boothlist_base = {
@@ -42,6 +66,7 @@ def load_template(template_name='boothlist_division'):
         'cols': 3,
         'photo_excl_width': 0,
         'name': 'AC Wise Low Quality',
+        'render_profile': 'standard',  # Faint scans: keep full colour
         'skip_first_pages': 0,
         'skip_last_pages': 0,
         'min_word_annotations': 15,  # Reduced from 20 to accept more pages
@@ -133,7 +158,13 @@ def load_template(template_name='boothlist_division'):
         'name': 'Mahanagarpalika'
     }
     
-    return templates.get(template_name, boothlist_base)
+    template = to_relative_template(templates.get(template_name, boothlist_base))
+    
+    # Upload encoding chosen by benchmark_encoding.py, unless set explicitly
+    if not template.get('encoding_profile'):
+        template['encoding_profile'] = selected_profile_for(template_name) or DEFAULT_ENCODING_PROFILE
+    
+    return template
 
 class API:
     """PyWebView API - Exposed to JavaScript frontend"""
@@ -142,11 +173,21 @@ class API:
         """Initialize API with OCR engine"""
         print("🔧 Initializing API...")
         self.ocr_engine = OCREngine()
+        self.ocr_dispatcher = OCRDispatcher(self.ocr_engine, self.ocr_engine.concurrency)
         self.current_data = []
+        # Stable id of every record, so the review table can sync single edits
+        self._next_record_id = 0
+        # Latest background export (see start_export); bridge calls run on
+        # their own threads, so starting one is serialized
+        self.export_job = None
+        self._export_lock = threading.Lock()
+        # Word-level OCR fixes mined from review-table edits
+        self.correction_store = CorrectionStore()
+        set_learned_corrections(self.correction_store.promoted())
         self.template = load_template()
         self.current_template_key = 'boothlist_division'
-        # Progress tracking for frontend
-        self.progress_messages = []
+        # Progress tracking for frontend: pushed to the window as events
+        self.progress_events = ProgressEvents(self._progress_sections, self._run_js, active=self._is_busy)
         self.processing_status = {
             'is_processing': False,
             'current_page': 0,
@@ -158,27 +199,45 @@ class API:
     
     def add_progress(self, message, page=None, total=None, voters=None):
         """Add a progress message for frontend"""
-        self.progress_messages.append(message)
         if page is not None:
             self.processing_status['current_page'] = page
         if total is not None:
             self.processing_status['total_pages'] = total
         if voters is not None:
             self.processing_status['voters_found'] = voters
-        # Keep only last 50 messages
-        if len(self.progress_messages) > 50:
-            self.progress_messages = self.progress_messages[-50:]
+        self.progress_events.add(message)
     
-    def get_progress(self):
-        """Get current progress for frontend polling"""
+    def _progress_sections(self):
         return {
-            'messages': self.progress_messages[-20:],  # Last 20 messages
-            'status': self.processing_status
+            'status': dict(self.processing_status),
+            'concurrency': self.ocr_engine.concurrency.snapshot(),
+            'circuit': self.ocr_engine.circuit_breaker.snapshot(),
+            'transliteration': transliteration_stats(),
+            'export': self.export_job.snapshot() if self.export_job else None
+        }
+    
+    def _is_busy(self):
+        return self.processing_status['is_processing'] or bool(
+            self.export_job and self.export_job.status in ('queued', 'running'))
+    
+    def _run_js(self, script):
+        if webview.windows:
+            webview.windows[0].evaluate_js(script)
+    
+    def get_progress(self, since=None):
+        """
+        Current progress. The UI gets it pushed (window.onProgressEvent);
+        this is for its first read and for resyncing after a missed event -
+        with since, the messages after that sequence number.
+        """
+        return {
+            'seq': self.progress_events.seq,
+            'messages': self.progress_events.messages(since),
+            **self._progress_sections()
         }
     
     def clear_progress(self):
         """Clear progress messages"""
-        self.progress_messages = []
         self.processing_status = {
             'is_processing': False,
             'current_page': 0,
@@ -186,6 +245,7 @@ class API:
             'current_file': '',
             'voters_found': 0
         }
+        self.progress_events.clear()
 
     def set_template(self, template_key):
         """Set OCR template from frontend dropdown"""
@@ -223,10 +283,68 @@ class API:
             print(f"❌ Error selecting folder: {e}")
             return None
 
-    def process_batch(self, folder_path):
-        """Process all PDFs in a folder - creates individual Excel files for each PDF"""
+    def select_import_file(self):
+        """Open file dialog to select a previous export (.xlsx / .jsonl)"""
+        try:
+            result = webview.windows[0].create_file_dialog(
+                webview.OPEN_DIALOG,
+                allow_multiple=False,
+                file_types=('Voter exports (*.xlsx;*.jsonl)', 'All files (*.*)')
+            )
+            return result[0] if result else None
+        except Exception as e:
+            print(f"❌ Error selecting file: {e}")
+            return None
+
+    def import_session(self, path, preferred_templates=None):
+        """
+        Reopen a previous export (Excel workbook or JSONL) for review and
+        re-export - no OCR. preferred_templates (e.g. the template dropdown's
+        values, current one first) picks among templates with identical
+        columns.
+        
+        Returns:
+            dict: {'success', 'total_voters', 'voters', 'template'} or an error
+        """
         try:
-            print(f"📂 Batch processing folder: {folder_path}")
+            print(f"📂 Importing {os.path.basename(path)}...")
+            voters, template_key = import_export_file(path, preferred_templates or self.current_template_key)
+            for voter in voters:
+                voter['record_id'] = self._new_record_id()
+            self.current_data = voters
+            self.current_template_key = template_key
+            print(f"✅ Imported {len(voters)} voters (template: {template_key})")
+            return {
+                'success': True,
+                'total_voters': len(voters),
+                'voters': voters,
+                'template': template_key
+            }
+        except Exception as e:
+            print(f"❌ Import error: {e}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    def get_output_formats(self):
+        """Batch output formats usable here (Parquet only with pyarrow installed)"""
+        return available_batch_formats()
+
+    def process_batch(self, folder_path, output_format='xlsx'):
+        """
+        Process all PDFs in a folder - creates one output file per PDF.
+        output_format: 'xlsx' (default), 'csv', 'jsonl' or 'parquet', or
+        'workbook' for a single <folder>_voters.xlsx with one sheet per PDF
+        and a Totals sheet. In workbook mode voters are not kept for the
+        session (only counts are returned); reopen the workbook with
+        import_session to review it.
+        """
+        try:
+            output_format = (output_format or 'xlsx').lower()
+            if output_format not in available_batch_formats():
+                return {'success': False, 'error': f'Output format not available: {output_format}'}
+            print(f"📂 Batch processing folder: {folder_path} (output: {output_format})")
             pdf_files = [f for f in os.listdir(folder_path) if f.lower().endswith('.pdf')]
             
             total_files = len(pdf_files)
@@ -236,40 +354,70 @@ class API:
                 return {'success': False, 'error': 'No PDF files found in folder'}
             
             all_voters = []
+            total_voters = 0
             processed_files = []
             failed_files = []
             
+            workbook = None
+            if output_format == WORKBOOK_FORMAT:
+                folder_name = os.path.basename(os.path.normpath(folder_path)) or 'batch'
+                workbook_path = os.path.join(folder_path, f"{folder_name}_voters.xlsx")
+                workbook = WorkbookExportSink(workbook_path, template=self.current_template_key)
+            
             for i, filename in enumerate(pdf_files, 1):
                 pdf_path = os.path.join(folder_path, filename)
                 print(f"[{i}/{total_files}] Processing {filename}...")
                 
+                try:
+                    if workbook:
+                        # This PDF's sheet in the batch workbook, written when the PDF completes
+                        sink = workbook.sheet_sink(filename)
+                        output_filename = f"{os.path.basename(workbook.output_path)} [{sink.title}]"
+                    else:
+                        # Individual output file for this PDF, written page by page
+                        output_filename = os.path.splitext(filename)[0] + '.' + output_format
+                        sink = IncrementalExportSink(os.path.join(folder_path, output_filename),
+                                                     template=self.current_template_key,
+                                                     output_format=output_format)
+                except Exception as export_err:
+                    print(f"   ❌ Export failed for {filename}: {export_err}")
+                    failed_files.append({'file': filename, 'error': str(export_err)})
+                    continue
+                
                 # Reuse process_pdf logic but internal call
-                result = self._process_single_pdf(pdf_path)
+                result = self._process_single_pdf(pdf_path, sink=sink)
                 
                 if result['success'] and result['voters']:
                     voters = result['voters']
-                    all_voters.extend(voters)
-                    
-                    # Create individual Excel file for this PDF
-                    excel_filename = os.path.splitext(filename)[0] + '.xlsx'
-                    excel_path = os.path.join(folder_path, excel_filename)
+                    total_voters += len(voters)
+                    if not workbook:
+                        all_voters.extend(voters)
                     
                     try:
-                        export_to_excel(voters, excel_path, template=self.current_template_key)
-                        print(f"   ✅ Exported {len(voters)} voters to {excel_filename}")
+                        sink.close()
+                        print(f"   ✅ Exported {len(voters)} voters to {output_filename}")
                         processed_files.append({
                             'pdf': filename,
-                            'excel': excel_filename,
+                            'output': output_filename,
                             'voters': len(voters)
                         })
                     except Exception as export_err:
                         print(f"   ❌ Export failed for {filename}: {export_err}")
                         failed_files.append({'file': filename, 'error': str(export_err)})
                 else:
+                    # Keep pages written before a failure; an empty export is dropped
+                    sink.abort(keep_partial=sink.count > 0)
                     error_msg = result.get('error', 'No voters found')
                     print(f"   ⚠️ Skipped {filename}: {error_msg}")
                     failed_files.append({'file': filename, 'error': error_msg})
             
+            # No sheet written: nothing is saved, so there's no workbook to point at
+            output_path = None
+            if workbook and workbook.totals:
+                workbook.close()
+                output_path = workbook.output_path
+            
+            # Workbook mode: every voter is on disk; don't hold the whole folder in memory
             self.current_data = all_voters
             
             # Summary
@@ -278,17 +426,25 @@ class API:
             print(f"   Total PDFs: {total_files}")
             print(f"   Successful: {len(processed_files)}")
             print(f"   Failed: {len(failed_files)}")
-            print(f"   Total voters: {len(all_voters)}")
+            print(f"   Total voters: {total_voters}")
             print(f"{'='*50}")
             
+            if not processed_files:
+                first_error = failed_files[0]['error'] if failed_files else 'No voters found'
+                return {
+                    'success': False,
+                    'error': f'No voters exported from {total_files} PDF file(s) ({first_error})'
+                }
+            
             return {
                 'success': True,
-                'total_voters': len(all_voters),
+                'total_voters': total_voters,
                 'total_files': total_files,
                 'processed_files': len(processed_files),
                 'failed_files': len(failed_files),
                 'files_detail': processed_files,
-                'voters': all_voters
+                'voters': all_voters,
+                'output_path': output_path
             }
         except Exception as e:
             print(f"❌ Batch error: {e}")
@@ -296,12 +452,45 @@ class API:
             traceback.print_exc()
             return {'success': False, 'error': str(e)}
 
+    def _iter_page_ocr(self, pdf_document, page_numbers):
+        """
+        Render pages and queue their OCR ahead of the caller.
+
+        Keeps up to `ocr_dispatcher.window_size()` pages in flight and yields
+        (page_num, ocr_future, page_image) in page order, where page_image is
+        the dict returned by render_page.
+        """
+        pages = iter(page_numbers)
+        pending = deque()
+        try:
+            while True:
+                while len(pending) < self.ocr_dispatcher.window_size():
+                    page_num = next(pages, None)
+                    if page_num is None:
+                        break
+                    page_image = render_page(pdf_document, page_num, self.template)
+                    ocr_job = self.ocr_dispatcher.submit(page_image['content'])
+                    pending.append((page_num, ocr_job, page_image))
+                
+                if not pending:
+                    break
+                yield pending.popleft()
+        finally:
+            # Abandoned early (error/stop): drop OCR that hasn't started yet
+            for _, ocr_job, _ in pending:
+                ocr_job.cancel()
+
     def process_pdf(self, pdf_path, start_page=None, end_page=None):
         """Public wrapper for single PDF processing with optional page range"""
         return self._process_single_pdf(pdf_path, start_page=start_page, end_page=end_page)
 
-    def _process_single_pdf(self, pdf_path, start_page=None, end_page=None):
-        """Internal PDF processing logic with Header Extraction"""
+    def _process_single_pdf(self, pdf_path, start_page=None, end_page=None, sink=None):
+        """
+        Internal PDF processing logic with Header Extraction.
+        sink: optional IncrementalExportSink; accepted pages are written to it
+        as soon as their names are transliterated (the caller closes it)
+        """
+        translit_batcher = None
         try:
             filename = os.path.basename(pdf_path)
             print(f"📄 Processing PDF: {pdf_path}")
@@ -312,49 +501,46 @@ class API:
             pdf_document = fitz.open(pdf_path)
             page_count = pdf_document.page_count
             print(f"✅ PDF has {page_count} pages")
-            self.add_progress(f"✅ PDF has {page_count} pages", total=page_count)
             self.processing_status['is_processing'] = True
             self.processing_status['current_file'] = filename
+            self.add_progress(f"✅ PDF has {page_count} pages", total=page_count)
             
             all_voters = []
-            temp_dir = 'temp'
-            os.makedirs(temp_dir, exist_ok=True)
+            accepted_pages = []
+            failed_pages = []
             
             # Global extraction order counter - ensures deterministic ordering
             extraction_order = 0
             
+            # Name + relation words of every page, deduplicated and sent in budgeted batches
+            translit_batcher = TransliterationBatcher()
+            
             # Process each page
             min_words = self.template.get('min_word_annotations', 0)
 
             # Determine page range
             sp = max(0, (start_page - 1)) if isinstance(start_page, int) and start_page >= 1 else 0
             ep = min(page_count, end_page) if isinstance(end_page, int) and end_page and end_page >= 1 else page_count
-            for page_num in range(sp, ep):
-                print(f"📃 Processing page {page_num + 1}/{page_count}...")
+            # OCR for upcoming pages runs on the dispatcher while this loop parses
+            page_jobs = self._iter_page_ocr(pdf_document, range(sp, ep))
+            for page_num, ocr_job, page_image in page_jobs:
+                print(f"📃 Processing page {page_num + 1}/{page_count}... ({page_image['profile']} image, {len(page_image['content']) // 1024} KB)")
                 self.add_progress(f"📃 Processing page {page_num + 1}/{page_count}...", page=page_num + 1)
                 
-                # Get page
-                page = pdf_document[page_num]
-                
-                # Render page to image at 300 DPI
-                zoom = 300 / 72
-                mat = fitz.Matrix(zoom, zoom)
-                pix = page.get_pixmap(matrix=mat)
-                
-                # Save image temporarily
-                temp_image_path = os.path.join(temp_dir, f'page_{page_num + 1}.jpg')
-                pix.save(temp_image_path, output="jpeg", jpg_quality=95)
-                
-                # Get image dimensions
-                image_W, image_H = pix.width, pix.height
+                # Image size and template margins at the resolution actually OCR'd
+                image_W, image_H = page_image['width'], page_image['height']
+                page_template = page_image['template']
                 
                 try:
-                    # Run OCR
-                    full_text, word_annotations = self.ocr_engine.run_ocr(temp_image_path)
+                    # Wait for OCR (pacing is handled by the adaptive concurrency limit)
+                    full_text, word_annotations = ocr_job.result()
                     
-                    # Small delay to prevent rate limiting on large PDFs
-                    import time
-                    time.sleep(0.3)  # 300ms delay between pages
+                    if isinstance(full_text, OCRError):
+                        msg = f"❌ OCR failed on page {page_num + 1}: {full_text.kind} (attempts: {full_text.attempts})"
+                        print(msg)
+                        self.add_progress(msg)
+                        failed_pages.append({'page': page_num + 1, **full_text.to_dict()})
+                        continue
                     
                     if not word_annotations or len(word_annotations) < min_words:
                         msg = f"⏭️ Skipping page {page_num + 1} - low/empty text"
@@ -367,7 +553,7 @@ class API:
                         word_annotations,
                         image_W,
                         image_H,
-                        self.template
+                        page_template
                     )
                     
                     # Extract page-level header (administrative context for all voters on this page)
@@ -375,7 +561,7 @@ class API:
                         word_annotations,
                         image_W,
                         image_H,
-                        self.template
+                        page_template
                     )
                     
                     header_info = {}
@@ -486,38 +672,50 @@ class API:
                         print(f"⏭️ Skipping page {page_num + 1} - first-page minimum valid blocks not met (valid={len(valid_voters_on_page)} < min={min_valid_blocks_for_page})")
                         continue
 
-                    # Batch transliterate all names on this page using Gemini (FAST)
-                    if valid_voters_on_page:
-                        all_names = [v.get('name_marathi', '') for v in valid_voters_on_page]
-                        all_relations = [v.get('relation_name_marathi', '') for v in valid_voters_on_page]
-                        
-                        # Batch translate - one API call for all names on page
-                        try:
-                            translated_names = batch_transliterate_gemini(all_names)
-                            translated_relations = batch_transliterate_gemini(all_relations)
-                            
-                            for i, voter in enumerate(valid_voters_on_page):
-                                voter['name_english'] = translated_names[i] if i < len(translated_names) else ''
-                                voter['relation_name_english'] = translated_relations[i] if i < len(translated_relations) else ''
-                        except Exception as e:
-                            print(f"⚠️ Batch translation failed: {e}, using fallback")
-                            for voter in valid_voters_on_page:
-                                voter['name_english'] = transliterate_marathi(voter.get('name_marathi', ''))
-                                voter['relation_name_english'] = transliterate_marathi(voter.get('relation_name_marathi', ''))
+                    for voter in valid_voters_on_page:
+                        voter['source_file'] = filename
+                        voter['record_id'] = self._new_record_id()
                     
+                    # Queue names for cross-page transliteration (Gemini runs in the background)
+                    translit_batcher.add(valid_voters_on_page)
+                    if sink:
+                        # Export the pages whose names are complete, in page order
+                        for ready_page in translit_batcher.ready_pages():
+                            sink.write_page(ready_page)
+                    
+                    accepted_pages.append(valid_voters_on_page)
                     all_voters.extend(valid_voters_on_page)
                     msg = f"✅ Page {page_num + 1}: {len(valid_voters_on_page)} voters found"
                     print(msg)
                     self.add_progress(msg, voters=len(all_voters))
                     
                 finally:
-                    # Clean up temp image
-                    if os.path.exists(temp_image_path):
-                        os.remove(temp_image_path)
+                    # Release the page image bytes as soon as the page is parsed
+                    page_image.pop('content', None)
             
             # Close PDF
             pdf_document.close()
             
+            # Wait for the remaining transliteration batches
+            self.add_progress("🔤 Transliterating names...")
+            try:
+                translit_batcher.finish()
+                print(f"   🔤 Gemini busy {translit_batcher.busy_seconds:.1f}s during processing, "
+                      f"waited {translit_batcher.wait_seconds:.1f}s after the last page")
+            except Exception as e:
+                print(f"⚠️ Batch translation failed: {e}, using fallback")
+                # Pages already in the sink keep their names, so file and session agree
+                pending = [v for page in accepted_pages[sink.pages:] for v in page] if sink else all_voters
+                names = transliterate_marathi_many([v.get('name_marathi', '') for v in pending])
+                relations = transliterate_marathi_many([v.get('relation_name_marathi', '') for v in pending])
+                for voter, name, relation in zip(pending, names, relations):
+                    voter['name_english'] = name
+                    voter['relation_name_english'] = relation
+            
+            if sink:
+                for page_voters in accepted_pages[sink.pages:]:
+                    sink.write_page(page_voters)
+            
             # Store current data
             self.current_data = all_voters
             
@@ -526,13 +724,23 @@ class API:
                 print("⚠️ Warning: No voters extracted from PDF")
             
             print(f"🎉 Processing complete! Total voters: {len(all_voters)}")
-            self.add_progress(f"🎉 Complete! Total: {len(all_voters)} voters", voters=len(all_voters))
+            tstats = translit_batcher.stats()
+            print(f"   🔤 Transliteration: {tstats['names']} names → {tstats['unique_tokens']} distinct words, "
+                  f"{tstats['local_tokens']} from the local dictionary ({tstats['local_names']} names fully local), "
+                  f"{tstats['tokens_sent']} sent in {tstats['gemini_calls']} call(s); cache hit rate "
+                  f"{tstats['cache']['hit_rate'] * 100:.0f}% ({tstats['cache']['size']} entries)")
+            if failed_pages:
+                msg = f"⚠️ OCR failed on {len(failed_pages)} page(s): {', '.join(str(f['page']) for f in failed_pages)}"
+                print(msg)
+                self.add_progress(msg)
             self.processing_status['is_processing'] = False
+            self.add_progress(f"🎉 Complete! Total: {len(all_voters)} voters", voters=len(all_voters))
             
             return {
                 'success': True,
                 'total_voters': len(all_voters),
                 'total_pages': page_count,
+                'failed_pages': failed_pages,
                 'voters': all_voters
             }
             
@@ -544,6 +752,9 @@ class API:
                 'success': False,
                 'error': str(e)
             }
+        finally:
+            if translit_batcher:
+                translit_batcher.close()
     
     def export_to_excel(self, output_path):
         """
@@ -562,6 +773,10 @@ class API:
                     'error': 'No data to export'
                 }
             
+            if use_consolidated_layout(len(self.current_data)):
+                # Too many rows for one sheet
+                return self.export_consolidated(output_path)
+            
             print(f"📊 Exporting {len(self.current_data)} voters to Excel (template: {self.current_template_key})...")
             export_to_excel(self.current_data, output_path, template=self.current_template_key)
             print(f"✅ Excel exported: {output_path}")
@@ -579,6 +794,95 @@ class API:
                 'error': str(e)
             }
     
+    def export_consolidated(self, output_path, max_rows=None, sheets_per_file=None):
+        """
+        Export current data (usually several PDFs from process_batch) as one
+        consolidated workbook: an Index sheet mapping each PDF to its sheet
+        and rows, and data sheets rolling over every max_rows rows (new
+        file every sheets_per_file sheets, if given)
+        
+        Returns:
+            dict: Export result
+        """
+        try:
+            if not self.current_data:
+                return {
+                    'success': False,
+                    'error': 'No data to export'
+                }
+            
+            result = export_consolidated(
+                group_by_source(self.current_data), output_path, template=self.current_template_key,
+                max_rows=max_rows or EXCEL_MAX_DATA_ROWS, sheets_per_file=sheets_per_file
+            )
+            return {
+                'success': True,
+                'path': result['files'][0],
+                'files': result['files'],
+                'sheets': result['sheets'],
+                'count': result['records']
+            }
+            
+        except Exception as e:
+            print(f"❌ Consolidated export error: {e}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def start_export(self, output_path, consolidated=False):
+        """
+        Export the backend's current data to Excel in the background.
+        Like export_to_excel(), the result is a single sheet unless the rows
+        don't fit one or `consolidated` asks for the consolidated workbook
+        (Index sheet mapping each PDF to its rows). The job's status and
+        percentage are in the 'export' progress section; cancel_export()
+        stops it.
+        
+        Returns:
+            dict: {'success': True, 'job_id': str} or an error
+        """
+        with self._export_lock:
+            if not self.current_data:
+                return {'success': False, 'error': 'No data to export'}
+            if self.export_job and self.export_job.status in ('queued', 'running'):
+                return {'success': False, 'error': 'An export is already running'}
+            return self._start_export_job(output_path, consolidated)
+    
+    def _start_export_job(self, output_path, consolidated=False):
+        """Create and start the export job (caller holds _export_lock)"""
+        # Snapshot: later edits replace list items, they never change this export
+        voters = list(self.current_data)
+        template = self.current_template_key
+        filename = os.path.basename(output_path)
+        
+        def run(job):
+            try:
+                if use_consolidated_layout(len(voters), consolidated):
+                    result = export_consolidated(group_by_source(voters), output_path, template=template,
+                                                 progress=job.progress)
+                else:
+                    export_to_excel(voters, output_path, template=template, progress=job.progress)
+                    result = {'files': [output_path], 'sheets': 1, 'records': len(voters)}
+            except Exception as e:
+                self.add_progress(f"❌ Export of {filename} stopped: {str(e) or 'cancelled'}")
+                raise
+            self.add_progress(f"✅ Exported {len(voters)} voters to {filename}")
+            return result
+        
+        job = ExportJob(output_path, len(voters), listener=self.progress_events.notify)
+        self.export_job = job
+        self.add_progress(f"📊 Exporting {len(voters)} voters to {filename}...")
+        job.start(run)
+        return {'success': True, 'job_id': job.id}
+    
+    def cancel_export(self, job_id=None):
+        """Cancel the running background export (optionally only if it is job_id)"""
+        job = self.export_job
+        if not job or (job_id and job.id != job_id):
+            return {'success': False, 'error': 'No such export'}
+        return {'success': job.cancel()}
+    
     def get_current_data(self):
         """Get currently loaded voter data"""
         return self.current_data
@@ -586,5 +890,60 @@ class API:
     def update_data(self, new_data):
         """Update current data from frontend (e.g. after edits)"""
         print(f"🔄 Updating backend data: {len(new_data)} records")
+        learned = self._learn_corrections(self.current_data, new_data)
         self.current_data = new_data
+        return {'success': True, 'learned_corrections': learned}
+    
+    def _learn_corrections(self, original_records, edited_records):
+        """Learn word-level OCR fixes from the operator's edits"""
+        try:
+            learned = self.correction_store.learn(original_records, edited_records)
+            if learned:
+                set_learned_corrections(self.correction_store.promoted())
+                print(f"🧠 Learned {learned} correction(s) from edits "
+                      f"({self.correction_store.stats()['promoted']} applied automatically)")
+            return learned
+        except Exception as e:
+            print(f"⚠️ Could not learn corrections from edits: {e}")
+            return 0
+    
+    def _new_record_id(self):
+        self._next_record_id += 1
+        return self._next_record_id
+    
+    def _record_index(self, record_id):
+        for index, record in enumerate(self.current_data):
+            if record.get('record_id') == record_id:
+                return index
+        return -1
+    
+    def update_record(self, record_id, fields):
+        """Apply one edited record from the review table (by record_id)"""
+        index = self._record_index(record_id)
+        if index < 0:
+            return {'success': False, 'error': 'Record not found'}
+        original = self.current_data[index]
+        # Replace rather than mutate: a running export keeps the old record
+        edited = {**original, **fields, 'record_id': record_id}
+        learned = self._learn_corrections([original], [edited])
+        self.current_data[index] = edited
+        return {'success': True, 'learned_corrections': learned}
+    
+    def add_record(self, record):
+        """Append a record added in the review table; returns its record_id"""
+        record = dict(record, record_id=self._new_record_id())
+        self.current_data.append(record)
+        return {'success': True, 'record_id': record['record_id']}
+    
+    def delete_record(self, record_id):
+        """Remove one record (by record_id)"""
+        index = self._record_index(record_id)
+        if index < 0:
+            return {'success': False, 'error': 'Record not found'}
+        del self.current_data[index]
+        return {'success': True}
+    
+    def clear_data(self):
+        """Remove all records"""
+        self.current_data = []
         return {'success': True}
@@ -0,0 +1,138 @@
+"""
+Adaptive OCR Concurrency
+AIMD (additive increase / multiplicative decrease) limit for parallel OCR calls
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AdaptiveConcurrency:
+    """
+    Concurrency limit that tunes itself from OCR call outcomes.
+
+    The limit grows by roughly `increase` per window of healthy calls
+    (latency under `latency_target`) and is cut by `decrease` when the API
+    throttles (429 / UNAVAILABLE) or latency degrades. Cuts are rate limited
+    by `cooldown` so one burst of errors only halves the limit once.
+    """
+
+    def __init__(self, initial=2, minimum=1, maximum=8, increase=1.0,
+                 decrease=0.5, latency_target=8.0, cooldown=2.0, history_size=50):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+        self.limit = float(max(minimum, min(maximum, initial)))
+        self.in_flight = 0
+        self.successes = 0
+        self.throttles = 0
+        self.last_latency = 0.0
+        self.history = deque(maxlen=history_size)
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._record('start')
+
+    @property
+    def current_limit(self):
+        """Integer number of OCR calls allowed in flight"""
+        return max(self.minimum, int(self.limit))
+
+    def acquire(self):
+        """Block until an OCR slot is free under the current limit"""
+        with self._cond:
+            while self.in_flight >= self.current_limit:
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self):
+        """Return an OCR slot"""
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._cond.notify_all()
+
+    def on_success(self, latency):
+        """Record a completed call; grow the limit while latency is healthy"""
+        with self._cond:
+            self.successes += 1
+            self.last_latency = latency
+            if latency > self.latency_target:
+                self._cut(f'latency {latency:.1f}s')
+                return
+            before = self.current_limit
+            # Additive increase: +increase per `limit` successful calls
+            self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+            if self.current_limit != before:
+                self._record('increase')
+                self._cond.notify_all()
+
+    def on_throttle(self, reason='throttled'):
+        """Record a 429 / UNAVAILABLE response; cut the limit multiplicatively"""
+        with self._cond:
+            self.throttles += 1
+            self._cut(reason)
+
+    def _cut(self, reason):
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.minimum), self.limit * self.decrease)
+        self._record(f'decrease ({reason})')
+
+    def _record(self, event):
+        self.history.append({
+            'time': time.strftime('%H:%M:%S'),
+            'event': event,
+            'limit': self.current_limit
+        })
+
+    def snapshot(self):
+        """Current limit, counters and recent history for the progress API"""
+        with self._cond:
+            return {
+                'limit': self.current_limit,
+                'in_flight': self.in_flight,
+                'successes': self.successes,
+                'throttles': self.throttles,
+                'last_latency': round(self.last_latency, 2),
+                'history': list(self.history)[-10:]
+            }
+
+
+class OCRDispatcher:
+    """
+    Runs OCR calls on a thread pool, gated by an AdaptiveConcurrency limit.
+    The pool is sized for the maximum limit; the controller decides how many
+    of those workers may actually be calling the API at once.
+    """
+
+    def __init__(self, ocr_engine, controller):
+        self.ocr_engine = ocr_engine
+        self.controller = controller
+        self._executor = ThreadPoolExecutor(
+            max_workers=controller.maximum,
+            thread_name_prefix='ocr'
+        )
+
+    def window_size(self):
+        """Pages to keep rendered/queued ahead: current limit plus one prefetch"""
+        return self.controller.current_limit + 1
+
+    def submit(self, content):
+        """Queue OCR for image bytes; returns a Future of run_ocr_content's result"""
+        return self._executor.submit(self._run, content)
+
+    def _run(self, content):
+        self.controller.acquire()
+        try:
+            return self.ocr_engine.run_ocr_content(content)
+        finally:
+            self.controller.release()
+
+    def shutdown(self):
+        """Stop the worker pool (app exit); queued OCR calls are cancelled"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,227 @@
+"""
+Consolidated Excel Export
+One workbook for many PDFs (e.g. a district's batch output). Rows roll
+over to a new sheet - and, optionally, a new file - at a configurable row
+count, an Index sheet maps every PDF to its sheet and row range, and the
+data sheets are built by parallel worker processes before assembly.
+"""
+import itertools
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+from .excel_export import (
+    PROGRESS_EVERY, RowSpool, get_export_template, iter_template_rows, read_spool, template_key_for, voter_sort_key,
+    write_streaming_sheet
+)
+
+# Excel allows 1,048,576 rows per sheet; one of them is the header
+EXCEL_MAX_DATA_ROWS = 1048575
+MAX_EXPORT_WORKERS = 4
+# While sheets build in worker processes, progress is re-reported this
+# often so a cancelled job notices without waiting for a whole sheet
+POLL_SECONDS = 0.5
+
+INDEX_SHEET = 'Index'
+INDEX_HEADERS = ['Source PDF', 'File', 'Sheet', 'First Row', 'Last Row', 'Records']
+DATA_SHEET = 'Voter Data'
+
+
+def group_by_source(voters, default_source=''):
+    """[(source_file, voters)] in first-seen order (voters keep their order)"""
+    groups = {}
+    for voter in voters:
+        groups.setdefault(voter.get('source_file') or default_source, []).append(voter)
+    return list(groups.items())
+
+
+def _build_sheet_part(spool_path, count, title, headers, part_path, progress=None):
+    """Worker: stream one spooled chunk into a single-sheet workbook"""
+    wb = Workbook(write_only=True)
+    write_streaming_sheet(wb, title, headers, read_spool(spool_path, count), progress=progress)
+    wb.save(part_path)
+    return part_path
+
+
+def _assemble_file(output_path, sheets, work_dir, index_rows=None):
+    """
+    Write one output file from built sheet parts.
+
+    openpyxl writes the workbook (Index sheet plus an empty placeholder per
+    data sheet, with the same filter range so workbook.xml is final); the
+    placeholders' XML is then swapped for the parts' sheet XML. Write-only
+    sheets use inline strings and parts style only the header row, so a
+    part's sheet XML and styles.xml are valid in the assembled file.
+    """
+    wb = Workbook(write_only=True)
+    if index_rows is not None:
+        write_streaming_sheet(wb, INDEX_SHEET, INDEX_HEADERS, index_rows)
+    first_sheet = 2 if index_rows is not None else 1
+    for sheet in sheets:
+        ws = wb.create_sheet(sheet['title'])
+        ws.auto_filter.ref = f"A1:{get_column_letter(sheet['columns'])}{sheet['count'] + 1}"
+    skeleton = os.path.join(work_dir, 'skeleton_' + os.path.basename(output_path))
+    wb.save(skeleton)
+
+    parts = {f"xl/worksheets/sheet{first_sheet + i}.xml": sheet['part_path'] for i, sheet in enumerate(sheets)}
+    styles_from = sheets[0]['part_path']
+    with zipfile.ZipFile(skeleton) as src, zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as dst:
+        for item in src.infolist():
+            if item.filename in parts:
+                source, member = parts[item.filename], 'xl/worksheets/sheet1.xml'
+            elif item.filename == 'xl/styles.xml':
+                source, member = styles_from, 'xl/styles.xml'
+            else:
+                dst.writestr(item, src.read(item.filename))
+                continue
+            with zipfile.ZipFile(source) as part, part.open(member) as r, \
+                    dst.open(item.filename, 'w', force_zip64=True) as w:
+                shutil.copyfileobj(r, w, 1024 * 1024)
+    os.remove(skeleton)
+
+
+def _file_paths(output_path, file_count):
+    if file_count == 1:
+        return [output_path]
+    base, ext = os.path.splitext(output_path)
+    return [f"{base}_part{i}{ext or '.xlsx'}" for i in range(1, file_count + 1)]
+
+
+def use_consolidated_layout(record_count, requested=False):
+    """
+    Whether an export uses the consolidated layout (Index sheet plus
+    rolled-over data sheets): when the caller asks for it, or when the
+    records don't fit one sheet. Every export entry point uses this rule.
+    """
+    return requested or record_count > EXCEL_MAX_DATA_ROWS
+
+
+def export_consolidated(groups, output_path, template='default', max_rows=EXCEL_MAX_DATA_ROWS,
+                        sheets_per_file=None, workers=None, progress=None):
+    """
+    Export many PDFs' voters into one consolidated workbook.
+
+    Args:
+        groups: [(source_pdf, voters)] - each PDF's voters are sorted by
+                page/extraction order; PDFs keep the given order and serial
+                numbers run on across them
+        output_path: Path of the workbook (with several files, '_partN'
+                     is added before the extension)
+        template: Template type (column layout as in export_to_excel)
+        max_rows: Data rows per sheet before rolling over to the next
+        sheets_per_file: Data sheets per file before rolling over to the
+                         next file (None = all sheets in one file)
+        workers: Worker processes building sheets (default: CPUs, max 4)
+        progress: Optional progress(done, total) callback - rows spooled,
+                  then rows of built sheets (total = twice the records);
+                  raising from it aborts before any file is saved
+
+    Returns:
+        dict: {'files': [paths], 'sheets': int, 'records': int}
+    """
+    groups = [(source, sorted(voters, key=voter_sort_key)) for source, voters in groups if voters]
+    if not groups:
+        raise ValueError("Cannot export: No voter records provided")
+    if not 1 <= max_rows <= EXCEL_MAX_DATA_ROWS:
+        raise ValueError(f"max_rows must be between 1 and {EXCEL_MAX_DATA_ROWS}")
+
+    template_key = template_key_for(template)
+    headers = get_export_template(template_key)[0]
+    total = sum(len(voters) for _, voters in groups)
+    print(f"📊 Consolidated Export: {total} records from {len(groups)} PDF(s), Template: {template}")
+
+    work_dir = tempfile.mkdtemp(prefix='voter_export_')
+    try:
+        # Spool rows chunk by chunk, noting each PDF's row range per chunk
+        chunks, ranges = [], {}
+        spool = None
+        work, spooled = 2 * total, 0
+        if progress:
+            progress(0, work)
+        rows = iter_template_rows(itertools.chain.from_iterable(v for _, v in groups), template_key)
+        try:
+            for group_no, (_, voters) in enumerate(groups):
+                for _ in range(len(voters)):
+                    if spool is None or spool.count >= max_rows:
+                        if spool is not None:
+                            spool.close()
+                        path = os.path.join(work_dir, f'chunk{len(chunks) + 1}.spool')
+                        spool = RowSpool(path)
+                        chunks.append({'spool_path': path, 'spool': spool})
+                    spool.append(next(rows))
+                    spooled += 1
+                    if progress and spooled % PROGRESS_EVERY == 0:
+                        progress(spooled, work)
+                    key = (group_no, len(chunks) - 1)
+                    entry = ranges.get(key)
+                    if entry is None:
+                        ranges[key] = [spool.count + 1, spool.count + 1]
+                    else:
+                        entry[1] = spool.count + 1
+        finally:
+            if spool is not None:
+                spool.close()
+
+        # Chunk -> file / sheet title
+        per_file = sheets_per_file or len(chunks)
+        file_paths = _file_paths(output_path, (len(chunks) + per_file - 1) // per_file)
+        for i, chunk in enumerate(chunks):
+            chunk['count'] = chunk.pop('spool').count
+            chunk['columns'] = len(headers)
+            chunk['file_no'] = i // per_file
+            chunk['title'] = DATA_SHEET if len(chunks) == 1 else f"{DATA_SHEET} {i + 1}"
+            chunk['part_path'] = os.path.join(work_dir, f'part{i + 1}.xlsx')
+
+        # Build the data sheets in parallel
+        jobs = [(c['spool_path'], c['count'], c['title'], headers, c['part_path']) for c in chunks]
+        workers = max(1, min(workers or os.cpu_count() or 1, MAX_EXPORT_WORKERS, len(chunks)))
+        print(f"   🧵 Building {len(chunks)} sheet(s) in {len(file_paths)} file(s) with {workers} worker(s)")
+        built = total
+        if progress:
+            progress(built, work)
+        if workers == 1:
+            for job in jobs:
+                # Same process: report rows as they are written
+                sheet_progress = (lambda done, _, base=built: progress(base + done, work)) if progress else None
+                _build_sheet_part(*job, progress=sheet_progress)
+                built += job[1]
+                if progress:
+                    progress(built, work)
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            try:
+                pending = {pool.submit(_build_sheet_part, *job): job[1] for job in jobs}
+                while pending:
+                    finished, _ = wait(pending, timeout=POLL_SECONDS, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        future.result()
+                        built += pending.pop(future)
+                    if progress:
+                        progress(built, work)
+            except BaseException:
+                # Cancelled/failed: drop queued sheets, but let the running
+                # ones (at most MAX_EXPORT_WORKERS) finish before work_dir,
+                # which they read and write, is removed
+                pool.shutdown(wait=True, cancel_futures=True)
+                raise
+            pool.shutdown()
+
+        index_rows = [
+            (groups[group_no][0], os.path.basename(file_paths[chunks[chunk_no]['file_no']]),
+             chunks[chunk_no]['title'], first, last, last - first + 1)
+            for (group_no, chunk_no), (first, last) in sorted(ranges.items())
+        ]
+        for file_no, path in enumerate(file_paths):
+            sheets = [c for c in chunks if c['file_no'] == file_no]
+            _assemble_file(path, sheets, work_dir, index_rows if file_no == 0 else None)
+            print(f"✅ Excel file saved: {path}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"✅ Exported {total} records in {len(chunks)} sheet(s)")
+    return {'files': file_paths, 'sheets': len(chunks), 'records': total}
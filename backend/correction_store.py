@@ -0,0 +1,145 @@
+"""
+Learned OCR Corrections
+Mines word-level substitutions from records the operator edited in the
+review table, counts them, and promotes frequent, consistent ones to
+automatic corrections
+"""
+import difflib
+import json
+import os
+import re
+import threading
+import time
+
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser('~'), '.voter_ocr', 'learned_corrections.json')
+
+# Marathi fields whose edits are mined
+LEARN_FIELDS = ('name_marathi', 'relation_name_marathi')
+# A substitution becomes automatic after this many edits...
+MIN_COUNT = 3
+# ...if at least this share of all edits of that word agree on it
+MIN_SHARE = 0.8
+# Word pairs less similar than this are renames, not OCR fixes
+MIN_SIMILARITY = 0.5
+
+_DEVANAGARI = re.compile(r'[\u0900-\u097F]')
+
+
+def _record_key(record):
+    """Stable identity of a voter record across edits (the EPIC may be edited too)"""
+    if record.get('record_id') is not None:
+        return ('id', record['record_id'])
+    if record.get('epic'):
+        return ('epic', record['epic'])
+    return ('pos', record.get('page_number'), record.get('extraction_order'), record.get('serial_no'))
+
+
+def word_substitutions(original, edited):
+    """
+    Word-level (wrong, correct) pairs between an OCR'd and an edited name.
+    Words are aligned with difflib; only one-to-one replacements of
+    similar Devanagari words count.
+    """
+    before, after = (original or '').split(), (edited or '').split()
+    pairs = []
+    matcher = difflib.SequenceMatcher(a=before, b=after, autojunk=False)
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op != 'replace' or (i2 - i1) != (j2 - j1):
+            continue
+        for wrong, correct in zip(before[i1:i2], after[j1:j2]):
+            if len(wrong) < 2 or not _DEVANAGARI.search(wrong) or not _DEVANAGARI.search(correct):
+                continue
+            if difflib.SequenceMatcher(a=wrong, b=correct).ratio() >= MIN_SIMILARITY:
+                pairs.append((wrong, correct))
+    return pairs
+
+
+class CorrectionStore:
+    """
+    Persistent {wrong_word: {correct_word: count}} counts (JSON file).
+    promoted() returns the substitutions safe to apply automatically.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv('LEARNED_CORRECTIONS_PATH', DEFAULT_STORE_PATH)
+        self.counts = {}
+        self.updated = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.counts = data.get('counts', {})
+            self.updated = data.get('updated')
+        except Exception as e:
+            print(f"⚠️ Could not read learned corrections: {e}")
+
+    def _save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'updated': self.updated, 'counts': self.counts}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.path)
+
+    def learn(self, original_records, edited_records):
+        """
+        Diff edited records against the originals (matched by record_id,
+        else EPIC, else page/extraction position) and count the word
+        substitutions.
+
+        Returns:
+            int: Number of substitutions recorded
+        """
+        originals = {}
+        for record in original_records or []:
+            key = _record_key(record)
+            # Ambiguous keys can't be matched reliably
+            originals[key] = None if key in originals else record
+
+        pairs = []
+        for record in edited_records or []:
+            original = originals.get(_record_key(record))
+            if not original:
+                continue
+            for field in LEARN_FIELDS:
+                if field in record and record.get(field) != original.get(field):
+                    pairs.extend(word_substitutions(original.get(field), record.get(field)))
+        if not pairs:
+            return 0
+
+        with self._lock:
+            for wrong, correct in pairs:
+                by_correct = self.counts.setdefault(wrong, {})
+                by_correct[correct] = by_correct.get(correct, 0) + 1
+            self.updated = time.strftime('%Y-%m-%d %H:%M:%S')
+            self._save()
+        return len(pairs)
+
+    def promoted(self, min_count=MIN_COUNT, min_share=MIN_SHARE):
+        """{wrong: correct} for substitutions seen often and consistently"""
+        with self._lock:
+            corrected_forms = {c for by_correct in self.counts.values() for c in by_correct}
+            promoted = {}
+            for wrong, by_correct in self.counts.items():
+                # Never rewrite a word operators also type in as a correction
+                if wrong in corrected_forms:
+                    continue
+                correct, count = max(by_correct.items(), key=lambda kv: kv[1])
+                if count >= min_count and count / sum(by_correct.values()) >= min_share:
+                    promoted[wrong] = correct
+            return promoted
+
+    def stats(self):
+        with self._lock:
+            observed = sum(sum(by_correct.values()) for by_correct in self.counts.values())
+            words = len(self.counts)
+        return {
+            'words': words,
+            'edits': observed,
+            'promoted': len(self.promoted()),
+            'updated': self.updated
+        }
@@ -2,24 +2,165 @@
 Marathi OCR Corrections
 Fixes common OCR character confusions
 """
+import os
 import re
+import threading
+from collections import deque
+
+CORRECTIONS_FILE = os.getenv(
+    'MARATHI_CORRECTIONS_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'marathi_corrections.tsv')
+)
+
+
+def load_corrections(path=CORRECTIONS_FILE):
+    """
+    Read a corrections dictionary file (<wrong><TAB><correct> per line).
+    
+    Returns:
+        dict: {wrong: correct}; empty if the file is missing
+    """
+    corrections = {}
+    if not os.path.exists(path):
+        print(f"⚠️ Corrections file not found: {path}")
+        return corrections
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line.strip() or line.startswith('#'):
+                continue
+            parts = line.split('\t')
+            if len(parts) >= 2 and parts[0]:
+                corrections[parts[0]] = parts[1]
+    return corrections
+
+
+class CorrectionAutomaton:
+    """
+    Aho-Corasick automaton over correction patterns.
+    
+    One left-to-right pass finds every pattern occurrence; overlapping
+    matches are resolved leftmost first, then longest, and replaced in a
+    single rebuild of the string, so replacements never cascade.
+    """
+    
+    def __init__(self, corrections):
+        self.replacements = {wrong: correct for wrong, correct in corrections.items() if wrong}
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        for pattern in self.replacements:
+            self._add(pattern)
+        self._link()
+    
+    def __len__(self):
+        return len(self.replacements)
+    
+    def _add(self, pattern):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        self._out[state] = (len(pattern),)
+    
+    def _link(self):
+        """Breadth-first failure links; each state also inherits its fail state's matches"""
+        goto, fail, out = self._goto, self._fail, self._out
+        # Depth-1 states fail to the root (their fail link is already 0)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] = out[nxt] + out[fail[nxt]]
+    
+    def apply(self, text):
+        """Replace all pattern occurrences in one pass (leftmost-longest)"""
+        if not text or not self.replacements:
+            return text
+        goto, fail, out = self._goto, self._fail, self._out
+        
+        # Longest match end for each start position
+        best = {}
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                end = i + 1
+                for length in out[state]:
+                    start = end - length
+                    if best.get(start, 0) < end:
+                        best[start] = end
+        if not best:
+            return text
+        
+        parts = []
+        pos = 0
+        copied = 0
+        for start in sorted(best):
+            if start < pos:
+                continue  # overlaps a match already taken
+            end = best[start]
+            parts.append(text[copied:start])
+            parts.append(self.replacements[text[start:end]])
+            pos = copied = end
+        parts.append(text[copied:])
+        return ''.join(parts)
+
+
+# Common OCR error corrections for Marathi (from CORRECTIONS_FILE)
+MARATHI_CORRECTIONS = load_corrections()
+
+_automaton = None
+_automaton_lock = threading.Lock()
+
+# Whole-word substitutions learned from operator edits (see correction_store)
+_learned_words = {}
+
+
+def get_corrections_automaton():
+    """Compiled automaton for MARATHI_CORRECTIONS (built on first use)"""
+    global _automaton
+    if _automaton is None:
+        with _automaton_lock:
+            if _automaton is None:
+                _automaton = CorrectionAutomaton(MARATHI_CORRECTIONS)
+    return _automaton
+
+
+def reload_corrections(path=CORRECTIONS_FILE):
+    """Re-read the corrections file and rebuild the automaton"""
+    global _automaton
+    corrections = load_corrections(path)
+    automaton = CorrectionAutomaton(corrections)
+    with _automaton_lock:
+        MARATHI_CORRECTIONS.clear()
+        MARATHI_CORRECTIONS.update(corrections)
+        _automaton = automaton
+    return len(automaton)
+
+
+def set_learned_corrections(corrections):
+    """
+    Replace the learned whole-word corrections. Unlike the dictionary
+    patterns these only match complete words, since they were mined from
+    edits of whole words.
+    """
+    global _learned_words
+    _learned_words = dict(corrections)
 
-# Common OCR error corrections for Marathi
-MARATHI_CORRECTIONS = {
-    'आजम': 'आत्राम',
-    'अजम': 'आत्राम',
-    'आञाम': 'आत्राम',
-    'अञाम': 'आत्राम',
-    'प्रवन': 'प्रविन',
-    'प्रवीन': 'प्रविन',
-    'गोपल': 'गोपाल',
-    'सुनल': 'सुनिल',
-    'सुनला': 'सुनील',
-    'रमश': 'रमेश',
-    'महश': 'महेश',
-    'राजश': 'राजेश',
-    'दनश': 'दिनेश',
-}
 
 def apply_marathi_corrections(text):
     """
@@ -34,15 +175,195 @@ def apply_marathi_corrections(text):
     if not text:
         return text
     
-    corrected = text
-    for wrong, correct in MARATHI_CORRECTIONS.items():
-        corrected = corrected.replace(wrong, correct)
+    corrected = get_corrections_automaton().apply(text)
+    
+    learned = _learned_words
+    if learned:
+        words = corrected.split(' ')
+        if any(word in learned for word in words):
+            corrected = ' '.join(learned.get(word, word) for word in words)
     
     return corrected
 
+# Implicit 'a' after a bare consonant, inserted before the table lookup
+_INHERENT_A = '\ue000'
+# First private code point for multi-character source keys (nukta forms)
+_PRIVATE_BASE = 0xE001
+
+# Anusvara (HK 'M') is 'm' before labials (p, b) and 'n' everywhere else
+_ANUSVARA_LABIAL = re.compile(r'M(?=[pb])')
+_SEPARATORS = re.compile(r'[\|:]+')
+
+# HK notation -> readable English (single characters, so one str.translate pass)
+HK_TO_ENGLISH = str.maketrans({
+    'A': 'a',     # long a -> a (simplified)
+    'I': 'ee',    # long i -> ee
+    'U': 'oo',    # long u -> oo
+    'R': 'ri',    # vocalic r
+    'G': 'n',     # velar nasal (ङ) -> n
+    'J': 'n',     # palatal nasal (ञ) -> n
+    'T': 't',     # retroflex t
+    'D': 'd',     # retroflex d
+    'N': 'n',     # retroflex n
+    'z': 'sh',    # palatal sibilant (ś)
+    'S': 'sh',    # retroflex sibilant (ṣ)
+    'H': '',      # remove visarga at end of names
+    '|': '',      # remove dandas
+    "'": '',      # remove avagraha
+    'M': 'n',     # anusvara not before a labial
+})
+
+# Vowel signs that keep the final 'a' of a name
+_VOWEL_ENDINGS = ('ा', 'ी', 'ू', 'े', 'ो', 'ौ', 'ै')
+
+# Used when indic-transliteration is not installed
+FALLBACK_CHAR_MAP = {
+    'अ': 'a', 'आ': 'aa', 'इ': 'i', 'ई': 'ee', 'उ': 'u', 'ऊ': 'oo',
+    'ए': 'e', 'ऐ': 'ai', 'ओ': 'o', 'औ': 'au',
+    'क': 'ka', 'ख': 'kha', 'ग': 'ga', 'घ': 'gha', 'ङ': 'nga',
+    'च': 'cha', 'छ': 'chha', 'ज': 'ja', 'झ': 'jha', 'ञ': 'nya',
+    'ट': 'ta', 'ठ': 'tha', 'ड': 'da', 'ढ': 'dha', 'ण': 'na',
+    'त': 'ta', 'थ': 'tha', 'द': 'da', 'ध': 'dha', 'न': 'na',
+    'प': 'pa', 'फ': 'pha', 'ब': 'ba', 'भ': 'bha', 'म': 'ma',
+    'य': 'ya', 'र': 'ra', 'ल': 'la', 'व': 'va', 'ळ': 'la',
+    'श': 'sha', 'ष': 'sha', 'स': 'sa', 'ह': 'ha',
+    'ा': 'a', 'ि': 'i', 'ी': 'ee', 'ु': 'u', 'ू': 'oo',
+    'े': 'e', 'ै': 'ai', 'ो': 'o', 'ौ': 'au',
+    'ं': 'n', 'ः': 'h', '्': '',
+    'ृ': 'ri', 'ॅ': 'e', 'ॉ': 'o',
+}
+_FALLBACK_TABLE = str.maketrans(FALLBACK_CHAR_MAP)
+
+_tables = None
+
+# Per-word results; names repeat the same given names and surnames
+_word_memo = {}
+_WORD_MEMO_SIZE = 100000
+
+
+def _build_tables():
+    """
+    Compile Devanagari -> HK lookup tables from indic-transliteration's
+    scheme data, once. Returns None when the library is not installed.
+
+    The library walks the text token by token, appending an implicit 'a'
+    after a consonant unless a vowel sign or virama follows. Here that
+    becomes one regex insertion of _INHERENT_A plus a str.translate table;
+    multi-character keys whose output differs from their parts (nukta
+    forms like क़) are first collapsed to private code points.
+    """
+    try:
+        from indic_transliteration import sanscript
+    except ImportError:
+        return None
+
+    scheme = sanscript.SchemeMap(sanscript.SCHEMES[sanscript.DEVANAGARI], sanscript.SCHEMES[sanscript.HK])
+    to_hk = {_INHERENT_A: 'a'}
+    consonants = [k for k in scheme.consonants if len(k) == 1]
+    no_vowel = list(scheme.vowel_marks) + list(scheme.virama)
+    for table in (scheme.non_marks_viraama, scheme.vowel_marks, scheme.virama):
+        for key, hk in table.items():
+            if len(key) == 1:
+                to_hk[key] = hk
+
+    def inherent_pattern(extra=()):
+        return re.compile('(?<=[%s])(?![%s])' % (
+            re.escape(''.join(consonants + list(extra))), re.escape(''.join(no_vowel))))
+
+    def translate(text, inherent):
+        return inherent.sub(_INHERENT_A, text).translate(to_hk_table)
+
+    to_hk_table = str.maketrans(to_hk)
+    inherent = inherent_pattern()
+
+    # Multi-character keys: keep only those the per-character tables get wrong
+    collapse = {}
+    for key in sorted((k for k in scheme.non_marks_viraama if len(k) > 1), key=len, reverse=True):
+        if translate(key, inherent) != sanscript.transliterate(key, sanscript.DEVANAGARI, sanscript.HK):
+            private = chr(_PRIVATE_BASE + len(collapse))
+            collapse[key] = private
+            to_hk[private] = scheme.non_marks_viraama[key]
+    collapsed_consonants = [collapse[k] for k in collapse if k in scheme.consonants]
+
+    return {
+        'to_hk': str.maketrans(to_hk),
+        'inherent': inherent_pattern(collapsed_consonants),
+        'collapse': collapse,
+        'collapse_re': re.compile('|'.join(re.escape(k) for k in collapse)) if collapse else None,
+        'collapse_triggers': frozenset(k[-1] for k in collapse),
+    }
+
+
+def _get_tables():
+    global _tables
+    if _tables is None:
+        _tables = _build_tables() or {}
+    return _tables
+
+
+def _clean_name(marathi_text):
+    """Strip name labels and separators, normalise whitespace"""
+    # Remove "नाव" (name label) from marathi text before transliteration
+    marathi_text = marathi_text.replace('नाव', '').replace('नांव', '').replace('नव', '').strip()
+    # Remove stray separators
+    if '|' in marathi_text or ':' in marathi_text:
+        marathi_text = _SEPARATORS.sub(' ', marathi_text)
+    return ' '.join(marathi_text.split())
+
+
+def _word_to_english(word, tables):
+    """
+    Transliterate one Devanagari word (no whitespace) with the precompiled
+    tables. Returns the raw lower-case English word, possibly empty.
+    """
+    collapse_re = tables['collapse_re']
+    if collapse_re is not None and not tables['collapse_triggers'].isdisjoint(word):
+        collapse = tables['collapse']
+        word = collapse_re.sub(lambda m: collapse[m.group(0)], word)
+
+    # Harvard-Kyoto (keeps the inherent 'a' vowel), then HK -> readable English
+    result = tables['inherent'].sub(_INHERENT_A, word).translate(tables['to_hk'])
+    if 'M' in result:
+        result = _ANUSVARA_LABIAL.sub('m', result)
+    result = result.translate(HK_TO_ENGLISH)
+
+    # Clean up double vowels that look awkward
+    return result.replace('aa', 'a').replace('ii', 'i')
+
+
+def _lookup_word(word, tables):
+    """(capitalized, capitalized without schwa 'a') for a word, memoized"""
+    entry = _word_memo.get(word)
+    if entry is None:
+        english = _word_to_english(word, tables)
+        capitalized = english.capitalize()
+        # Trailing 'a' is only schwa from the last consonant (श -> sha -> sh)
+        trimmed = capitalized[:-1] if len(english) > 3 and english.endswith('a') else capitalized
+        entry = (capitalized, trimmed)
+        if len(_word_memo) >= _WORD_MEMO_SIZE:
+            _word_memo.clear()
+        _word_memo[word] = entry
+    return entry
+
+
+def _to_english(marathi_text, tables):
+    """Transliterate one cleaned name word by word (words are independent)"""
+    entries = [_lookup_word(word, tables) for word in marathi_text.split(' ')]
+    # Words that transliterate to nothing (dandas) don't count as the last word
+    words = [entry for entry in entries if entry[0]]
+    if not words:
+        return ''
+    # Smart trailing 'a' removal:
+    # - Keep 'a' if original Marathi ends with a vowel sign (ा, ी, ...) - these are intentional
+    # - Remove 'a' on the last word if it's just schwa from a consonant
+    last = words[-1][0] if marathi_text.endswith(_VOWEL_ENDINGS) else words[-1][1]
+    return ' '.join([entry[0] for entry in words[:-1]] + [last])
+
+
 def transliterate_marathi(marathi_text):
     """
-    Marathi to English transliteration using indic-transliteration library
+    Marathi to English transliteration (indic-transliteration HK scheme,
+    applied through precompiled tables)
     
     Args:
         marathi_text: Marathi text in Devanagari
@@ -53,108 +374,35 @@ def transliterate_marathi(marathi_text):
     if not marathi_text:
         return ''
     
-    # Remove "नाव" (name label) from marathi text before transliteration
-    marathi_text = marathi_text.replace('नाव', '').replace('नांव', '').replace('नव', '').strip()
-    # Remove stray separators
-    marathi_text = re.sub(r'[\|:]+', ' ', marathi_text)
-    marathi_text = re.sub(r'\s+', ' ', marathi_text).strip()
-    
+    marathi_text = _clean_name(marathi_text)
     if not marathi_text:
         return ''
     
-    # Try using indic-transliteration library (proper transliteration)
-    try:
-        from indic_transliteration import sanscript
-        from indic_transliteration.sanscript import transliterate
-        
-        # Use HK (Harvard-Kyoto) scheme which preserves inherent 'a' vowel
-        result = transliterate(marathi_text, sanscript.DEVANAGARI, sanscript.HK)
-        
-        # Fix anusvara (M) based on following consonant
-        # Before velars (k, g) -> n (ng sound)
-        # Before palatals (c, j) -> n  
-        # Before labials (p, b) -> m
-        # Default -> n (most common in names)
-        import re as regex
-        result = regex.sub(r'M([kg])', r'n\1', result)  # Mg, Mk -> ng, nk
-        result = regex.sub(r'M([cj])', r'n\1', result)  # Mc, Mj -> nc, nj
-        result = regex.sub(r'M([pb])', r'm\1', result)  # Mp, Mb -> mp, mb
-        result = result.replace('M', 'n')  # Default: M -> n
-        
-        # Convert HK notation to readable English
-        hk_to_english = {
-            'A': 'a',     # long a -> a (simplified)
-            'I': 'ee',    # long i -> ee
-            'U': 'oo',    # long u -> oo  
-            'R': 'ri',    # vocalic r
-            'G': 'n',     # velar nasal (ङ) -> n
-            'J': 'n',     # palatal nasal (ञ) -> n
-            'T': 't',     # retroflex t
-            'D': 'd',     # retroflex d
-            'N': 'n',     # retroflex n
-            'z': 'sh',    # palatal sibilant (ś)
-            'S': 'sh',    # retroflex sibilant (ṣ)
-            'H': '',      # remove visarga at end of names
-            '|': '',      # remove dandas
-            "'": '',      # remove avagraha
-        }
-        
-        for hk, eng in hk_to_english.items():
-            result = result.replace(hk, eng)
-        
-        # Clean up double vowels that look awkward
-        result = result.replace('aa', 'a')  # Simplify long a
-        result = result.replace('ii', 'i')  # Don't use ii
-        
-        # Smart trailing 'a' removal:
-        # - Keep 'a' if original Marathi ends with ा (aa matra) - these are intentional
-        # - Remove 'a' if it's just schwa from consonant (like श -> sha -> sh)
-        # Check if original text ends with aa-matra (ा)
-        ends_with_aa_matra = marathi_text.endswith('ा') or marathi_text.endswith('ी') or marathi_text.endswith('ू') or marathi_text.endswith('े') or marathi_text.endswith('ो') or marathi_text.endswith('ौ') or marathi_text.endswith('ै')
-        
-        words = result.split()
-        cleaned_words = []
-        for i, word in enumerate(words):
-            # Only process the last word for trailing vowel check
-            if i == len(words) - 1 and not ends_with_aa_matra:
-                # Remove trailing 'a' only if original doesn't end with vowel matra
-                if len(word) > 3 and word.endswith('a'):
-                    word = word[:-1]
-            cleaned_words.append(word.capitalize())
-        
-        return ' '.join(cleaned_words)
-        
-    except ImportError:
-        # Fallback to simple character mapping if library not available
-        pass
-    except Exception as e:
-        # If any error, fall back to simple method
-        print(f"Transliteration error: {e}")
+    tables = _get_tables()
+    if tables:
+        return _to_english(marathi_text, tables)
     
     # Fallback: Simple character mapping
-    char_map = {
-        'अ': 'a', 'आ': 'aa', 'इ': 'i', 'ई': 'ee', 'उ': 'u', 'ऊ': 'oo',
-        'ए': 'e', 'ऐ': 'ai', 'ओ': 'o', 'औ': 'au',
-        'क': 'ka', 'ख': 'kha', 'ग': 'ga', 'घ': 'gha', 'ङ': 'nga',
-        'च': 'cha', 'छ': 'chha', 'ज': 'ja', 'झ': 'jha', 'ञ': 'nya',
-        'ट': 'ta', 'ठ': 'tha', 'ड': 'da', 'ढ': 'dha', 'ण': 'na',
-        'त': 'ta', 'थ': 'tha', 'द': 'da', 'ध': 'dha', 'न': 'na',
-        'प': 'pa', 'फ': 'pha', 'ब': 'ba', 'भ': 'bha', 'म': 'ma',
-        'य': 'ya', 'र': 'ra', 'ल': 'la', 'व': 'va', 'ळ': 'la',
-        'श': 'sha', 'ष': 'sha', 'स': 'sa', 'ह': 'ha',
-        'ा': 'a', 'ि': 'i', 'ी': 'ee', 'ु': 'u', 'ू': 'oo',
-        'े': 'e', 'ै': 'ai', 'ो': 'o', 'ौ': 'au',
-        'ं': 'n', 'ः': 'h', '्': '',
-        'ृ': 'ri', 'ॅ': 'e', 'ॉ': 'o',
-    }
-    
-    result = ''
-    for char in marathi_text:
-        result += char_map.get(char, char)
-    
-    # Clean up
-    result = re.sub(r'\s+', ' ', result).strip()
-    
-    # Title case
+    result = marathi_text.translate(_FALLBACK_TABLE)
     return ' '.join(word.capitalize() for word in result.split())
 
+
+def transliterate_marathi_many(marathi_names):
+    """
+    Transliterate a list of names (same output as transliterate_marathi).
+    
+    Returns:
+        list: English names in the same order
+    """
+    tables = _get_tables()
+    results = []
+    append = results.append
+    for name in marathi_names:
+        name = _clean_name(name) if name else ''
+        if not name:
+            append('')
+        elif tables:
+            append(_to_english(name, tables))
+        else:
+            append(' '.join(word.capitalize() for word in name.translate(_FALLBACK_TABLE).split()))
+    return results
@@ -0,0 +1,142 @@
+"""
+Image Encoding Profiles
+Encodes rendered pages for OCR upload (JPEG/PNG/WebP, palette, 1-bit,
+downscaled) and stores the per-template profile chosen by
+benchmark_encoding.py
+"""
+import io
+import json
+import os
+from PIL import Image as PILImage
+
+ENCODING_PROFILES = {
+    # Original upload format
+    'jpeg_q95': {'format': 'JPEG', 'quality': 95},
+    'jpeg_q85': {'format': 'JPEG', 'quality': 85},
+    'jpeg_q75': {'format': 'JPEG', 'quality': 75},
+    'jpeg_q60': {'format': 'JPEG', 'quality': 60},
+    # Lossless, reduced to a small palette (printed rolls are near-bilevel)
+    'png_palette16': {'format': 'PNG', 'colors': 16},
+    # Lossless 1-bit after thresholding
+    'png_1bit': {'format': 'PNG', 'bilevel': True, 'threshold': 160},
+    'webp_q80': {'format': 'WEBP', 'quality': 80},
+    'webp_q60': {'format': 'WEBP', 'quality': 60},
+    # Downscaled variants
+    'jpeg_q85_75pct': {'format': 'JPEG', 'quality': 85, 'scale': 0.75},
+    'webp_q80_75pct': {'format': 'WEBP', 'quality': 80, 'scale': 0.75},
+    'png_1bit_75pct': {'format': 'PNG', 'bilevel': True, 'threshold': 160, 'scale': 0.75},
+}
+DEFAULT_ENCODING_PROFILE = 'jpeg_q95'
+
+# Written by benchmark_encoding.py: {template_key: {'profile': name, ...}}
+SELECTION_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'encoding_profiles.json')
+
+_selected_profiles = None
+
+
+def pixmap_to_image(pix):
+    """Convert a fitz.Pixmap (gray or RGB, no alpha) to a PIL image"""
+    mode = 'L' if pix.n == 1 else 'RGB'
+    return PILImage.frombytes(mode, (pix.width, pix.height), pix.samples)
+
+
+def encode_image(image, profile_name=DEFAULT_ENCODING_PROFILE):
+    """
+    Encode a PIL image with an encoding profile.
+
+    Args:
+        image: PIL image (L or RGB)
+        profile_name: Key of ENCODING_PROFILES
+
+    Returns:
+        tuple: (content_bytes, width, height) of the encoded image
+    """
+    profile = ENCODING_PROFILES.get(profile_name, ENCODING_PROFILES[DEFAULT_ENCODING_PROFILE])
+
+    scale = profile.get('scale', 1.0)
+    if scale != 1.0:
+        image = image.resize(
+            (max(1, int(image.width * scale)), max(1, int(image.height * scale))),
+            PILImage.LANCZOS
+        )
+
+    if profile.get('bilevel'):
+        threshold = profile.get('threshold', 160)
+        image = image.convert('L').point(lambda v: 255 if v >= threshold else 0, mode='1')
+    elif profile.get('colors'):
+        image = image.convert('L').quantize(colors=profile['colors'])
+
+    buf = io.BytesIO()
+    fmt = profile['format']
+    if fmt == 'PNG':
+        image.save(buf, format='PNG', optimize=True)
+    else:
+        image.save(buf, format=fmt, quality=profile.get('quality', 90))
+    return buf.getvalue(), image.width, image.height
+
+
+def encode_pixmap(pix, profile_name=DEFAULT_ENCODING_PROFILE):
+    """
+    Encode a rendered fitz.Pixmap for upload.
+    Plain JPEG profiles use PyMuPDF's encoder directly (no PIL copy).
+
+    Returns:
+        tuple: (content_bytes, width, height)
+    """
+    profile = ENCODING_PROFILES.get(profile_name, ENCODING_PROFILES[DEFAULT_ENCODING_PROFILE])
+    if profile['format'] == 'JPEG' and profile.get('scale', 1.0) == 1.0:
+        return pix.tobytes(output='jpeg', jpg_quality=profile.get('quality', 95)), pix.width, pix.height
+    return encode_image(pixmap_to_image(pix), profile_name)
+
+
+def load_selected_profiles(reload=False):
+    """Per-template profile selections from SELECTION_FILE (cached)"""
+    global _selected_profiles
+    if _selected_profiles is None or reload:
+        _selected_profiles = {}
+        if os.path.exists(SELECTION_FILE):
+            try:
+                with open(SELECTION_FILE, 'r', encoding='utf-8') as f:
+                    _selected_profiles = json.load(f)
+            except Exception as e:
+                print(f"⚠️ Could not read encoding selections: {e}")
+    return _selected_profiles
+
+
+def selected_profile_for(template_key):
+    """Benchmark-selected encoding profile for a template key, if any"""
+    entry = load_selected_profiles().get(template_key)
+    if isinstance(entry, dict):
+        entry = entry.get('profile')
+    return entry if entry in ENCODING_PROFILES else None
+
+
+def save_selected_profiles(selections):
+    """Persist {template_key: {'profile': name, ...}} selections"""
+    global _selected_profiles
+    with open(SELECTION_FILE, 'w', encoding='utf-8') as f:
+        json.dump(selections, f, ensure_ascii=False, indent=2)
+    _selected_profiles = selections
+
+
+def choose_profile(results, baseline=DEFAULT_ENCODING_PROFILE, max_accuracy_drop=0.005):
+    """
+    Pick the smallest-upload profile whose parse accuracy is within
+    `max_accuracy_drop` of the baseline profile.
+
+    Args:
+        results: {profile_name: {'bytes': int, 'encode_ms': float, 'accuracy': float}}
+
+    Returns:
+        str: Chosen profile name
+    """
+    if baseline not in results or not results[baseline]['accuracy']:
+        # No usable baseline measurement - never trade accuracy blind
+        return baseline
+    floor = results[baseline]['accuracy'] - max_accuracy_drop
+    candidates = [
+        (r['bytes'], r['encode_ms'], name)
+        for name, r in results.items()
+        if r['accuracy'] >= floor
+    ]
+    return min(candidates)[2] if candidates else baseline
@@ -3,9 +3,12 @@ Excel Export Module - Template-Specific
 Creates formatted Excel files with voter data based on template type
 """
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
+import marshal
 import re
+import tempfile
 
 # Template-specific column definitions
 TEMPLATE_COLUMNS = {
@@ -251,6 +254,14 @@ DEFAULT_HEADERS = [
 ]
 
 
+# Precompiled patterns for parse_boothwise_header
+_BOOTHWISE_COUNCIL = re.compile(r'परिषद\s*नगर\s*([^\n]+)')
+_BOOTHWISE_WARD = re.compile(r'प्रभाग\s*क्र\s*[:\s]*([^\n]+)')
+_BOOTHWISE_STATION = re.compile(r'मतदान\s*केंद्र\s*[:\s]*(.+?)(?:\n|$)')
+_BOOTHWISE_PART = re.compile(r'यादी\s*भाग\s*क्र[.\s:]*(\d+|[०-९]+)')
+_BOOTHWISE_ADDR = re.compile(r'यादी\s*भाग\s*क्र[^:]*:\s*[^\-–]*[-–]\s*(.+?)(?:\n|$)')
+
+
 def parse_boothwise_header(raw_header):
     """
     Parse boothwise raw header text into structured fields
@@ -273,34 +284,42 @@ def parse_boothwise_header(raw_header):
         return result
     
     # Parse council name (परिषद नगर X)
-    council_match = re.search(r'परिषद\s*नगर\s*([^\n]+)', raw_header)
+    council_match = _BOOTHWISE_COUNCIL.search(raw_header)
     if council_match:
         result['council_name'] = council_match.group(1).strip()
     
     # Parse ward number (प्रभाग क्र : X)
-    ward_match = re.search(r'प्रभाग\s*क्र\s*[:\s]*([^\n]+)', raw_header)
+    ward_match = _BOOTHWISE_WARD.search(raw_header)
     if ward_match:
         result['ward_no'] = ward_match.group(1).strip()
     
     # Parse polling station (मतदान केंद्र : X) - capture everything after मतदान केंद्र
-    station_match = re.search(r'मतदान\s*केंद्र\s*[:\s]*(.+?)(?:\n|$)', raw_header)
+    station_match = _BOOTHWISE_STATION.search(raw_header)
     if station_match:
         result['polling_station'] = station_match.group(1).strip()
     
     # Parse part number (यादी भाग क्र . X)
-    part_match = re.search(r'यादी\s*भाग\s*क्र[.\s:]*(\d+|[०-९]+)', raw_header)
+    part_match = _BOOTHWISE_PART.search(raw_header)
     if part_match:
         result['part_no'] = part_match.group(1).strip()
     
     # Parse address - text after the second : in यादी भाग line
     # Pattern: यादी भाग क्र . १६२ : ४ - [address]
-    addr_match = re.search(r'यादी\s*भाग\s*क्र[^:]*:\s*[^\-–]*[-–]\s*(.+?)(?:\n|$)', raw_header)
+    addr_match = _BOOTHWISE_ADDR.search(raw_header)
     if addr_match:
         result['polling_address'] = addr_match.group(1).strip()
     
     return result
 
 
+# Precompiled patterns for parse_mahanagarpalika_header
+_MAHANAGARPALIKA_CORP = re.compile(r'महानगरपालिका\s*([^\n]+)')
+_MAHANAGARPALIKA_CORP_ALT = re.compile(r'(चंद्रपूर\s*महानगरपालिका)')
+_MAHANAGARPALIKA_WARD = re.compile(r'([^\n]*प्रभाग\s*क्र[^\n]*)')
+_MAHANAGARPALIKA_PART = re.compile(r'यादी\s*भाग\s*क्र[.\s:]*(\d+|[०-९]+)')
+_MAHANAGARPALIKA_ADDR = re.compile(r'यादी\s*भाग\s*क्र[^:]*:\s*\d*\s*[-–]\s*([^\n]+)')
+
+
 def parse_mahanagarpalika_header(raw_header):
     """
     Parse Mahanagarpalika raw header text into structured fields
@@ -321,12 +340,12 @@ def parse_mahanagarpalika_header(raw_header):
         return result
     
     # Parse corporation name (महानगरपालिका X or चंद्रपूर महानगरपालिका)
-    corp_match = re.search(r'महानगरपालिका\s*([^\n]+)', raw_header)
+    corp_match = _MAHANAGARPALIKA_CORP.search(raw_header)
     if corp_match:
         result['corporation_name'] = 'महानगरपालिका ' + corp_match.group(1).strip()
     else:
         # Alternative: look for "चंद्रपूर महानगरपालिका" anywhere
-        corp_alt = re.search(r'(चंद्रपूर\s*महानगरपालिका)', raw_header)
+        corp_alt = _MAHANAGARPALIKA_CORP_ALT.search(raw_header)
         if corp_alt:
             result['corporation_name'] = corp_alt.group(1).strip()
         else:
@@ -335,24 +354,35 @@ def parse_mahanagarpalika_header(raw_header):
                 result['corporation_name'] = 'महानगरपालिका'
     
     # Parse ward (भानापेठ ११ – प्रभाग क्र)
-    ward_match = re.search(r'([^\n]*प्रभाग\s*क्र[^\n]*)', raw_header)
+    ward_match = _MAHANAGARPALIKA_WARD.search(raw_header)
     if ward_match:
         result['ward'] = ward_match.group(1).strip()
     
     # Parse part number (यादी भाग क्र . १५८)
-    part_match = re.search(r'यादी\s*भाग\s*क्र[.\s:]*(\d+|[०-९]+)', raw_header)
+    part_match = _MAHANAGARPALIKA_PART.search(raw_header)
     if part_match:
         result['part_no'] = part_match.group(1).strip()
     
     # Parse address (after : १ - in यादी भाग line)
     # Pattern: यादी भाग क्र . १५८ : १ - [address]
-    addr_match = re.search(r'यादी\s*भाग\s*क्र[^:]*:\s*\d*\s*[-–]\s*([^\n]+)', raw_header)
+    addr_match = _MAHANAGARPALIKA_ADDR.search(raw_header)
     if addr_match:
         result['address'] = addr_match.group(1).strip()
     
     return result
 
 
+# Precompiled patterns for parse_zp_boothwise_header
+_ZP_DISTRICT = re.compile(r'(परिषद[^\n]*जिल्हा[^\n]*|जिल्हा[^\n]*परिषद[^\n]*)')
+_ZP_DIVISION = re.compile(r'([^\n]*(?:निवार्चन|विभाग)[^\n]*?)(?:\s*[-–]\s*गण|\s*गण)')
+_ZP_DIVISION_FALLBACK = re.compile(r'([^\n]*विभाग[^\n]+)')
+_ZP_GAN = re.compile(r'गण\s*[:\s]*(\d+|[०-९]+)')
+_ZP_PART = re.compile(r'भाग\s*क्र[.\s:]*(\d+|[०-९]+)')
+_ZP_STATION = re.compile(r'मतदान\s*केंद्र[:\s]*([^,\n]+)')
+_ZP_ADDR = re.compile(r',\s*([^,\n]+?)\s*पत्ता')
+_ZP_ADDR_FALLBACK = re.compile(r'पत्ता\s*[:\s]+([^\n]+)')
+
+
 def parse_zp_boothwise_header(raw_header):
     """
     Parse ZP Boothwise raw header text into structured fields
@@ -376,50 +406,56 @@ def parse_zp_boothwise_header(raw_header):
         return result
     
     # Parse district council - first line containing "जिल्हा" or "परिषद"
-    district_match = re.search(r'(परिषद[^\n]*जिल्हा[^\n]*|जिल्हा[^\n]*परिषद[^\n]*)', raw_header)
+    district_match = _ZP_DISTRICT.search(raw_header)
     if district_match:
         result['district_council'] = district_match.group(1).strip()
     
     # Parse election division - line containing निवार्चन or विभाग
     # Get everything from start of line up to गण
-    division_match = re.search(r'([^\n]*(?:निवार्चन|विभाग)[^\n]*?)(?:\s*[-–]\s*गण|\s*गण)', raw_header)
+    division_match = _ZP_DIVISION.search(raw_header)
     if division_match:
         result['election_division'] = division_match.group(1).strip()
     else:
         # Fallback - just get the line with विभाग
-        division_match2 = re.search(r'([^\n]*विभाग[^\n]+)', raw_header)
+        division_match2 = _ZP_DIVISION_FALLBACK.search(raw_header)
         if division_match2:
             result['election_division'] = division_match2.group(1).strip()
     
     # Parse Gan (गण X)
-    gan_match = re.search(r'गण\s*[:\s]*(\d+|[०-९]+)', raw_header)
+    gan_match = _ZP_GAN.search(raw_header)
     if gan_match:
         result['gan'] = gan_match.group(1).strip()
     
     # Parse part number (भाग क्र . X or यादी भाग X)
-    part_match = re.search(r'भाग\s*क्र[.\s:]*(\d+|[०-९]+)', raw_header)
+    part_match = _ZP_PART.search(raw_header)
     if part_match:
         result['part_no'] = part_match.group(1).strip()
     
     # Parse polling station - line containing मतदान केंद्र
-    station_match = re.search(r'मतदान\s*केंद्र[:\s]*([^,\n]+)', raw_header)
+    station_match = _ZP_STATION.search(raw_header)
     if station_match:
         result['polling_station'] = station_match.group(1).strip()
     
     # Parse address - text between comma and पत्ता (e.g., जि.प.प्रा.शाळा)
     # Pattern: ...मतदान केंद्र कोळसा , जि.प.प्रा.शाळा पत्ता :
-    addr_match = re.search(r',\s*([^,\n]+?)\s*पत्ता', raw_header)
+    addr_match = _ZP_ADDR.search(raw_header)
     if addr_match:
         result['address'] = addr_match.group(1).strip()
     else:
         # Fallback - try to get anything after पत्ता :
-        addr_match2 = re.search(r'पत्ता\s*[:\s]+([^\n]+)', raw_header)
+        addr_match2 = _ZP_ADDR_FALLBACK.search(raw_header)
         if addr_match2 and addr_match2.group(1).strip():
             result['address'] = addr_match2.group(1).strip()
     
     return result
 
 
+# Precompiled patterns for parse_ac_wise_header
+_AC_WISE_ASSEMBLY = re.compile(r'विधानसभा\s*मतदारसंघ\s*क्रमांक\s*आणि\s*नाव\s*[:\s]*([^\n]+)')
+_AC_WISE_DIVISION = re.compile(r'विभाग\s*क्रमांक\s*आणि\s*नाव\s*[:\s]*([^\n]+)')
+_AC_WISE_PART = re.compile(r'यादी\s*भाग\s*क्रमांक\s*[:\s]*(\d+)')
+
+
 def parse_ac_wise_header(raw_header):
     """
     Parse AC Wise Low Quality raw header text into structured fields
@@ -438,24 +474,352 @@ def parse_ac_wise_header(raw_header):
     
     
     # Parse assembly constituency (विधानसभा मतदारसंघ क्रमांक आणि नाव : X)
-    assembly_match = re.search(r'विधानसभा\s*मतदारसंघ\s*क्रमांक\s*आणि\s*नाव\s*[:\s]*([^\n]+)', raw_header)
+    assembly_match = _AC_WISE_ASSEMBLY.search(raw_header)
     if assembly_match:
         result['assembly_constituency'] = assembly_match.group(1).strip()
     
     # Parse division (विभाग क्रमांक आणि नाव X)
-    division_match = re.search(r'विभाग\s*क्रमांक\s*आणि\s*नाव\s*[:\s]*([^\n]+)', raw_header)
+    division_match = _AC_WISE_DIVISION.search(raw_header)
     if division_match:
         result['division'] = division_match.group(1).strip()
         
     # Parse Part No (यादी भाग क्रमांक : X)
-    part_match = re.search(r'यादी\s*भाग\s*क्रमांक\s*[:\s]*(\d+)', raw_header)
+    part_match = _AC_WISE_PART.search(raw_header)
     if part_match:
         result['part_no'] = part_match.group(1).strip()
     
     return result
 
 
-def export_to_excel(voters, output_path, template='default'):
+# Voter key holding header fields read back from an earlier export (see
+# session_import); used instead of parsing header_raw_text
+IMPORTED_HEADER = 'imported_header'
+
+
+class HeaderParseCache:
+    """
+    Memo of one header parser for the duration of an export.
+    All voters on a page - usually a whole PDF - share the same
+    header_raw_text, so each distinct header is parsed once and every
+    further voter only looks up the cached dict (treat it as read-only).
+    """
+
+    def __init__(self, parser):
+        self.parser = parser
+        self._parsed = {}
+
+    def get(self, raw_header):
+        parsed = self._parsed.get(raw_header)
+        if parsed is None:
+            parsed = self._parsed[raw_header] = self.parser(raw_header)
+        return parsed
+
+    def for_voter(self, voter):
+        """Parsed header of a voter (imported header fields take precedence)"""
+        if IMPORTED_HEADER in voter:
+            return voter[IMPORTED_HEADER]
+        return self.get(voter.get('header_raw_text', ''))
+
+    def __len__(self):
+        return len(self._parsed)
+
+
+# Column data keys of the default (generic) export, in DEFAULT_HEADERS order
+DEFAULT_DATA_KEYS = [
+    'page_number', 'assembly_name', 'part_no', 'polling_station', 'polling_address',
+    'serial_excel', 'epic', 'name_marathi', 'name_english', 'relation_type',
+    'relation_name_marathi', 'relation_name_english', 'house_no', 'age', 'gender',
+    'header_raw_text'
+]
+
+# Data key holding the 1-based Excel serial number
+SERIAL_KEY = 'serial_excel'
+
+
+def header_field(parsed_key, fallback=None):
+    """Column read from the parsed header, else from voter[fallback] (if given)"""
+    return ('header', parsed_key, fallback)
+
+
+# Export registry: template key -> header parser and the data keys that come
+# from the parsed header. Every other data key in TEMPLATE_COLUMNS is read
+# straight from the voter record. Adding a template = TEMPLATE_COLUMNS entry
+# plus an entry here.
+_BOOTHWISE_EXPORT = {
+    'parser': parse_boothwise_header,
+    'header_fields': {
+        'council_name': header_field('council_name', 'header_booth'),
+        'ward_no': header_field('ward_no'),
+        'polling_station': header_field('polling_station', 'polling_station'),
+        'part_no': header_field('part_no', 'part_no'),
+        'polling_address': header_field('polling_address', 'polling_address'),
+    }
+}
+
+_MAHANAGARPALIKA_EXPORT = {
+    'parser': parse_mahanagarpalika_header,
+    'header_fields': {
+        'corporation_name': header_field('corporation_name'),
+        'ward': header_field('ward'),
+        'part_no': header_field('part_no', 'part_no'),
+        'address': header_field('address', 'polling_address'),
+    }
+}
+
+_ZP_BOOTHWISE_EXPORT = {
+    'parser': parse_zp_boothwise_header,
+    'header_fields': {
+        'district_council': header_field('district_council'),
+        'election_division': header_field('election_division'),
+        'gan': header_field('gan'),
+        'part_no': header_field('part_no', 'part_no'),
+        'polling_station': header_field('polling_station', 'polling_station'),
+        'address': header_field('address', 'polling_address'),
+    }
+}
+
+_AC_WISE_EXPORT = {
+    'parser': parse_ac_wise_header,
+    'header_fields': {
+        'assembly_constituency': header_field('assembly_constituency'),
+        'division': header_field('division'),
+        'part_no': header_field('part_no'),
+    }
+}
+
+EXPORT_REGISTRY = {
+    'boothwise': _BOOTHWISE_EXPORT,
+    'mahanagpalika': _MAHANAGARPALIKA_EXPORT,
+    'mahanagarpalika': _MAHANAGARPALIKA_EXPORT,
+    'wardwise': _MAHANAGARPALIKA_EXPORT,
+    'ward_wise_data': _MAHANAGARPALIKA_EXPORT,
+    'mahanagpalika_data': _MAHANAGARPALIKA_EXPORT,
+    'zp_boothwise': _ZP_BOOTHWISE_EXPORT,
+    'boothlist_division': _ZP_BOOTHWISE_EXPORT,
+    'ac_wise_low_quality': _AC_WISE_EXPORT,
+}
+
+
+def _column_accessor(column):
+    """accessor(voter, serial, parsed) -> cell value for one column"""
+    if column == SERIAL_KEY:
+        return lambda voter, serial, parsed: serial
+    if isinstance(column, tuple):
+        _, parsed_key, fallback = column
+        if fallback is None:
+            return lambda voter, serial, parsed: parsed.get(parsed_key, '')
+        return lambda voter, serial, parsed: parsed.get(parsed_key) or voter.get(fallback, '')
+    return lambda voter, serial, parsed: voter.get(column, '')
+
+
+def make_row_builder(columns):
+    """
+    build_row(voter, serial, parsed) -> tuple of cell values, from the
+    column accessors: SERIAL_KEY, header_field(...) or any other string (a
+    voter field, '' when missing).
+    """
+    accessors = tuple(_column_accessor(column) for column in columns)
+
+    def build_row(voter, serial, parsed):
+        return tuple([accessor(voter, serial, parsed) for accessor in accessors])
+
+    return build_row
+
+
+_compiled_templates = {}
+
+
+def get_export_template(template_key):
+    """
+    Headers, data keys, header parser (or None) and row builder of a
+    template. Unknown keys use the default export. Built once per template
+    key.
+
+    Returns:
+        tuple: (headers, data_keys, parser, build_row)
+    """
+    compiled = _compiled_templates.get(template_key)
+    if compiled is None:
+        config = TEMPLATE_COLUMNS.get(template_key)
+        entry = EXPORT_REGISTRY.get(template_key)
+        if config and entry:
+            header_fields = entry['header_fields']
+            columns = [header_fields.get(key, key) for key in config['data_keys']]
+            compiled = (config['headers'], config['data_keys'], entry['parser'], make_row_builder(columns))
+        else:
+            # Default export (for other templates)
+            compiled = (DEFAULT_HEADERS, DEFAULT_DATA_KEYS, None, make_row_builder(DEFAULT_DATA_KEYS))
+        _compiled_templates[template_key] = compiled
+    return compiled
+
+
+def template_key_for(template):
+    """Registry key of a template name ('Ward Wise-Data' -> 'ward_wise_data')"""
+    return (template or 'default').lower().replace(' ', '_').replace('-', '_')
+
+
+def voter_sort_key(voter):
+    """Export order: page, then extraction order on the page (matches UI)"""
+    return (voter.get('page_number', 0), voter.get('extraction_order', 99999))
+
+
+def iter_template_rows(sorted_voters, template_key):
+    """
+    Yield one row (tuple of cell values) per voter for a template.
+    Serial numbers start at 1 (row 1 of the sheet is the header).
+    """
+    _, _, parser, build_row = get_export_template(template_key)
+    if parser is None:
+        for serial, voter in enumerate(sorted_voters, 1):
+            yield build_row(voter, serial, None)
+        return
+
+    parse_header = HeaderParseCache(parser).for_voter
+    for serial, voter in enumerate(sorted_voters, 1):
+        yield build_row(voter, serial, parse_header(voter))
+
+
+MAX_COLUMN_WIDTH = 50
+
+
+class ColumnWidths:
+    """Longest value per column, tracked while rows are written"""
+
+    def __init__(self, headers):
+        self.lengths = [len(str(h)) for h in headers]
+
+    def track(self, row):
+        lengths = self.lengths
+        for i, value in enumerate(row):
+            if value is None or value == '':
+                continue
+            n = len(value) if isinstance(value, str) else len(str(value))
+            if n > lengths[i]:
+                lengths[i] = n
+
+    def apply(self, ws):
+        for col_num, length in enumerate(self.lengths, 1):
+            ws.column_dimensions[get_column_letter(col_num)].width = min(length + 2, MAX_COLUMN_WIDTH)
+
+
+class RowSpool:
+    """
+    Rows buffered in a temporary file (marshal), so a write-only sheet can
+    be given its final column widths before any row is streamed into it.
+    Memory use does not grow with the number of rows. Give a path to
+    spool into a named file that another process can read (see read_spool).
+    """
+
+    def __init__(self, path=None):
+        self._file = open(path, 'w+b') if path else tempfile.TemporaryFile()
+        self.count = 0
+
+    def append(self, row):
+        marshal.dump(tuple(v if v is None or isinstance(v, (str, int, float)) else str(v) for v in row), self._file)
+        self.count += 1
+
+    def __iter__(self):
+        self._file.seek(0)
+        for _ in range(self.count):
+            yield marshal.load(self._file)
+
+    def close(self):
+        self._file.close()
+
+
+def read_spool(path, count):
+    """Rows of a closed, named RowSpool"""
+    with open(path, 'rb') as f:
+        for _ in range(count):
+            yield marshal.load(f)
+
+
+def _header_cells(ws, headers):
+    """Styled header row cells (usable with write-only worksheets)"""
+    header_font = Font(bold=True, color="FFFFFF", size=11)
+    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    header_alignment = Alignment(horizontal="center", vertical="center")
+    cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = header_alignment
+        cells.append(cell)
+    return cells
+
+
+# Rows between progress callbacks
+PROGRESS_EVERY = 2000
+
+
+def write_streaming_sheet(wb, title, headers, rows, progress=None):
+    """
+    Stream rows into a new write-only worksheet of `wb`.
+    Widths are tracked while rows are spooled, then the sheet is written
+    top to bottom (widths, frozen header, filter, rows) in one pass.
+
+    Returns:
+        int: Number of data rows written
+    """
+    widths = ColumnWidths(headers)
+    spool = RowSpool()
+    try:
+        for row in rows:
+            widths.track(row)
+            spool.append(row)
+        return write_spooled_sheet(wb, title, headers, widths, spool, progress=progress)
+    finally:
+        spool.close()
+
+
+def write_spooled_sheet(wb, title, headers, widths, spool, index=None, progress=None):
+    """
+    Write already spooled rows (and their tracked widths) as a new
+    write-only worksheet, at position `index` if given.
+    progress(done, total) is called every PROGRESS_EVERY rows and may
+    raise to abort the export.
+
+    Returns:
+        int: Number of data rows written
+    """
+    ws = wb.create_sheet(title, index)
+    widths.apply(ws)
+    ws.freeze_panes = 'A2'
+    ws.auto_filter.ref = f"A1:{get_column_letter(len(headers))}{spool.count + 1}"
+    ws.append(_header_cells(ws, headers))
+    if progress is None:
+        for row in spool:
+            ws.append(row)
+        return spool.count
+
+    try:
+        for done, row in enumerate(spool, 1):
+            ws.append(row)
+            if done % PROGRESS_EVERY == 0:
+                progress(done, spool.count)
+        progress(spool.count, spool.count)
+    except BaseException:
+        _discard_sheet(ws)
+        raise
+    return spool.count
+
+
+def _discard_sheet(ws):
+    """
+    Finish and delete an abandoned write-only sheet's temp file.
+    openpyxl only removes it when the workbook is saved; saving a throwaway
+    copy would zip every row written so far, so its writer is cleaned up
+    directly and a failure (e.g. changed openpyxl internals) is reported.
+    """
+    try:
+        ws.close()
+        ws._writer.cleanup()
+    except (AttributeError, OSError) as e:
+        print(f"⚠️ Could not remove the temp file of cancelled sheet '{ws.title}': {e}")
+
+
+def export_to_excel(voters, output_path, template='default', streaming=True, progress=None):
     """
     Export voters to formatted Excel file
     
@@ -463,201 +827,49 @@ def export_to_excel(voters, output_path, template='default'):
         voters: List of voter dictionaries
         output_path: Path to save Excel file
         template: Template type (boothwise, ac_wise, etc.)
+        streaming: Use a write-only workbook (flat memory for large batches)
+        progress: Optional progress(done, total) callback (rows); raising
+                  from it aborts the export before anything is saved
     """
     if not voters or len(voters) == 0:
         raise ValueError("Cannot export: No voter records provided")
     
     print(f"📊 Excel Export: {len(voters)} records, Template: {template}")
     
-    # Create workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Voter Data"
-    
     # Get template-specific columns or use default
-    template_key = template.lower().replace(' ', '_').replace('-', '_')
-    template_config = TEMPLATE_COLUMNS.get(template_key, None)
-    
-    if template_config:
-        headers = template_config['headers']
-        data_keys = template_config['data_keys']
-    else:
-        headers = DEFAULT_HEADERS
-        data_keys = None  # Use default mapping
-    
-    # Style definitions
-    header_font = Font(bold=True, color="FFFFFF", size=11)
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-    header_alignment = Alignment(horizontal="center", vertical="center")
-    
-    # Add headers
-    for col_num, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col_num)
-        cell.value = header
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_alignment
+    template_key = template_key_for(template)
+    headers = get_export_template(template_key)[0]
     
     # Sort voters by extraction order (matches UI)
-    def get_sort_key(v):
-        page = v.get('page_number', 0)
-        ext_order = v.get('extraction_order', 99999)
-        return (page, ext_order)
-    
-    sorted_voters = sorted(voters, key=get_sort_key)
-    
-    # Process voters based on template
-    if template_key == 'boothwise':
-        for row_num, voter in enumerate(sorted_voters, 2):
-            # Parse header into structured fields
-            raw_header = voter.get('header_raw_text', '')
-            parsed = parse_boothwise_header(raw_header)
-            
-            # Merge parsed header with existing voter data
-            voter_data = {
-                'serial_excel': row_num - 1,
-                'council_name': parsed.get('council_name') or voter.get('header_booth', ''),
-                'ward_no': parsed.get('ward_no', ''),
-                'polling_station': parsed.get('polling_station') or voter.get('polling_station', ''),
-                'part_no': parsed.get('part_no') or voter.get('part_no', ''),
-                'polling_address': parsed.get('polling_address') or voter.get('polling_address', ''),
-                'epic': voter.get('epic', ''),
-                'name_marathi': voter.get('name_marathi', ''),
-                'name_english': voter.get('name_english', ''),
-                'relation_type': voter.get('relation_type', ''),
-                'relation_name_marathi': voter.get('relation_name_marathi', ''),
-                'relation_name_english': voter.get('relation_name_english', ''),
-                'house_no': voter.get('house_no', ''),
-                'age': voter.get('age', ''),
-                'gender': voter.get('gender', '')
-            }
-            
-            # Write data
-            for col_num, key in enumerate(data_keys, 1):
-                ws.cell(row=row_num, column=col_num, value=voter_data.get(key, ''))
-    elif template_key in ('mahanagpalika', 'mahanagarpalika', 'wardwise', 'ward_wise_data'):
-        for row_num, voter in enumerate(sorted_voters, 2):
-            # Parse header into structured fields
-            raw_header = voter.get('header_raw_text', '')
-            parsed = parse_mahanagarpalika_header(raw_header)
-            
-            # Merge parsed header with existing voter data
-            voter_data = {
-                'serial_excel': row_num - 1,
-                'corporation_name': parsed.get('corporation_name', ''),
-                'ward': parsed.get('ward', ''),
-                'part_no': parsed.get('part_no') or voter.get('part_no', ''),
-                'address': parsed.get('address') or voter.get('polling_address', ''),
-                'epic': voter.get('epic', ''),
-                'name_marathi': voter.get('name_marathi', ''),
-                'name_english': voter.get('name_english', ''),
-                'relation_type': voter.get('relation_type', ''),
-                'relation_name_marathi': voter.get('relation_name_marathi', ''),
-                'relation_name_english': voter.get('relation_name_english', ''),
-                'house_no': voter.get('house_no', ''),
-                'age': voter.get('age', ''),
-                'gender': voter.get('gender', '')
-            }
-            
-            # Write data
-            for col_num, key in enumerate(data_keys, 1):
-                ws.cell(row=row_num, column=col_num, value=voter_data.get(key, ''))
-    elif template_key in ('zp_boothwise', 'boothlist_division'):
-        for row_num, voter in enumerate(sorted_voters, 2):
-            # Parse header into structured fields
-            raw_header = voter.get('header_raw_text', '')
-            parsed = parse_zp_boothwise_header(raw_header)
-            
-            # Merge parsed header with existing voter data
-            voter_data = {
-                'serial_excel': row_num - 1,
-                'district_council': parsed.get('district_council', ''),
-                'election_division': parsed.get('election_division', ''),
-                'gan': parsed.get('gan', ''),
-                'part_no': parsed.get('part_no') or voter.get('part_no', ''),
-                'polling_station': parsed.get('polling_station') or voter.get('polling_station', ''),
-                'address': parsed.get('address') or voter.get('polling_address', ''),
-                'epic': voter.get('epic', ''),
-                'name_marathi': voter.get('name_marathi', ''),
-                'name_english': voter.get('name_english', ''),
-                'relation_type': voter.get('relation_type', ''),
-                'relation_name_marathi': voter.get('relation_name_marathi', ''),
-                'relation_name_english': voter.get('relation_name_english', ''),
-                'house_no': voter.get('house_no', ''),
-                'age': voter.get('age', ''),
-                'gender': voter.get('gender', '')
-            }
-            
-            # Write data
-            for col_num, key in enumerate(data_keys, 1):
-                ws.cell(row=row_num, column=col_num, value=voter_data.get(key, ''))
-    elif template_key == 'ac_wise_low_quality':
-        for row_num, voter in enumerate(sorted_voters, 2):
-            # Parse header into structured fields
-            raw_header = voter.get('header_raw_text', '')
-            parsed = parse_ac_wise_header(raw_header)
-            
-            # Merge parsed header with existing voter data
-            voter_data = {
-                'serial_excel': row_num - 1,
-                'assembly_constituency': parsed.get('assembly_constituency', ''),
-                'division': parsed.get('division', ''),
-                'part_no': parsed.get('part_no', ''),
-                'epic': voter.get('epic', ''),
-                'name_marathi': voter.get('name_marathi', ''),
-                'name_english': voter.get('name_english', ''),
-                'relation_type': voter.get('relation_type', ''),
-                'relation_name_marathi': voter.get('relation_name_marathi', ''),
-                'relation_name_english': voter.get('relation_name_english', ''),
-                'house_no': voter.get('house_no', ''),
-                'age': voter.get('age', ''),
-                'gender': voter.get('gender', '')
-            }
-            
-            # Write data
-            for col_num, key in enumerate(data_keys, 1):
-                ws.cell(row=row_num, column=col_num, value=voter_data.get(key, ''))
+    sorted_voters = sorted(voters, key=voter_sort_key)
+    rows = iter_template_rows(sorted_voters, template_key)
+    
+    if streaming:
+        wb = Workbook(write_only=True)
+        count = write_streaming_sheet(wb, "Voter Data", headers, rows, progress=progress)
     else:
-        # Default export (for other templates)
-        for row_num, voter in enumerate(sorted_voters, 2):
-            excel_serial = row_num - 1
-            ws.cell(row=row_num, column=1, value=voter.get('page_number', ''))
-            ws.cell(row=row_num, column=2, value=voter.get('assembly_name', ''))
-            ws.cell(row=row_num, column=3, value=voter.get('part_no', ''))
-            ws.cell(row=row_num, column=4, value=voter.get('polling_station', ''))
-            ws.cell(row=row_num, column=5, value=voter.get('polling_address', ''))
-            ws.cell(row=row_num, column=6, value=excel_serial)
-            ws.cell(row=row_num, column=7, value=voter.get('epic', ''))
-            ws.cell(row=row_num, column=8, value=voter.get('name_marathi', ''))
-            ws.cell(row=row_num, column=9, value=voter.get('name_english', ''))
-            ws.cell(row=row_num, column=10, value=voter.get('relation_type', ''))
-            ws.cell(row=row_num, column=11, value=voter.get('relation_name_marathi', ''))
-            ws.cell(row=row_num, column=12, value=voter.get('relation_name_english', ''))
-            ws.cell(row=row_num, column=13, value=voter.get('house_no', ''))
-            ws.cell(row=row_num, column=14, value=voter.get('age', ''))
-            ws.cell(row=row_num, column=15, value=voter.get('gender', ''))
-            ws.cell(row=row_num, column=16, value=voter.get('header_raw_text', ''))
-    
-    # Auto-adjust column widths
-    for col_num in range(1, len(headers) + 1):
-        column_letter = get_column_letter(col_num)
-        max_length = 0
-        for cell in ws[column_letter]:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        ws.column_dimensions[column_letter].width = adjusted_width
-    
-    # Add filters
-    ws.auto_filter.ref = ws.dimensions
-    
-    # Freeze top row
-    ws.freeze_panes = 'A2'
+        # In-memory workbook (small exports that are edited further)
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Voter Data"
+        ws.append(_header_cells(ws, headers))
+        widths = ColumnWidths(headers)
+        count = 0
+        for row in rows:
+            widths.track(row)
+            ws.append(row)
+            count += 1
+            if progress and count % PROGRESS_EVERY == 0:
+                progress(count, len(sorted_voters))
+        widths.apply(ws)
+        
+        # Add filters
+        ws.auto_filter.ref = ws.dimensions
+        
+        # Freeze top row
+        ws.freeze_panes = 'A2'
     
     # Save workbook
     wb.save(output_path)
     print(f"✅ Excel file saved: {output_path}")
-    print(f"✅ Exported {len(sorted_voters)} records")
+    print(f"✅ Exported {count} records")
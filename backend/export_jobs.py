@@ -0,0 +1,92 @@
+"""
+Background Export Jobs
+Runs an export on a worker thread so the pywebview bridge call returns at
+once; the UI polls the job's progress and can cancel it
+"""
+import threading
+import time
+import uuid
+
+
+class ExportCancelled(Exception):
+    """Raised inside an export (from its progress callback) once cancelled"""
+
+
+class ExportJob:
+    """
+    One background export. The export function receives the job and
+    reports through job.progress(done, total), which also stops the
+    export (ExportCancelled) after cancel(). listener() is called on every
+    progress or status change.
+    """
+
+    def __init__(self, output_path, records, listener=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.output_path = output_path
+        self.records = records
+        self.status = 'queued'
+        self.done = 0
+        self.total = records
+        self.result = None
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.listener = listener
+        self._cancel = threading.Event()
+
+    def _changed(self):
+        if self.listener:
+            self.listener()
+
+    def progress(self, done, total):
+        """Progress callback for the exporters"""
+        if self._cancel.is_set():
+            raise ExportCancelled()
+        self.done, self.total = done, total
+        self._changed()
+
+    def cancel(self):
+        """Ask the export to stop; returns False if it already finished"""
+        self._cancel.set()
+        return self.status in ('queued', 'running')
+
+    def start(self, target):
+        """Run target(job) on a daemon thread; its return value becomes job.result"""
+        self.status = 'running'
+        self.started = time.time()
+        threading.Thread(target=self._run, args=(target,), name=f'export-{self.id}', daemon=True).start()
+
+    def _run(self, target):
+        try:
+            self.result = target(self)
+            self.status = 'done'
+        except ExportCancelled:
+            self.status = 'cancelled'
+        except Exception as e:
+            self.error = str(e)
+            self.status = 'failed'
+        finally:
+            self.finished = time.time()
+            self._changed()
+
+    @property
+    def percent(self):
+        if self.status == 'done':
+            return 100
+        if not self.total:
+            return 0
+        # Saving the workbook follows the last row
+        return min(99, int(self.done * 100 / self.total))
+
+    def snapshot(self):
+        elapsed = (self.finished or time.time()) - self.started if self.started else 0
+        return {
+            'id': self.id,
+            'status': self.status,
+            'percent': self.percent,
+            'records': self.records,
+            'path': self.output_path,
+            'files': (self.result or {}).get('files', []),
+            'error': self.error,
+            'elapsed': round(elapsed, 1)
+        }
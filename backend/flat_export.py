@@ -0,0 +1,423 @@
+"""
+Flat File Export Module - CSV, JSONL and Parquet
+Streaming exporters for downstream ETL. They share the template column
+mapping (TEMPLATE_COLUMNS / export registry) with the Excel export and
+can be written incrementally, a page or a PDF at a time.
+"""
+import csv
+import importlib.util
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+
+from openpyxl import Workbook
+
+from .excel_export import (
+    ColumnWidths, HeaderParseCache, RowSpool, export_to_excel, get_export_template, template_key_for,
+    voter_sort_key, write_spooled_sheet, write_streaming_sheet, SERIAL_KEY
+)
+
+# Parquet rows buffered per row group
+PARQUET_ROW_GROUP_SIZE = 50000
+
+
+class FlatExportWriter(ABC):
+    """
+    Base streaming writer; subclasses open the file, write row tuples and
+    close it. write() may be called any number of times;
+    serial numbers continue across calls, and each distinct page header
+    is parsed once for the whole file.
+
+    Usage:
+        with CsvExportWriter(path, template) as writer:
+            writer.write(voters_of_page)
+    """
+
+    def __init__(self, output_path, template='default'):
+        self.output_path = output_path
+        self.template_key = template_key_for(template)
+        self.headers, self.data_keys, parser, self._build_row = get_export_template(self.template_key)
+        self._parse_header = HeaderParseCache(parser).for_voter if parser else None
+        self.count = 0
+        self._open()
+
+    def _rows(self, voters):
+        build_row, parse_header = self._build_row, self._parse_header
+        serial = self.count
+        for voter in voters:
+            serial += 1
+            parsed = parse_header(voter) if parse_header else None
+            yield build_row(voter, serial, parsed)
+        self.count = serial
+
+    def write(self, voters):
+        """
+        Append voters (already in export order) to the file.
+
+        Returns:
+            int: Number of rows written
+        """
+        before = self.count
+        self._write_rows(self._rows(voters))
+        return self.count - before
+
+    def flush(self):
+        """Push written rows to disk (so they survive a crash)"""
+
+    @abstractmethod
+    def close(self):
+        """Finish and close the output"""
+
+    @abstractmethod
+    def _open(self):
+        """Create the output and write its header"""
+
+    @abstractmethod
+    def _write_rows(self, rows):
+        """Write an iterable of row tuples"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class SheetExportWriter(FlatExportWriter):
+    """Rows spooled for one write-only worksheet, column widths tracked on the way"""
+
+    def _open(self):
+        self.widths = ColumnWidths(self.headers)
+        self.spool = RowSpool()
+
+    def _write_rows(self, rows):
+        track, append = self.widths.track, self.spool.append
+        for row in rows:
+            track(row)
+            append(row)
+
+    def close(self):
+        self.spool.close()
+
+
+class CsvExportWriter(FlatExportWriter):
+    """CSV with a UTF-8 BOM so Excel shows Marathi text correctly"""
+
+    def _open(self):
+        self._file = open(self.output_path, 'w', encoding='utf-8-sig', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.headers)
+
+    def _write_rows(self, rows):
+        self._writer.writerows(rows)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class JsonlExportWriter(FlatExportWriter):
+    """One JSON object per voter, keyed by the template's data keys"""
+
+    def _open(self):
+        self._file = open(self.output_path, 'w', encoding='utf-8')
+
+    def _write_rows(self, rows):
+        keys = self.data_keys
+        self._file.writelines(json.dumps(dict(zip(keys, row)), ensure_ascii=False) + '\n' for row in rows)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetExportWriter(FlatExportWriter):
+    """
+    Columnar Parquet (needs pyarrow). Columns are named by data key;
+    the serial number is int64 and every other column a string.
+    Rows are buffered and written in row groups.
+    """
+
+    def _open(self):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+
+        self._pa = pa
+        self._schema = pa.schema([
+            (key, pa.int64() if key == SERIAL_KEY else pa.string()) for key in self.data_keys
+        ])
+        self._writer = pq.ParquetWriter(self.output_path, self._schema)
+        self._columns = [[] for _ in self.data_keys]
+        self._buffered = 0
+
+    def _write_rows(self, rows):
+        serial_index = self.data_keys.index(SERIAL_KEY) if SERIAL_KEY in self.data_keys else -1
+        columns = self._columns
+        for row in rows:
+            for i, value in enumerate(row):
+                if i != serial_index and value is not None and not isinstance(value, str):
+                    value = str(value)
+                columns[i].append(value)
+            self._buffered += 1
+            if self._buffered >= PARQUET_ROW_GROUP_SIZE:
+                self._flush()
+
+    def _flush(self):
+        if not self._buffered:
+            return
+        batch = self._pa.RecordBatch.from_pydict(dict(zip(self.data_keys, self._columns)), schema=self._schema)
+        self._writer.write_batch(batch)
+        self._columns = [[] for _ in self.data_keys]
+        self._buffered = 0
+
+    def close(self):
+        try:
+            self._flush()
+        finally:
+            self._writer.close()
+
+
+EXPORT_WRITERS = {
+    'csv': CsvExportWriter,
+    'jsonl': JsonlExportWriter,
+    'parquet': ParquetExportWriter,
+}
+
+# Formats selectable for batch output (file extension = format name)
+EXPORT_FORMATS = ('xlsx',) + tuple(EXPORT_WRITERS)
+
+# Batch output as one workbook with a sheet per PDF (see WorkbookExportSink)
+WORKBOOK_FORMAT = 'workbook'
+BATCH_FORMATS = EXPORT_FORMATS + (WORKBOOK_FORMAT,)
+
+# pyarrow is optional (see requirements.txt)
+PARQUET_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+
+def available_batch_formats():
+    """BATCH_FORMATS that can be written in this install"""
+    return [f for f in BATCH_FORMATS if f != 'parquet' or PARQUET_AVAILABLE]
+
+
+def export_voters(voters, output_path, template='default', output_format='xlsx'):
+    """
+    Export voters in one of EXPORT_FORMATS.
+
+    Returns:
+        int: Number of records written
+    """
+    output_format = (output_format or 'xlsx').lower()
+    if output_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {output_format} (expected one of {', '.join(EXPORT_FORMATS)})")
+    if not voters:
+        raise ValueError("Cannot export: No voter records provided")
+
+    if output_format == 'xlsx':
+        export_to_excel(voters, output_path, template=template)
+        return len(voters)
+
+    print(f"📄 {output_format.upper()} Export: {len(voters)} records, Template: {template}")
+    with EXPORT_WRITERS[output_format](output_path, template) as writer:
+        writer.write(sorted(voters, key=voter_sort_key))
+    print(f"✅ Exported {writer.count} records to {output_path}")
+    return writer.count
+
+
+class IncrementalExportSink:
+    """
+    Export written page by page while a PDF is processed.
+
+    Each write_page() appends one accepted page, in (page_number,
+    extraction_order) order, and flushes it to '<output>.partial', so the
+    export is nearly done when OCR finishes and a crash leaves the pages
+    completed so far on disk. close() renames the finished file into place.
+
+    Excel files can't be appended to, so for xlsx the rows go to a JSONL
+    journal ('<output>.partial.jsonl') that close() streams into the
+    workbook.
+    """
+
+    def __init__(self, output_path, template='default', output_format='xlsx'):
+        output_format = (output_format or 'xlsx').lower()
+        if output_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {output_format} (expected one of {', '.join(EXPORT_FORMATS)})")
+        self.output_path = output_path
+        self.template = template
+        self.output_format = output_format
+        if output_format == 'xlsx':
+            self.partial_path = output_path + '.partial.jsonl'
+            self._writer = JsonlExportWriter(self.partial_path, template)
+        else:
+            self.partial_path = output_path + '.partial'
+            self._writer = EXPORT_WRITERS[output_format](self.partial_path, template)
+        self.pages = 0
+        self._closed = False
+
+    @property
+    def count(self):
+        return self._writer.count
+
+    def write_page(self, voters):
+        """Append one page's voters and flush them to disk"""
+        self._writer.write(sorted(voters, key=voter_sort_key))
+        self._writer.flush()
+        self.pages += 1
+
+    def close(self):
+        """
+        Finish the output file.
+
+        Returns:
+            int: Number of records exported
+        """
+        self._closed = True
+        self._writer.close()
+        if self.output_format == 'xlsx':
+            self._journal_to_excel()
+            os.remove(self.partial_path)
+        else:
+            os.replace(self.partial_path, self.output_path)
+        print(f"✅ Exported {self.count} records to {self.output_path} ({self.pages} pages written incrementally)")
+        return self.count
+
+    def _journal_to_excel(self):
+        def rows():
+            with open(self.partial_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    yield tuple(json.loads(line).values())
+
+        wb = Workbook(write_only=True)
+        write_streaming_sheet(wb, "Voter Data", self._writer.headers, rows())
+        wb.save(self.output_path)
+
+    def abort(self, keep_partial=True):
+        """Stop without producing the output; the partial file is kept unless told otherwise"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._writer.close()
+        finally:
+            if not keep_partial and os.path.exists(self.partial_path):
+                os.remove(self.partial_path)
+
+
+# Totals sheet of a batch workbook
+TOTALS_SHEET = 'Totals'
+TOTALS_HEADERS = ['Source PDF', 'Sheet', 'Voters', 'Male', 'Female', 'Pages']
+_SHEET_TITLE_INVALID = re.compile(r'[\[\]:*?/\\]')
+MAX_SHEET_TITLE = 31
+
+
+class PdfSheetSink:
+    """
+    One PDF's sheet in a WorkbookExportSink. Same interface as
+    IncrementalExportSink: pages are spooled as they complete and close()
+    streams them into the workbook as the PDF's sheet.
+    """
+
+    def __init__(self, book, source, title):
+        self.book = book
+        self.source = source
+        self.title = title
+        self._writer = SheetExportWriter(None, book.template)
+        self.pages = 0
+        self.genders = {}
+        self._closed = False
+
+    @property
+    def count(self):
+        return self._writer.count
+
+    def write_page(self, voters):
+        self._writer.write(sorted(voters, key=voter_sort_key))
+        for voter in voters:
+            gender = voter.get('gender', '')
+            self.genders[gender] = self.genders.get(gender, 0) + 1
+        self.pages += 1
+
+    def close(self):
+        self._closed = True
+        try:
+            self.book._add_sheet(self)
+        finally:
+            self._writer.close()
+        return self.count
+
+    def abort(self, keep_partial=True):
+        """A failed PDF gets no sheet"""
+        if not self._closed:
+            self._closed = True
+            self._writer.close()
+
+
+class WorkbookExportSink:
+    """
+    Batch output as a single workbook: one streamed sheet per source PDF,
+    written as soon as that PDF completes, plus a Totals sheet (first)
+    with per-PDF and overall counts. Only the PDF in progress is spooled;
+    finished sheets live in openpyxl's write-only temp files until save.
+    """
+
+    def __init__(self, output_path, template='default'):
+        self.output_path = output_path
+        self.template = template
+        self.totals = []
+        self._titles = {TOTALS_SHEET.lower()}
+        self._wb = Workbook(write_only=True)
+
+    def sheet_sink(self, source):
+        """Sink for the next PDF's sheet"""
+        return PdfSheetSink(self, source, self._sheet_title(os.path.splitext(source)[0]))
+
+    def _sheet_title(self, name):
+        """Valid, unique Excel sheet title (max 31 chars, no []:*?/\\)"""
+        base = _SHEET_TITLE_INVALID.sub('_', name).strip("' ") or 'Sheet'
+        title, n = base[:MAX_SHEET_TITLE], 1
+        while title.lower() in self._titles:
+            n += 1
+            suffix = f" ({n})"
+            title = base[:MAX_SHEET_TITLE - len(suffix)] + suffix
+        self._titles.add(title.lower())
+        return title
+
+    def _add_sheet(self, sheet):
+        writer = sheet._writer
+        write_spooled_sheet(self._wb, sheet.title, writer.headers, writer.widths, writer.spool)
+        self.totals.append((sheet.source, sheet.title, sheet.count, sheet.genders.get('Male', 0),
+                            sheet.genders.get('Female', 0), sheet.pages))
+
+    @property
+    def count(self):
+        return sum(row[2] for row in self.totals)
+
+    def close(self):
+        """
+        Add the Totals sheet and save the workbook.
+
+        Returns:
+            int: Number of records exported
+        """
+        rows = list(self.totals)
+        rows.append(('Total', '', self.count, sum(r[3] for r in self.totals),
+                     sum(r[4] for r in self.totals), sum(r[5] for r in self.totals)))
+        widths = ColumnWidths(TOTALS_HEADERS)
+        spool = RowSpool()
+        try:
+            for row in rows:
+                widths.track(row)
+                spool.append(row)
+            write_spooled_sheet(self._wb, TOTALS_SHEET, TOTALS_HEADERS, widths, spool, index=0)
+        finally:
+            spool.close()
+        self._wb.save(self.output_path)
+        print(f"✅ Excel file saved: {self.output_path} ({len(self.totals)} PDF sheet(s), {self.count} records)")
+        return self.count
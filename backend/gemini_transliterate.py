@@ -1,25 +1,282 @@
 """
 Gemini-based Fast Transliteration
-Uses batch processing for speed - transliterates all names in one API call
+Uses batch processing for speed - transliterates the distinct name words
+of a whole PDF in a few token-budgeted API calls and reassembles full
+names locally
 """
 import os
 import re
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from .translit_cache import TransliterationCache
+from .name_dictionary import get_name_dictionary
 
 # Load environment variables
 load_dotenv()
 
-# Cache for transliterations to avoid repeated API calls
-_transliteration_cache = {}
+GEMINI_MODEL = 'gemini-2.0-flash'
+
+PROMPT_TEMPLATE = """Transliterate these Marathi name words (given names and surnames) to English. 
+Rules:
+- Use common English spellings for Indian names
+- चं → Chan (not Can)
+- Return one object per input item with the same id and the English word in "en"
+- Latin letters only in "en"
+
+INPUT_JSON:
+{items_json}"""
+
+# Structured output: Gemini must answer with [{"id": int, "en": str}, ...]
+RESPONSE_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "id": {"type": "INTEGER"},
+            "en": {"type": "STRING"}
+        },
+        "required": ["id", "en"]
+    }
+}
+
+# Missing/invalid items are re-requested this many times before the local fallback
+MAX_REREQUESTS = 2
+
+# Cache namespace: changing the model, prompt or schema invalidates old entries
+CACHE_VERSION = f"{GEMINI_MODEL}:" + hashlib.sha1(
+    (PROMPT_TEMPLATE + json.dumps(RESPONSE_SCHEMA, sort_keys=True)).encode('utf-8')
+).hexdigest()[:10]
+
+# Persistent cache shared by every worker thread in this process
+_transliteration_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """Shared persistent transliteration cache (opened on first use)"""
+    global _transliteration_cache
+    with _cache_lock:
+        if _transliteration_cache is None:
+            _transliteration_cache = TransliterationCache(version=CACHE_VERSION)
+        return _transliteration_cache
+
+def cache_stats():
+    """Hit/miss metrics of the transliteration cache"""
+    return get_cache().stats()
+
+# Devanagari block - tokens without it are already in Latin script
+_DEVANAGARI = re.compile(r'[\u0900-\u097F]')
+
+# Gemini reply cap per request; words are chunked so replies stay under it
+MAX_OUTPUT_TOKENS = 4096
+REQUEST_TOKEN_BUDGET = 3000
+# Background requests carry exactly this many queued uncached words...
+FLUSH_WORDS = 300
+# ...and whatever is queued is also sent after this many pages
+FLUSH_PAGES = 5
+
+# Payload counters: names seen vs distinct tokens vs tokens actually sent.
+# Process-wide totals, also updated from batcher worker threads
+_usage = {'names': 0, 'unique_tokens': 0, 'tokens_sent': 0, 'gemini_calls': 0,
+          'invalid_items': 0, 'rerequested': 0, 'local_tokens': 0, 'local_names': 0}
+_usage_lock = threading.Lock()
+
+# Acceptable "en" values: Latin letters with spaces, dots, apostrophes, hyphens
+_LATIN_NAME = re.compile(r"^[A-Za-z][A-Za-z .'\-]*$")
+
+def _count(**amounts):
+    """Add to the payload counters"""
+    with _usage_lock:
+        for key, amount in amounts.items():
+            _usage[key] += amount
 
 def get_gemini_api_key():
     """Get Gemini API key from environment"""
     return os.getenv('VITE_API_KEY', '')
 
+def split_name_tokens(name):
+    """Split a name into the word tokens that are transliterated independently"""
+    return re.sub(r'[\|:]+', ' ', name or '').split()
+
+def _needs_transliteration(token):
+    """Only tokens containing Devanagari go to Gemini; Latin/digits pass through"""
+    return bool(_DEVANAGARI.search(token))
+
+def estimate_output_tokens(token):
+    """Rough reply cost of one JSON item ({"id": 12, "en": "Shrikant"}) in model tokens"""
+    return 10 + len(token) // 2
+
+def chunk_by_budget(tokens, budget=REQUEST_TOKEN_BUDGET):
+    """Split tokens into request-sized chunks whose estimated reply fits `budget`"""
+    chunks, current, used = [], [], 0
+    for tok in tokens:
+        cost = estimate_output_tokens(tok)
+        if current and used + cost > budget:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(tok)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _parse_items(response_text):
+    """
+    Decode the JSON reply into a list of item dicts.
+    A truncated or malformed array still yields its complete objects.
+    """
+    try:
+        items = json.loads(response_text)
+        if isinstance(items, dict):
+            items = [items]
+        return items if isinstance(items, list) else []
+    except ValueError:
+        items = []
+        for match in re.finditer(r'\{[^{}]*\}', response_text):
+            try:
+                items.append(json.loads(match.group(0)))
+            except ValueError:
+                continue
+        return items
+
+def _valid_item(item, count):
+    """One reply item is usable if its id is in range and "en" is a Latin word/phrase"""
+    if not isinstance(item, dict):
+        return False
+    item_id, english = item.get('id'), item.get('en')
+    if not isinstance(item_id, int) or isinstance(item_id, bool) or not 0 <= item_id < count:
+        return False
+    return isinstance(english, str) and bool(_LATIN_NAME.match(english.strip()))
+
+def _request_gemini(tokens, api_key):
+    """
+    Send one batch of tokens to Gemini as keyed JSON.
+    
+    Returns:
+        dict: {token: transliteration} for every item that validated; items
+              that are missing, duplicated-invalid or malformed are left out
+              so the caller can re-request just those
+    """
+    import requests
+    
+    # Direct HTTP request to Gemini API (more compatible)
+    url = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent?key={api_key}"
+    
+    items_json = json.dumps([{"id": i, "mr": token} for i, token in enumerate(tokens)], ensure_ascii=False)
+    prompt = PROMPT_TEMPLATE.format(items_json=items_json)
+
+    payload = {
+        "contents": [{
+            "parts": [{"text": prompt}]
+        }],
+        "generationConfig": {
+            "temperature": 0.1,
+            "maxOutputTokens": MAX_OUTPUT_TOKENS,
+            "responseMimeType": "application/json",
+            "responseSchema": RESPONSE_SCHEMA
+        }
+    }
+    
+    _count(gemini_calls=1, tokens_sent=len(tokens))
+    response = requests.post(url, json=payload, timeout=30)
+    
+    if response.status_code != 200:
+        print(f"⚠️ Gemini API error {response.status_code}: {response.text[:100]}")
+        raise Exception(f"API error {response.status_code}")
+    
+    data = response.json()
+    candidate = data['candidates'][0]
+    if candidate.get('finishReason') == 'MAX_TOKENS':
+        print(f"⚠️ Gemini reply truncated at {MAX_OUTPUT_TOKENS} tokens ({len(tokens)} words sent)")
+    response_text = candidate['content']['parts'][0]['text'].strip()
+    
+    transliterated = {}
+    invalid = 0
+    for item in _parse_items(response_text):
+        if _valid_item(item, len(tokens)):
+            transliterated.setdefault(tokens[item['id']], item['en'].strip())
+        else:
+            invalid += 1
+    if invalid:
+        _count(invalid_items=invalid)
+    return transliterated
+
+def transliterate_tokens(tokens, api_key):
+    """
+    Transliterate uncached tokens with Gemini in budget-sized requests.
+    Items missing from a reply are re-requested on their own (up to
+    MAX_REREQUESTS times) before falling back locally. Results are written
+    to the persistent cache.
+    
+    Returns:
+        tuple: ({token: transliteration}, set of tokens whose request failed)
+    """
+    from .corrections import transliterate_marathi
+    
+    resolved, failed = {}, set()
+    for chunk in chunk_by_budget(tokens):
+        pending = chunk
+        for attempt in range(MAX_REREQUESTS + 1):
+            try:
+                fresh = _request_gemini(pending, api_key)
+            except Exception as e:
+                print(f"⚠️ Gemini API error: {e}, using fallback")
+                failed.update(pending)
+                pending = []
+                break
+            resolved.update(fresh)
+            get_cache().put_many(fresh)
+            pending = [tok for tok in pending if tok not in fresh]
+            if not pending:
+                break
+            if attempt < MAX_REREQUESTS:
+                _count(rerequested=len(pending))
+        for tok in pending:
+            # Still missing after re-requests - local fallback for this word only
+            resolved[tok] = transliterate_marathi(tok)
+    return resolved, failed
+
+def _resolve_locally(tokens):
+    """
+    Resolve words from the local name dictionary.
+    
+    Returns:
+        tuple: ({token: english} confident enough to skip Gemini, [remaining tokens])
+    """
+    resolved, remaining = get_name_dictionary().resolve(tokens)
+    _count(local_tokens=len(resolved))
+    return resolved, remaining
+
+def _count_local_names(token_lists, local):
+    """Count names whose every Devanagari word was resolved locally"""
+    _count(local_names=sum(
+        1 for tokens in token_lists
+        if tokens and all(tok in local or not _needs_transliteration(tok) for tok in tokens)
+    ))
+
+def assemble_name(name, tokens, token_map, failed=()):
+    """Rebuild a full English name from per-token results"""
+    from .corrections import transliterate_marathi
+    
+    if any(tok in failed for tok in tokens):
+        # Gemini unreachable for part of this name - whole-name local fallback
+        return transliterate_marathi(name)
+    return ' '.join(token_map.get(tok, tok) for tok in tokens)
+
 def batch_transliterate_gemini(marathi_names):
     """
     Batch transliterate multiple Marathi names to English using Gemini API.
-    This is FAST because it sends all names in one API call.
+    
+    Names are split into word tokens; each distinct token is resolved from
+    the local name dictionary when it is confident, otherwise looked up in
+    the persistent cache, and only unseen tokens are sent to Gemini. Full
+    names are then reassembled locally, so a booth list with a few hundred
+    distinct surnames/given names costs a few hundred tokens instead of
+    thousands of full names.
     
     Args:
         marathi_names: List of Marathi name strings
@@ -31,118 +288,224 @@ def batch_transliterate_gemini(marathi_names):
         return []
     
     api_key = get_gemini_api_key()
+    
+    name_tokens = [split_name_tokens(name) for name in marathi_names]
+    unique_tokens = list(dict.fromkeys(
+        tok for tokens in name_tokens for tok in tokens if _needs_transliteration(tok)
+    ))
+    _count(names=len(marathi_names), unique_tokens=len(unique_tokens))
+    
+    # Local dictionary first; only low-confidence words need Gemini
+    token_map, remote_tokens = _resolve_locally(unique_tokens)
+    _count_local_names(name_tokens, token_map)
     if not api_key:
         print("⚠️ Gemini API key not found, using fallback")
-        from .corrections import transliterate_marathi
-        return [transliterate_marathi(name) for name in marathi_names]
+        return [assemble_name(name, tokens, token_map, set(remote_tokens))
+                for name, tokens in zip(marathi_names, name_tokens)]
     
-    # Check cache first
-    uncached_names = []
-    uncached_indices = []
-    results = [None] * len(marathi_names)
+    # Check cache next
+    token_map.update(get_cache().get_many(remote_tokens))
+    uncached_tokens = [tok for tok in remote_tokens if tok not in token_map]
+    failed = set()
+    if uncached_tokens:
+        resolved, failed = transliterate_tokens(uncached_tokens, api_key)
+        token_map.update(resolved)
     
-    for i, name in enumerate(marathi_names):
-        if name in _transliteration_cache:
-            results[i] = _transliteration_cache[name]
-        else:
-            uncached_names.append(name)
-            uncached_indices.append(i)
+    return [assemble_name(name, tokens, token_map, failed)
+            for name, tokens in zip(marathi_names, name_tokens)]
+
+
+class TransliterationBatcher:
+    """
+    Cross-page transliteration for one PDF.
     
-    # If all cached, return immediately
-    if not uncached_names:
-        return results
+    Voters are added page by page; the distinct words of their names and
+    relation names are deduplicated together (the two fields share most
+    surnames), resolved from the local name dictionary where it is
+    confident, and checked against the cache. Remaining words are queued and
+    sent in the background in fixed batches - every `flush_words` words, and
+    whatever is left every `flush_pages` pages - so Gemini works while the
+    following pages are rendered and OCR'd instead of stalling the page
+    loop. Batch boundaries depend only on the input, never on when a
+    request returns, so every run sends the same requests.
+    ready_pages() hands back, in order, the pages whose words are all
+    resolved so they can be exported early; finish() sends the remainder,
+    waits, and fills name_english / relation_name_english on every
+    remaining voter in the order they were added.
     
-    try:
-        import requests
-        
-        # Direct HTTP request to Gemini API (more compatible)
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={api_key}"
-        
-        # Create prompt for batch transliteration
-        names_text = '\n'.join([f"{i+1}. {name}" for i, name in enumerate(uncached_names)])
-        
-        prompt = f"""Transliterate these Marathi names to English. 
-Rules:
-- Use common English spellings for Indian names
-- चं → Chan (not Can)
-- Keep the order and numbering
-- Output ONLY the transliterated names, one per line with the same numbering
-
-Names:
-{names_text}
-
-Output format:
-1. [English name]
-2. [English name]
-..."""
-
-        payload = {
-            "contents": [{
-                "parts": [{"text": prompt}]
-            }],
-            "generationConfig": {
-                "temperature": 0.1,
-                "maxOutputTokens": 1000
-            }
-        }
-        
-        response = requests.post(url, json=payload, timeout=30)
+    Results are keyed by word and requests run one at a time in the order
+    sent; a word whose request failed always sends its whole name to the
+    local fallback.
+    """
+    
+    FIELDS = (('name_marathi', 'name_english'), ('relation_name_marathi', 'relation_name_english'))
+    
+    def __init__(self, flush_words=FLUSH_WORDS, flush_pages=FLUSH_PAGES):
+        self.flush_words = flush_words
+        self.flush_pages = flush_pages
+        self._pages_since_flush = 0
+        self.api_key = get_gemini_api_key()
+        self._pages = deque()
+        self._seen = set()
+        self._local = set()
+        self._queued = []
+        self._token_map = {}
+        self._failed = set()
+        self._futures = []
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='translit')
+        # Counters are process-wide; stats() reports the change since here
+        self._stats_start = transliteration_stats()
+    
+    def add(self, voters):
+        """Register a page's voters and queue their unseen words"""
+        new_tokens = []
+        token_lists = []
+        for voter in voters:
+            for source, _ in self.FIELDS:
+                tokens = split_name_tokens(voter.get(source, ''))
+                token_lists.append(tokens)
+                for tok in tokens:
+                    if tok not in self._seen and _needs_transliteration(tok):
+                        self._seen.add(tok)
+                        new_tokens.append(tok)
+        _count(names=len(token_lists), unique_tokens=len(new_tokens))
+        self._pages.append(voters)
+        self._pages_since_flush += 1
         
-        if response.status_code == 200:
-            data = response.json()
-            response_text = data['candidates'][0]['content']['parts'][0]['text'].strip()
-            
-            # Parse response
-            lines = response_text.split('\n')
-            
-            transliterated = []
-            for line in lines:
-                # Extract name from "1. Name" format
-                match = re.match(r'^\d+\.\s*(.+)$', line.strip())
-                if match:
-                    transliterated.append(match.group(1).strip())
-            
-            # Fill in results and cache
-            for i, idx in enumerate(uncached_indices):
-                if i < len(transliterated):
-                    results[idx] = transliterated[i]
-                    _transliteration_cache[uncached_names[i]] = transliterated[i]
-                else:
-                    # Fallback if parsing failed
-                    from .corrections import transliterate_marathi
-                    results[idx] = transliterate_marathi(uncached_names[i])
+        local, remote = _resolve_locally(new_tokens) if new_tokens else ({}, [])
+        self._local.update(local)
+        self._token_map.update(local)
+        _count_local_names(token_lists, self._local)
+        if remote:
+            cached = get_cache().get_many(remote)
+            self._token_map.update(cached)
+            self._queued.extend(tok for tok in remote if tok not in cached)
+        # Fixed batches: each full word budget now, the rest every flush_pages pages
+        while len(self._queued) >= self.flush_words:
+            self._send(self.flush_words)
+        if self._pages_since_flush >= self.flush_pages:
+            self.flush()
+    
+    def flush(self):
+        """Send all queued words to Gemini in the background"""
+        self._pages_since_flush = 0
+        self._send(len(self._queued))
+    
+    def _send(self, count):
+        if not self._queued or not self.api_key:
+            return
+        words, self._queued = self._queued[:count], self._queued[count:]
+        self._futures.append(self._executor.submit(self._run, words))
+    
+    def _run(self, words):
+        started = time.perf_counter()
+        try:
+            return transliterate_tokens(words, self.api_key)
+        finally:
+            self.busy_seconds += time.perf_counter() - started
+    
+    def _collect(self, wait=False):
+        """Merge the results of returned requests (all of them if wait)"""
+        while self._futures and (wait or self._futures[0].done()):
+            resolved, failed = self._futures.pop(0).result()
+            self._token_map.update(resolved)
+            self._failed.update(failed)
+    
+    def _resolved(self, voters):
+        """True once every word of the voters' names is known (or failed)"""
+        for voter in voters:
+            for source, _ in self.FIELDS:
+                for tok in split_name_tokens(voter.get(source, '')):
+                    if tok not in self._token_map and tok not in self._failed and _needs_transliteration(tok):
+                        return False
+        return True
+    
+    def _assign(self, voters):
+        for voter in voters:
+            for source, target in self.FIELDS:
+                name = voter.get(source, '')
+                voter[target] = assemble_name(name, split_name_tokens(name), self._token_map, self._failed)
+    
+    def ready_pages(self):
+        """
+        Pages (voter lists, in the order added) whose names are complete,
+        with English names filled in. Never waits: stops at the first page
+        still waiting on Gemini, so pages always come out in order.
+        """
+        self._collect()
+        if not self.api_key:
+            self._failed.update(self._queued)
+            self._queued = []
+        ready = []
+        while self._pages and self._resolved(self._pages[0]):
+            page = self._pages.popleft()
+            self._assign(page)
+            ready.append(page)
+        return ready
+    
+    def finish(self):
+        """Flush, wait for all requests and assign English names to the remaining voters"""
+        try:
+            self.flush()
+            started = time.perf_counter()
+            self._collect(wait=True)
+            self.wait_seconds += time.perf_counter() - started
+            if not self.api_key:
+                print("⚠️ Gemini API key not found, using fallback")
+                # Dictionary words still apply; other names get the rule-based whole name
+                self._failed.update(self._queued)
+                self._queued = []
             
-            return results
-        else:
-            print(f"⚠️ Gemini API error {response.status_code}: {response.text[:100]}")
-            raise Exception(f"API error {response.status_code}")
-        
-    except Exception as e:
-        print(f"⚠️ Gemini API error: {e}, using fallback")
-        from .corrections import transliterate_marathi
-        for i, idx in enumerate(uncached_indices):
-            results[idx] = transliterate_marathi(uncached_names[i])
-        return results
+            done = []
+            while self._pages:
+                page = self._pages.popleft()
+                self._assign(page)
+                done.extend(page)
+            return done
+        finally:
+            self.close()
+    
+    def close(self):
+        """Stop the background worker (also when a PDF fails before finish())"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    def stats(self):
+        """transliteration_stats() for this batcher's PDF only (cache size is the current total)"""
+        start, now = self._stats_start, transliteration_stats()
+        stats = {key: now[key] - start[key] for key in _usage}
+        cache = dict(now['cache'])
+        cache['hits'] -= start['cache']['hits']
+        cache['misses'] -= start['cache']['misses']
+        cache['evictions'] -= start['cache']['evictions']
+        lookups = cache['hits'] + cache['misses']
+        cache['hit_rate'] = round(cache['hits'] / lookups, 3) if lookups else 0.0
+        stats['cache'] = cache
+        return stats
+
+
+def transliteration_stats():
+    """Cache hit/miss metrics plus Gemini payload counters"""
+    with _usage_lock:
+        stats = dict(_usage)
+    stats['cache'] = cache_stats()
+    return stats
 
 
 def transliterate_single_gemini(marathi_text):
     """
     Transliterate a single Marathi name using Gemini.
-    Uses cache for fast repeated lookups.
+    Uses the persistent cache for fast repeated lookups.
     """
     if not marathi_text:
         return ''
     
-    # Check cache
-    if marathi_text in _transliteration_cache:
-        return _transliteration_cache[marathi_text]
-    
-    # Use batch function with single name
+    # Use batch function with single name (it checks the cache first)
     results = batch_transliterate_gemini([marathi_text])
     return results[0] if results else ''
 
 
 def clear_cache():
-    """Clear the transliteration cache"""
-    global _transliteration_cache
-    _transliteration_cache = {}
+    """Clear the transliteration cache (current model/prompt version)"""
+    get_cache().clear()
@@ -0,0 +1,177 @@
+"""
+Marathi Name Dictionary
+Local-first transliteration of name words: curated dictionary spellings
+held in a character trie, compound names built from dictionary pieces,
+and the rule-based transliterator as a low-confidence fallback
+"""
+import os
+import threading
+import unicodedata
+
+from .corrections import transliterate_marathi
+
+DICTIONARY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'name_dictionary.tsv')
+
+# Words resolved locally at or above this confidence never go to Gemini
+LOCAL_CONFIDENCE_THRESHOLD = float(os.getenv('TRANSLIT_LOCAL_THRESHOLD', '0.75'))
+
+EXACT_CONFIDENCE = 1.0
+# Every piece found in the dictionary (रामदास -> Ram + das)
+COMPOUND_CONFIDENCE = 0.85
+# Rule-based result; lowered for each spelling ambiguity in the word
+RULE_CONFIDENCE = 0.6
+RULE_AMBIGUITY_PENALTY = 0.15
+
+# Characters the rules spell inconsistently in names:
+# anusvara, virama (conjuncts), nukta, vocalic r, long ई/ऊ, व (v/w), candra vowels
+AMBIGUOUS_CHARS = {
+    'anusvara': 'ं',
+    'conjunct': '्',
+    'nukta': '़',
+    'vocalic_r': 'ृ',
+    'long_vowel': 'ीूईऊ',
+    'va': 'व',
+    'candra': 'ॅॉँ',
+}
+
+_END = ''  # trie key holding the English spelling of a complete word
+
+
+class NameTrie:
+    """
+    Character trie of dictionary words. Nodes are plain dicts keyed by
+    character; a complete word stores its English spelling under _END.
+    """
+
+    def __init__(self):
+        self.root = {}
+        self.size = 0
+
+    def insert(self, word, english):
+        node = self.root
+        for ch in word:
+            node = node.setdefault(ch, {})
+        if _END not in node:
+            self.size += 1
+        node[_END] = english
+
+    def get(self, word):
+        """English spelling of an exact dictionary word, or None"""
+        node = self.root
+        for ch in word:
+            node = node.get(ch)
+            if node is None:
+                return None
+        return node.get(_END)
+
+    def prefixes(self, word, start=0):
+        """Yield (end, english) for every dictionary word equal to word[start:end]"""
+        node = self.root
+        for i in range(start, len(word)):
+            node = node.get(word[i])
+            if node is None:
+                return
+            if _END in node:
+                yield i + 1, node[_END]
+
+    def segment(self, word):
+        """
+        Split a word into the fewest dictionary pieces.
+        Pieces may only end on a character boundary - never before a vowel
+        sign, virama or nukta that belongs to the previous consonant.
+
+        Returns:
+            list: English spellings of the pieces, or None if no full cover
+        """
+        best = [None] * (len(word) + 1)
+        best[0] = []
+        for start in range(len(word)):
+            if best[start] is None:
+                continue
+            for end, english in self.prefixes(word, start):
+                if end < len(word) and unicodedata.category(word[end]).startswith('M'):
+                    continue
+                candidate = best[start] + [english]
+                if best[end] is None or len(candidate) < len(best[end]):
+                    best[end] = candidate
+        return best[len(word)]
+
+
+class NameDictionary:
+    """Curated name words plus confidence-scored local transliteration"""
+
+    def __init__(self, path=DICTIONARY_FILE):
+        self.path = path
+        self.trie = NameTrie()
+        self._memo = {}
+        self.load(path)
+
+    def load(self, path):
+        if not os.path.exists(path):
+            print(f"⚠️ Name dictionary not found: {path}")
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                parts = line.split('\t')
+                if len(parts) >= 2 and parts[0].strip() and parts[1].strip():
+                    self.trie.insert(parts[0].strip(), parts[1].strip())
+
+    def lookup(self, word):
+        """
+        Transliterate one name word locally.
+
+        Returns:
+            tuple: (english, confidence, source) with source one of
+                   'dictionary', 'compound', 'rules'
+        """
+        result = self._memo.get(word)
+        if result is None:
+            result = self._lookup(word)
+            self._memo[word] = result
+        return result
+
+    def _lookup(self, word):
+        english = self.trie.get(word)
+        if english:
+            return english, EXACT_CONFIDENCE, 'dictionary'
+
+        pieces = self.trie.segment(word)
+        if pieces and len(pieces) > 1:
+            english = pieces[0] + ''.join(piece.lower() for piece in pieces[1:])
+            return english, COMPOUND_CONFIDENCE, 'compound'
+
+        ambiguities = sum(1 for chars in AMBIGUOUS_CHARS.values() if any(ch in word for ch in chars))
+        confidence = max(0.0, RULE_CONFIDENCE - RULE_AMBIGUITY_PENALTY * ambiguities)
+        return transliterate_marathi(word), round(confidence, 2), 'rules'
+
+    def resolve(self, words, threshold=LOCAL_CONFIDENCE_THRESHOLD):
+        """
+        Split words into locally resolved and unresolved ones.
+
+        Returns:
+            tuple: ({word: english} at or above threshold, [words below it])
+        """
+        resolved, unresolved = {}, []
+        for word in words:
+            english, confidence, _ = self.lookup(word)
+            if english and confidence >= threshold:
+                resolved[word] = english
+            else:
+                unresolved.append(word)
+        return resolved, unresolved
+
+
+_dictionary = None
+_dictionary_lock = threading.Lock()
+
+
+def get_name_dictionary():
+    """Shared NameDictionary (loaded on first use)"""
+    global _dictionary
+    with _dictionary_lock:
+        if _dictionary is None:
+            _dictionary = NameDictionary()
+        return _dictionary
@@ -5,11 +5,20 @@ Based on OCR_Samruddhi's gcv_ocr.py
 from google.cloud import vision
 import io
 import os
+import time
+from google.api_core import exceptions as gexc
+from .concurrency import AdaptiveConcurrency
+from .retry import RetryPolicy, CircuitBreaker, OCRError
 
 class OCREngine:
     def __init__(self):
         """Initialize Google Cloud Vision client"""
         self.client = None
+        # Adaptive limit for parallel OCR calls, fed by run_ocr outcomes
+        self.concurrency = AdaptiveConcurrency()
+        # Retry/backoff rules and the breaker shared by all OCR workers
+        self.retry_policy = RetryPolicy()
+        self.circuit_breaker = CircuitBreaker()
         self._initialize_client()
     
     def _initialize_client(self):
@@ -22,74 +31,106 @@ class OCREngine:
             print(f"⚠️ Error initializing GCV client: {e}")
             raise
     
-    def run_ocr(self, image_path, max_retries=3):
+    def run_ocr(self, image_path, max_retries=None):
         """
         Run Google Cloud Vision DOCUMENT_TEXT_DETECTION on image
-        with retry logic for rate limiting errors.
+        with typed retries, a per-page deadline and the shared circuit breaker.
         
         Args:
             image_path: Path to image file
-            max_retries: Number of retry attempts for rate limit errors
+            max_retries: Attempt limit (defaults to retry_policy.max_attempts)
             
         Returns:
-            tuple: (full_text, word_annotations)
+            tuple: (full_text, word_annotations), or (OCRError, None) on failure
         """
-        for attempt in range(max_retries):
+        content, error = self._read_image(image_path, 'OCR')
+        if error:
+            return error, None
+        
+        return self.run_ocr_content(content, max_retries)
+
+    def run_ocr_content(self, content, max_retries=None):
+        """
+        Same as run_ocr, for image bytes already in memory
+        (rendered pages and embedded scans never touch disk).
+        """
+        return self._annotate_with_retry(
+            self.client.document_text_detection, content, max_retries, 'OCR'
+        )
+
+    def run_ocr_block(self, image_path):
+        """
+        Run Google Cloud Vision TEXT_DETECTION on smaller cropped images (blocks)
+        Returns (full_text, word_annotations), or (OCRError, None) on failure
+        """
+        content, error = self._read_image(image_path, 'OCR Block')
+        if error:
+            return error, None
+
+        return self._annotate_with_retry(self.client.text_detection, content, None, 'OCR Block')
+
+    @staticmethod
+    def _read_image(image_path, label):
+        """Image bytes, or an OCRError (not retried) if the file can't be read"""
+        try:
+            with io.open(image_path, 'rb') as image_file:
+                return image_file.read(), None
+        except OSError as e:
+            error = OCRError.from_exception(e, retryable=False, attempts=0)
+            print(f"❌ {label} Error: {error}")
+            return None, error
+
+    def _annotate_with_retry(self, detect, content, max_retries, label):
+        """Call a GCV detection method under the retry policy and circuit breaker"""
+        policy = self.retry_policy
+        attempts = max_retries or policy.max_attempts
+        deadline = time.monotonic() + policy.deadline
+        image = vision.Image(content=content)
+        
+        for attempt in range(attempts):
+            # All workers wait here while the error rate is too high
+            if not self.circuit_breaker.wait_until_closed(deadline):
+                error = OCRError('CircuitOpen', 'deadline passed while OCR circuit was open',
+                                 retryable=True, attempts=attempt)
+                print(f"❌ {label} Error: {error}")
+                return error, None
+            
             try:
-                # Read image file
-                with io.open(image_path, 'rb') as image_file:
-                    content = image_file.read()
-                
-                image = vision.Image(content=content)
-                
-                # Call DOCUMENT_TEXT_DETECTION with language hints
-                response = self.client.document_text_detection(
+                started = time.monotonic()
+                response = detect(
                     image=image,
                     image_context={
                         'language_hints': ['mr', 'hi', 'en']  # Marathi, Hindi, English
-                    }
+                    },
+                    timeout=max(1.0, deadline - started)
                 )
                 
-                # Check for API error in response
+                # API errors inside the response carry a gRPC status code
                 if response.error.message:
-                    raise Exception(response.error.message)
+                    raise gexc.from_grpc_status(response.error.code, response.error.message)
                 
-                # Extract results
                 full_text = response.text_annotations[0].description if response.text_annotations else ""
                 word_annotations = response.text_annotations
                 
+                self.concurrency.on_success(time.monotonic() - started)
+                self.circuit_breaker.record_success()
                 return full_text, word_annotations
                 
             except Exception as e:
-                error_str = str(e)
-                # Check for rate limiting / server errors that are retryable
-                is_retryable = any(code in error_str for code in ['503', '502', '429', 'UNAVAILABLE', 'rate limit'])
+                retryable = policy.is_retryable(e)
+                if policy.is_throttle(e):
+                    self.concurrency.on_throttle(type(e).__name__)
+                if retryable:
+                    self.circuit_breaker.record_failure()
+                else:
+                    self.circuit_breaker.release_probe()
                 
-                if is_retryable and attempt < max_retries - 1:
-                    import time
-                    wait_time = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s
-                    print(f"⏳ OCR rate limited, retrying in {wait_time}s... (attempt {attempt + 1}/{max_retries})")
+                wait_time = policy.backoff(attempt)
+                if retryable and attempt < attempts - 1 and time.monotonic() + wait_time < deadline:
+                    print(f"⏳ {label} {type(e).__name__}, retrying in {wait_time:.1f}s... (attempt {attempt + 1}/{attempts})")
                     time.sleep(wait_time)
                     continue
                 
-                print(f"❌ OCR Error: {e}")
-                return f"Error: {e}", None
-
-    def run_ocr_block(self, image_path):
-        """
-        Run Google Cloud Vision TEXT_DETECTION on smaller cropped images (blocks)
-        Returns (full_text, word_annotations)
-        """
-        try:
-            with io.open(image_path, 'rb') as image_file:
-                content = image_file.read()
-
-            image = vision.Image(content=content)
-
-            response = self.client.text_detection(image=image, image_context={'language_hints': ['mr', 'hi', 'en']})
-            full_text = response.text_annotations[0].description if response.text_annotations else ""
-            word_annotations = response.text_annotations
-            return full_text, word_annotations
-        except Exception as e:
-            print(f"❌ OCR Block Error: {e}")
-            return f"Error: {e}", None
+                error = OCRError.from_exception(e, retryable=retryable, attempts=attempt + 1)
+                print(f"❌ {label} Error: {error}")
+                return error, None
@@ -54,6 +54,54 @@ def normalize_epic_aggressive(text):
     
     return ''
 
+# Templates were calibrated on A4 pages rendered at 300 DPI (2480 x 3509 px)
+REFERENCE_PAGE_W = 2480
+REFERENCE_PAGE_H = 3509
+
+def to_relative_template(template):
+    """
+    Convert a template with 300 DPI pixel margins into page-relative units
+    (left/right as a fraction of page width, top/bottom of page height).
+    """
+    if template.get('units') == 'relative':
+        return template
+    rel = dict(template)
+    rel['left'] = template.get('left', 0) / REFERENCE_PAGE_W
+    rel['right'] = template.get('right', 0) / REFERENCE_PAGE_W
+    rel['photo_excl_width'] = template.get('photo_excl_width', 0) / REFERENCE_PAGE_W
+    rel['top'] = template.get('top', 0) / REFERENCE_PAGE_H
+    rel['bottom'] = template.get('bottom', 0) / REFERENCE_PAGE_H
+    rel['units'] = 'relative'
+    return rel
+
+def resolve_template(template, page_W, page_H, clip=None):
+    """
+    Map a page-relative template to pixel margins for one rendered image.
+    Templates already in pixels are returned unchanged.
+    
+    Args:
+        template: Template dict ('units': 'relative')
+        page_W: Full page width in pixels at the render scale
+        page_H: Full page height in pixels at the render scale
+        clip: Optional (x0, y0, x1, y1) pixel region actually rendered
+        
+    Returns:
+        dict: Template with pixel margins relative to the rendered image,
+              plus 'px_scale' (image pixels per 300 DPI reference pixel)
+    """
+    if template.get('units') != 'relative':
+        return template
+    x0, y0, x1, y1 = clip or (0, 0, page_W, page_H)
+    px = dict(template)
+    px['left'] = int(round(template.get('left', 0) * page_W - x0))
+    px['right'] = int(round(template.get('right', 0) * page_W - (page_W - x1)))
+    px['top'] = int(round(template.get('top', 0) * page_H - y0))
+    px['bottom'] = int(round(template.get('bottom', 0) * page_H - (page_H - y1)))
+    px['photo_excl_width'] = int(round(template.get('photo_excl_width', 0) * page_W))
+    px['units'] = 'px'
+    px['px_scale'] = page_W / REFERENCE_PAGE_W
+    return px
+
 def get_word_center(word_annotation):
     """Calculate the center (x, y) of a word's bounding box"""
     vertices = word_annotation.bounding_poly.vertices
@@ -115,6 +163,7 @@ def parse_gcv_annotations(word_annotations, image_W, image_H, template):
         return "Error: No word annotations provided"
     
     # Extract template parameters
+    template = resolve_template(template, image_W, image_H)
     L = template.get("left", 0)
     R = template.get("right", 0)
     T = template.get("top", 0)
@@ -163,7 +212,7 @@ def parse_gcv_annotations(word_annotations, image_W, image_H, template):
     # Add page heading if exists
     if heading_words_data:
         structured_blocks.append("--- PAGE HEADING START ---")
-        structured_blocks.append(structure_block_by_line(heading_words_data))
+        structured_blocks.append(structure_block_by_line(heading_words_data, line_tolerance=10 * template.get('px_scale', 1.0)))
         structured_blocks.append("--- PAGE HEADING END ---")
     
     # Add voter blocks (row by row, column by column)
@@ -172,7 +221,7 @@ def parse_gcv_annotations(word_annotations, image_W, image_H, template):
             words_in_block = blocks_data.get((r, c), [])
             
             if words_in_block:
-                block_text = structure_block_by_line(words_in_block)
+                block_text = structure_block_by_line(words_in_block, line_tolerance=10 * template.get('px_scale', 1.0))
                 if block_text.strip():
                     structured_blocks.append(block_text)
     
@@ -212,7 +261,9 @@ def extract_page_header(word_annotations, image_W, image_H, template):
         }
     
     # Get template margins
+    template = resolve_template(template, image_W, image_H)
     T = template.get("top", 0)
+    px_scale = template.get('px_scale', 1.0)
     
     # Header keywords for detection (Marathi, Hindi, English)
     district_keywords = ['जिल्हा', 'जिला', 'District', 'परिषद', 'Parishad', 'जि.प']
@@ -223,7 +274,7 @@ def extract_page_header(word_annotations, image_W, image_H, template):
     
     # Collect words in header region (top-left area before grid starts)
     # Header is typically in top 300px and left-aligned (x < 40% of page width)
-    header_region_height = min(T, 400)  # Use top margin or max 400px
+    header_region_height = min(T, 400 * px_scale)  # Use top margin or max 400px (at 300 DPI)
     header_region_width = image_W * 0.4  # Left 40% of page
     
     header_words = []
@@ -246,7 +297,7 @@ def extract_page_header(word_annotations, image_W, image_H, template):
     lines = []
     current_line = []
     last_y = -1
-    y_threshold = 20
+    y_threshold = 20 * px_scale
     
     for word_data in header_words:
         if last_y == -1 or abs(word_data['y'] - last_y) < y_threshold:
@@ -322,6 +373,8 @@ def parse_gcv_blocks(word_annotations, image_W, image_H, template):
     if not word_annotations or len(word_annotations) <= 1:
         return {'heading_text': '', 'blocks': []}
 
+    template = resolve_template(template, image_W, image_H)
+    line_tolerance = 10 * template.get('px_scale', 1.0)
     L = template.get("left", 0)
     R = template.get("right", 0)
     T = template.get("top", 0)
@@ -366,7 +419,7 @@ def parse_gcv_blocks(word_annotations, image_W, image_H, template):
         for rr in range(ROWS):
             for cc in range(COLS):
                 words = blocks_map.get((rr, cc), [])
-                text = structure_block_by_line(words) if words else ''
+                text = structure_block_by_line(words, line_tolerance) if words else ''
                 blocks_out.append({'r': rr, 'c': cc, 'text': text, 'words': words})
         return blocks_out
 
@@ -375,10 +428,10 @@ def parse_gcv_blocks(word_annotations, image_W, image_H, template):
     for r in range(ROWS):
         for c in range(COLS):
             words = blocks_data.get((r, c), [])
-            text = structure_block_by_line(words) if words else ''
+            text = structure_block_by_line(words, line_tolerance) if words else ''
             blocks.append({'r': r, 'c': c, 'text': text, 'words': words})
 
-    heading_text = structure_block_by_line(heading_words_data) if heading_words_data else ''
+    heading_text = structure_block_by_line(heading_words_data, line_tolerance) if heading_words_data else ''
 
     return {'heading_text': heading_text, 'blocks': blocks}
 
@@ -0,0 +1,121 @@
+"""
+Progress Events
+Pushes progress to the window (evaluate_js) instead of the UI polling
+get_progress(). Changes are coalesced and sent at most a few times per
+second; log messages carry sequence numbers so the UI applies only the
+ones it hasn't seen and can tell when it missed an event.
+"""
+import json
+import threading
+import time
+from collections import deque
+
+# At most this many events per second
+MAX_EVENTS_PER_SECOND = 5
+# While work is running, sections without their own notify() (OCR
+# concurrency, circuit breaker, ...) are re-checked this often
+ACTIVE_CHECK_SECONDS = 1.0
+KEEP_MESSAGES = 50
+JS_HANDLER = 'onProgressEvent'
+
+
+class ProgressEvents:
+    """
+    Progress log plus the thread that pushes it.
+
+    snapshot() returns the progress sections ({'status': ..., 'export':
+    ...}); an event carries only the sections that changed since the last
+    one, and the messages after the last pushed sequence number:
+
+        {'seq': 42, 'after': 39, 'messages': [[40, text], [41, text], [42, text]],
+         'status': {...}}
+
+    'after' is the seq of the previous event - a UI that has seen a
+    different one resyncs with get_progress(since) and skips messages
+    whose seq it already has.
+    emit(script) runs JavaScript in the window; active() says whether work
+    is running (only then are unchanged-looking sections re-checked).
+    """
+
+    def __init__(self, snapshot, emit, active=None, max_rate=MAX_EVENTS_PER_SECOND,
+                 active_check=ACTIVE_CHECK_SECONDS):
+        self.snapshot = snapshot
+        self.emit = emit
+        self.active = active or (lambda: False)
+        self.min_interval = 1.0 / max_rate
+        self.active_check = active_check
+        self.seq = 0
+        self.events_sent = 0
+        self._messages = deque(maxlen=KEEP_MESSAGES)
+        self._sent_seq = 0
+        self._sent_sections = {}
+        self._last_emit = 0.0
+        self._dirty = False
+        self._thread = None
+        self._cond = threading.Condition()
+
+    def add(self, message):
+        """Append a log message; returns its sequence number"""
+        with self._cond:
+            self.seq += 1
+            self._messages.append((self.seq, message))
+            seq = self.seq
+        self.notify()
+        return seq
+
+    def messages(self, since=None, limit=20):
+        """[seq, text] pairs after seq `since` (None: the last `limit` messages)"""
+        with self._cond:
+            if since is None:
+                return [[seq, text] for seq, text in list(self._messages)[-limit:]]
+            return [[seq, text] for seq, text in self._messages if seq > since]
+
+    def clear(self):
+        """Drop the log; sequence numbers keep counting"""
+        with self._cond:
+            self._messages.clear()
+        self.notify()
+
+    def notify(self):
+        """Something changed: push an event soon (coalesced with others)"""
+        with self._cond:
+            self._dirty = True
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='progress-events', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._dirty:
+                    # Idle: sleep until notified; busy: also re-check periodically
+                    if not self._cond.wait(self.active_check if self.active() else None):
+                        break
+                self._dirty = False
+            # Throttle; changes arriving meanwhile go out in this event
+            wait = self._last_emit + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            event = self._next_event()
+            if event is None:
+                continue
+            self._last_emit = time.monotonic()
+            try:
+                self.emit(f"window.{JS_HANDLER} && window.{JS_HANDLER}({json.dumps(event)})")
+                self.events_sent += 1
+            except Exception as e:
+                # No window (yet) or it's closing; the UI resyncs from get_progress
+                print(f"⚠️ Progress push failed: {e}")
+
+    def _next_event(self):
+        sections = self.snapshot()
+        changed = {key: value for key, value in sections.items() if self._sent_sections.get(key) != value}
+        with self._cond:
+            new = [[seq, text] for seq, text in self._messages if seq > self._sent_seq]
+            after, seq = self._sent_seq, self.seq
+        if not changed and seq == after:
+            return None
+        self._sent_sections.update(changed)
+        self._sent_seq = seq
+        return {'seq': seq, 'after': after, 'messages': new, **changed}
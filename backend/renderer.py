@@ -0,0 +1,252 @@
+"""
+Page Renderer
+Turns PDF pages into OCR-ready image bytes, preferring the scanned page's
+own embedded image over rasterizing and re-encoding the page
+"""
+import fitz  # PyMuPDF
+from .parser import to_relative_template, resolve_template
+from .encoding import encode_pixmap, DEFAULT_ENCODING_PROFILE
+
+# Render profiles, chosen per template via template['render_profile'].
+# Templates opt in to 'gray_clip'/'compact' once OCR accuracy on their
+# sample PDFs has been checked against 'standard'.
+RENDER_PROFILES = {
+    # Full-colour page at 300 DPI (original behaviour)
+    'standard': {'dpi': 300, 'grayscale': False, 'clip': False},
+    # 300 DPI grayscale, cropped to the header + voter grid
+    'gray_clip': {'dpi': 300, 'grayscale': True, 'clip': True},
+    # 200 DPI grayscale, cropped - smallest upload, for clean prints
+    'compact': {'dpi': 200, 'grayscale': True, 'clip': True},
+}
+DEFAULT_RENDER_PROFILE = 'standard'
+
+# Fraction of page height kept below the grid when clipping
+CLIP_PADDING = 0.01
+
+# Formats Google Cloud Vision accepts as-is
+GCV_NATIVE_FORMATS = ('jpeg', 'jpg', 'png', 'gif', 'bmp', 'webp', 'tiff', 'tif')
+
+# Vision rejects larger request images; fall back to rendering above this
+MAX_EMBEDDED_BYTES = 15 * 1024 * 1024
+
+# Embedded image must cover at least this fraction of the page
+MIN_PAGE_COVERAGE = 0.95
+
+
+def get_render_profile(template):
+    """Render profile dict for a template (falls back to the default profile)"""
+    name = template.get('render_profile', DEFAULT_RENDER_PROFILE)
+    return name, RENDER_PROFILES.get(name, RENDER_PROFILES[DEFAULT_RENDER_PROFILE])
+
+
+def _grid_clip(page, template):
+    """PDF-space rect covering the header and voter grid (drops the footer)"""
+    bottom = min(1.0, 1.0 - template.get('bottom', 0) + CLIP_PADDING)
+    return fitz.Rect(0, 0, page.rect.width, page.rect.height * bottom)
+
+
+def _has_visible_overlay(page):
+    """True if the page draws visible text or vector graphics over the scan"""
+    # Invisible OCR text layers (render mode 3) are fine; anything else is
+    # content the embedded image alone would not contain
+    for span in page.get_texttrace():
+        if span.get('type') != 3 and span.get('opacity', 1) > 0:
+            return True
+    return bool(page.get_drawings())
+
+
+def get_embedded_page_image(pdf_document, page):
+    """
+    Return the page's single full-page scan as OCR-ready bytes, or None.
+
+    Only used when the page is exactly one upright image covering the page
+    with nothing drawn on top. JPEG/PNG bytes are sent untouched; other
+    encodings (JBIG2, JPX, CCITT...) are decoded once at native resolution
+    and sent as lossless PNG.
+
+    Returns:
+        dict: {'content': bytes, 'width': int, 'height': int, 'format': str} or None
+    """
+    if page.rotation != 0:
+        return None
+
+    images = page.get_images(full=True)
+    if len(images) != 1:
+        return None
+    xref = images[0][0]
+    smask = images[0][1]
+    if smask:
+        return None
+
+    infos = page.get_image_info(xrefs=True)
+    if len(infos) != 1:
+        return None
+    a, b, c, d, _, _ = infos[0]['transform']
+    # Must be placed upright and unmirrored (no rotation/shear/flip)
+    if abs(b) > 1e-6 or abs(c) > 1e-6 or a <= 0 or d <= 0:
+        return None
+    bbox = fitz.Rect(infos[0]['bbox']) & page.rect
+    if bbox.is_empty or bbox.get_area() < MIN_PAGE_COVERAGE * page.rect.get_area():
+        return None
+
+    if _has_visible_overlay(page):
+        return None
+
+    extracted = pdf_document.extract_image(xref)
+    if not extracted:
+        return None
+
+    ext = extracted.get('ext', '').lower()
+    content = extracted.get('image')
+    width, height = extracted.get('width', 0), extracted.get('height', 0)
+    if ext in GCV_NATIVE_FORMATS and extracted.get('colorspace', 3) in (1, 3):
+        fmt = ext
+    else:
+        # Decode at native resolution; PNG keeps 1-bit/gray scans small and lossless
+        pix = fitz.Pixmap(pdf_document, xref)
+        if pix.alpha:
+            pix = fitz.Pixmap(pix, 0)
+        if pix.n > 3:
+            pix = fitz.Pixmap(fitz.csRGB, pix)
+        content = pix.tobytes('png')
+        width, height = pix.width, pix.height
+        fmt = 'png'
+
+    if not content or not width or not height or len(content) > MAX_EMBEDDED_BYTES:
+        return None
+
+    return {'content': content, 'width': width, 'height': height, 'format': fmt}
+
+
+def render_page(pdf_document, page_num, template, use_embedded=True):
+    """
+    Produce the OCR image for one page.
+
+    Args:
+        pdf_document: Open fitz.Document
+        page_num: 0-based page index
+        template: OCR template (page-relative, or 300 DPI pixel margins)
+        use_embedded: Try the embedded-scan fast path first
+
+    Returns:
+        dict: {
+            'content': bytes,     # image bytes to send to OCR
+            'width': int,         # image size in pixels
+            'height': int,
+            'source': str,        # 'embedded' or 'raster'
+            'profile': str,       # render/encoding profile used for raster pages
+            'template': dict      # template in pixels for this exact image
+        }
+    """
+    page = pdf_document[page_num]
+    template = to_relative_template(template)
+
+    embedded = get_embedded_page_image(pdf_document, page) if use_embedded else None
+    if embedded:
+        return {
+            'content': embedded['content'],
+            'width': embedded['width'],
+            'height': embedded['height'],
+            'source': 'embedded',
+            'profile': 'embedded',
+            'template': resolve_template(template, embedded['width'], embedded['height'])
+        }
+
+    return encode_raster(rasterize_page(page, template), template.get('encoding_profile'))
+
+
+def mask_photo_regions(pix, template_px):
+    """
+    White out the per-cell photo areas in a rendered pixmap (in place).
+
+    The photo sits at the right edge of each voter cell, `photo_excl_width`
+    wide. `photo_excl_top` / `photo_excl_bottom` (fractions of the cell
+    height) are left untouched so the EPIC line above the photo survives.
+
+    Args:
+        pix: Rendered fitz.Pixmap
+        template_px: Template resolved to this pixmap's pixels
+
+    Returns:
+        int: Number of cells masked
+    """
+    photo_w = template_px.get('photo_excl_width', 0)
+    rows, cols = template_px.get('rows', 0), template_px.get('cols', 0)
+    if photo_w <= 0 or rows <= 0 or cols <= 0:
+        return 0
+    L, T = template_px.get('left', 0), template_px.get('top', 0)
+    R, B = template_px.get('right', 0), template_px.get('bottom', 0)
+    box_w = (pix.width - L - R) // cols
+    box_h = (pix.height - T - B) // rows
+    if box_w <= 0 or box_h <= 0:
+        return 0
+    keep_top = int(box_h * template_px.get('photo_excl_top', 0.25))
+    keep_bottom = int(box_h * template_px.get('photo_excl_bottom', 0.0))
+    white = tuple([255] * pix.n)
+    masked = 0
+    for r in range(rows):
+        for c in range(cols):
+            x1 = L + (c + 1) * box_w
+            y0 = T + r * box_h
+            rect = fitz.IRect(max(0, x1 - min(photo_w, box_w)), y0 + keep_top, x1, y0 + box_h - keep_bottom)
+            if not rect.is_empty:
+                pix.set_rect(rect, white)
+                masked += 1
+    return masked
+
+
+def rasterize_page(page, template, mask_photos=True):
+    """
+    Render a page with the template's render profile.
+    Photo areas are whited out before encoding when the template defines them.
+
+    Returns:
+        dict: {'pix': fitz.Pixmap, 'page_W': float, 'page_H': float,
+               'clip_px': (x0, y0), 'profile': str, 'template': dict,
+               'masked_cells': int}
+    """
+    template = to_relative_template(template)
+    profile_name, profile = get_render_profile(template)
+    zoom = profile['dpi'] / 72
+    page_W, page_H = page.rect.width * zoom, page.rect.height * zoom
+    clip = _grid_clip(page, template) if profile['clip'] else page.rect
+    colorspace = fitz.csGRAY if profile['grayscale'] else fitz.csRGB
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip, colorspace=colorspace)
+
+    x0, y0 = clip.x0 * zoom, clip.y0 * zoom
+    masked = 0
+    if mask_photos and template.get('photo_excl_width', 0) > 0:
+        template_px = resolve_template(template, page_W, page_H, (x0, y0, x0 + pix.width, y0 + pix.height))
+        masked = mask_photo_regions(pix, template_px)
+
+    return {
+        'pix': pix,
+        'page_W': page_W,
+        'page_H': page_H,
+        'clip_px': (x0, y0),
+        'profile': profile_name,
+        'template': template,
+        'masked_cells': masked
+    }
+
+
+def encode_raster(raster, encoding=None):
+    """Encode a rasterize_page() result into the render_page() dict"""
+    pix = raster['pix']
+    encoding = encoding or DEFAULT_ENCODING_PROFILE
+    content, width, height = encode_pixmap(pix, encoding)
+
+    # Downscaled encodings shrink the whole pixel space the template maps into
+    sx, sy = width / pix.width, height / pix.height
+    x0, y0 = raster['clip_px'][0] * sx, raster['clip_px'][1] * sy
+    return {
+        'content': content,
+        'width': width,
+        'height': height,
+        'source': 'raster',
+        'profile': f"{raster['profile']}/{encoding}",
+        'template': resolve_template(
+            raster['template'], raster['page_W'] * sx, raster['page_H'] * sy,
+            (x0, y0, x0 + width, y0 + height)
+        )
+    }
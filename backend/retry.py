@@ -0,0 +1,196 @@
+"""
+OCR Retry Policy
+Typed retry classification, full-jitter backoff, per-page deadlines and a
+shared circuit breaker for Google Cloud Vision calls
+"""
+import random
+import threading
+import time
+from collections import deque
+from google.api_core import exceptions as gexc
+
+# Transient server-side failures worth another attempt
+RETRYABLE_ERRORS = (
+    gexc.TooManyRequests,      # HTTP 429
+    gexc.ResourceExhausted,    # gRPC RESOURCE_EXHAUSTED (quota / rate limit)
+    gexc.ServiceUnavailable,   # 503 / UNAVAILABLE
+    gexc.BadGateway,           # 502
+    gexc.GatewayTimeout,       # 504
+    gexc.InternalServerError,  # 500 / INTERNAL
+    gexc.DeadlineExceeded,     # request timed out
+    gexc.Aborted,
+    ConnectionError,
+    TimeoutError,
+)
+
+# Errors that mean "slow down" rather than "try again"
+THROTTLE_ERRORS = (
+    gexc.TooManyRequests,
+    gexc.ResourceExhausted,
+    gexc.ServiceUnavailable,
+)
+
+
+class OCRError:
+    """
+    Structured OCR failure, returned in place of the old "Error: ..." string.
+    str() keeps the "Error: ..." form for scripts that only print it.
+    """
+
+    def __init__(self, kind, message, retryable=False, attempts=1):
+        self.kind = kind
+        self.message = message
+        self.retryable = retryable
+        self.attempts = attempts
+
+    @classmethod
+    def from_exception(cls, exc, retryable=False, attempts=1):
+        return cls(type(exc).__name__, str(exc), retryable, attempts)
+
+    def to_dict(self):
+        return {
+            'kind': self.kind,
+            'message': self.message,
+            'retryable': self.retryable,
+            'attempts': self.attempts
+        }
+
+    def __str__(self):
+        return f"Error: {self.kind}: {self.message}"
+
+    __repr__ = __str__
+
+
+class RetryPolicy:
+    """
+    Retry decisions for one OCR call.
+
+    Backoff uses "full jitter" (uniform 0..min(max_delay, base * 2^attempt))
+    so parallel workers that fail together don't retry in lockstep. No retry
+    is scheduled if it would end past the per-page `deadline` (seconds).
+    """
+
+    def __init__(self, max_attempts=4, base_delay=1.0, max_delay=20.0, deadline=90.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    @staticmethod
+    def is_retryable(exc):
+        return isinstance(exc, RETRYABLE_ERRORS)
+
+    @staticmethod
+    def is_throttle(exc):
+        return isinstance(exc, THROTTLE_ERRORS)
+
+    def backoff(self, attempt):
+        """Full-jitter delay before retry number `attempt` (0-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Pauses every OCR worker when the recent error rate spikes.
+
+    Outcomes from the last `window` seconds are tracked; once at least
+    `min_calls` are recorded and the failure ratio reaches `threshold`, the
+    breaker opens for `cooldown` seconds. After the cooldown it is half-open:
+    one worker is let through as a probe while the others keep waiting; its
+    success closes the breaker, its failure re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, threshold=0.5, min_calls=6, window=30.0, cooldown=15.0):
+        self.threshold = threshold
+        self.min_calls = min_calls
+        self.window = window
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.trips = 0
+        self._open_until = 0.0
+        self._probe_in_flight = False
+        self._outcomes = deque()
+        self._cond = threading.Condition()
+
+    def wait_until_closed(self, deadline):
+        """
+        Block while the breaker is open, or half-open with the probe call
+        taken by another worker. Returns False if `deadline` (monotonic
+        time) passes first.
+        """
+        with self._cond:
+            while self.state != self.CLOSED:
+                now = time.monotonic()
+                if self.state == self.OPEN and now >= self._open_until:
+                    self.state = self.HALF_OPEN
+                if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                    # This caller is the probe
+                    self._probe_in_flight = True
+                    return True
+                if now >= deadline:
+                    return False
+                until = min(self._open_until, deadline) if self.state == self.OPEN else deadline
+                self._cond.wait(until - now)
+            return True
+
+    def release_probe(self):
+        """
+        The probe call ended without a verdict (e.g. a non-retryable
+        error): let the next waiter probe instead
+        """
+        with self._cond:
+            if self.state == self.HALF_OPEN and self._probe_in_flight:
+                self._probe_in_flight = False
+                self._cond.notify_all()
+
+    def record_success(self):
+        with self._cond:
+            self._add(True)
+            if self.state == self.HALF_OPEN:
+                self.state = self.CLOSED
+                self._probe_in_flight = False
+                self._outcomes.clear()
+                print("✅ OCR circuit closed - resuming normal traffic")
+            self._cond.notify_all()
+
+    def record_failure(self):
+        with self._cond:
+            self._add(False)
+            if self.state == self.HALF_OPEN:
+                self._trip()
+                # Waiters go back to waiting for the new cooldown
+                self._cond.notify_all()
+                return
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if (self.state == self.CLOSED and len(self._outcomes) >= self.min_calls
+                    and failures / len(self._outcomes) >= self.threshold):
+                self._trip()
+
+    def _add(self, ok):
+        now = time.monotonic()
+        self._outcomes.append((now, ok))
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            self._outcomes.popleft()
+
+    def _trip(self):
+        self.state = self.OPEN
+        self._probe_in_flight = False
+        self.trips += 1
+        self._open_until = time.monotonic() + self.cooldown
+        print(f"🛑 OCR circuit open - pausing all workers for {self.cooldown:.0f}s")
+
+    def snapshot(self):
+        with self._cond:
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            return {
+                'state': self.state,
+                'trips': self.trips,
+                'recent_calls': len(self._outcomes),
+                'recent_failures': failures,
+                'reopens_in': round(max(0.0, self._open_until - time.monotonic()), 1)
+                if self.state == self.OPEN else 0
+            }
@@ -0,0 +1,220 @@
+"""
+Session Import
+Reopens a previous export (.xlsx or .jsonl) as voter records - no OCR -
+by reversing the template column mapping of the export registry
+"""
+import bisect
+import json
+import os
+
+from openpyxl import load_workbook
+
+from .consolidated_export import INDEX_HEADERS, INDEX_SHEET
+from .excel_export import (
+    DEFAULT_DATA_KEYS, DEFAULT_HEADERS, EXPORT_REGISTRY, IMPORTED_HEADER, SERIAL_KEY, TEMPLATE_COLUMNS,
+    template_key_for
+)
+from .flat_export import TOTALS_HEADERS, TOTALS_SHEET
+
+IMPORT_EXTENSIONS = ('.xlsx', '.jsonl')
+
+
+def _templates(preferred=None):
+    """
+    (template_key, headers, data_keys) candidates, preferred template(s)
+    first - a key or a list of keys in order of preference
+    """
+    candidates = [(key, config['headers'], config['data_keys']) for key, config in TEMPLATE_COLUMNS.items()]
+    candidates.append(('default', DEFAULT_HEADERS, DEFAULT_DATA_KEYS))
+    if isinstance(preferred, str):
+        preferred = [preferred]
+    rank = {}
+    for key in preferred or []:
+        rank.setdefault(template_key_for(key), len(rank))
+    return sorted(candidates, key=lambda c: rank.get(c[0], len(rank)))
+
+
+def match_template(columns, by='headers', preferred=None):
+    """
+    Template whose exported headers (or JSONL data keys) are exactly `columns`.
+
+    Returns:
+        tuple: (template_key, data_keys) or (None, None)
+    """
+    columns = [str(c).strip() if c is not None else '' for c in columns]
+    while columns and not columns[-1]:
+        columns.pop()
+    for key, headers, data_keys in _templates(preferred):
+        if columns == list(headers if by == 'headers' else data_keys):
+            return key, data_keys
+    return None, None
+
+
+def _reverse_columns(template_key, data_keys):
+    """
+    Per exported column, where its value goes back to:
+    None (serial number, recomputed), ('header', parsed_key, fallback)
+    or a voter field name.
+    """
+    header_fields = (EXPORT_REGISTRY.get(template_key) or {}).get('header_fields', {})
+    columns = []
+    for key in data_keys:
+        if key == SERIAL_KEY:
+            columns.append(None)
+        else:
+            columns.append(header_fields.get(key, key))
+    return columns
+
+
+def _to_voter(values, columns, order, source):
+    """
+    One exported row back as a voter record. Header-derived columns go
+    back to the voter field the template falls back to (so edits in the
+    review table reach the next export); the rest are kept under
+    IMPORTED_HEADER, which exports use instead of parsing a header.
+    """
+    voter = {'extraction_order': order, 'source_file': source}
+    header = None
+    for column, value in zip(columns, values):
+        if column is None:
+            continue
+        if value is None:
+            value = ''
+        if isinstance(column, tuple):
+            _, parsed_key, fallback = column
+            if header is None:
+                header = voter[IMPORTED_HEADER] = {}
+            if fallback:
+                voter[fallback] = value
+            else:
+                header[parsed_key] = value
+        else:
+            voter[column] = value
+    return voter
+
+
+def _openpyxl_sheets(wb):
+    """[(title, rows())] for every worksheet; rows() yields (row_no, values)"""
+    return [(ws.title, lambda ws=ws: enumerate(ws.iter_rows(values_only=True), 1)) for ws in wb.worksheets]
+
+
+def _sheet_sources(sheets):
+    """
+    {sheet title: [(first_row, source_pdf)]} from a consolidated export's
+    Index sheet or a batch workbook's Totals sheet
+    """
+    sources = {}
+    for title, rows in sheets:
+        if title == INDEX_SHEET:
+            headers = INDEX_HEADERS
+        elif title == TOTALS_SHEET:
+            headers = TOTALS_HEADERS
+        else:
+            continue
+        rows = (values for _, values in rows())
+        if list(next(rows, ())) != headers:
+            continue
+        for row in rows:
+            if title == INDEX_SHEET:
+                source, _, sheet, first_row = row[:4]
+            else:
+                (source, sheet), first_row = row[:2], 2
+            if sheet:
+                sources.setdefault(sheet, []).append((first_row or 2, source))
+    for ranges in sources.values():
+        ranges.sort()
+    return sources
+
+
+def _import_sheets(sheets, path, preferred_template):
+    sources = _sheet_sources(sheets)
+    default_source = os.path.basename(path)
+    voters, template_key = [], None
+    for title, rows in sheets:
+        rows = rows()
+        _, header = next(rows, (None, None))
+        if header is None:
+            continue
+        if title in (INDEX_SHEET, TOTALS_SHEET) and list(header) in (INDEX_HEADERS, TOTALS_HEADERS):
+            continue
+        key, data_keys = match_template(header, preferred=template_key or preferred_template)
+        if key is None:
+            print(f"⚠️ Import: sheet '{title}' has no known template columns, skipped")
+            continue
+        template_key = template_key or key
+        columns = _reverse_columns(key, data_keys)
+
+        ranges = sources.get(title, [])
+        firsts = [first for first, _ in ranges]
+        for row_no, values in rows:
+            if not any(v not in (None, '') for v in values):
+                continue
+            i = bisect.bisect_right(firsts, row_no) - 1
+            source = ranges[i][1] if i >= 0 else default_source
+            voters.append(_to_voter(values, columns, len(voters), source))
+    if template_key is None:
+        raise ValueError("No sheet with exported voter columns found")
+    return voters, template_key
+
+
+def import_xlsx(path, preferred_template=None):
+    """
+    Stream an exported workbook back into voter records. Every data sheet
+    is read; an Index/Totals sheet restores which PDF each row came from.
+    Uses openpyxl's read-only mode, which parses sheets with lxml when it
+    is installed - several times faster on large exports (about 30s per
+    100k rows without it).
+
+    Returns:
+        tuple: (voters, template_key)
+    """
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        return _import_sheets(_openpyxl_sheets(wb), path, preferred_template)
+    finally:
+        wb.close()
+
+
+def import_jsonl(path, preferred_template=None):
+    """
+    Read a JSONL export (or an incremental export's .partial.jsonl journal)
+    back into voter records.
+
+    Returns:
+        tuple: (voters, template_key)
+    """
+    voters, template_key, columns = [], None, None
+    source = os.path.basename(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if columns is None:
+                template_key, data_keys = match_template(list(record), by='data_keys', preferred=preferred_template)
+                if template_key is None:
+                    raise ValueError("JSONL records don't match any export template")
+                columns = _reverse_columns(template_key, data_keys)
+                keys = data_keys
+            voters.append(_to_voter([record.get(k) for k in keys], columns, len(voters), source))
+    if template_key is None:
+        raise ValueError("No records found")
+    return voters, template_key
+
+
+def import_export_file(path, preferred_template=None):
+    """
+    Reopen an earlier export as a review session.
+    preferred_template (a key or a list of keys) breaks ties between
+    templates with identical columns, e.g. the session's current template.
+
+    Returns:
+        tuple: (voters, template_key)
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.xlsx':
+        return import_xlsx(path, preferred_template)
+    if ext == '.jsonl':
+        return import_jsonl(path, preferred_template)
+    raise ValueError(f"Unsupported file type: {ext or path} (expected {', '.join(IMPORT_EXTENSIONS)})")
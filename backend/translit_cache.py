@@ -0,0 +1,162 @@
+"""
+Transliteration Cache
+Disk-backed (SQLite) cache for Gemini transliterations with a size cap,
+LRU eviction, prompt/model versioning and hit/miss statistics
+"""
+import os
+import sqlite3
+import threading
+import time
+
+# Default location: per-user, so the packaged .exe can always write it
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.voter_ocr', 'transliteration_cache.sqlite')
+DEFAULT_MAX_ENTRIES = 200000
+
+
+class TransliterationCache:
+    """
+    Persistent source -> transliteration map.
+
+    Entries are keyed by (version, source); `version` identifies the model
+    and prompt that produced them, so changing either starts a fresh
+    namespace instead of serving stale spellings. Recency is tracked per
+    entry and the least recently used rows are evicted past `max_entries`.
+    One instance is shared by all threads; WAL mode lets several processes
+    of a batch run share the same file.
+    """
+
+    def __init__(self, path=None, version='v1', max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path or os.getenv('TRANSLIT_CACHE_PATH', DEFAULT_CACHE_PATH)
+        self.version = version
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes_since_evict = 0
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        # Rows of this version, kept up to date on insert/evict/clear so
+        # stats() (called for every progress event) never scans the table
+        self._size = self._conn.execute(
+            'SELECT COUNT(*) FROM transliterations WHERE version = ?', (self.version,)
+        ).fetchone()[0]
+
+    def _connect(self):
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS transliterations (
+                version   TEXT NOT NULL,
+                source    TEXT NOT NULL,
+                result    TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (version, source)
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_translit_lru ON transliterations (last_used)')
+        conn.commit()
+        return conn
+
+    def get_many(self, sources):
+        """
+        Look up several strings at once.
+
+        Returns:
+            dict: {source: result} for the cached ones
+        """
+        unique = list(dict.fromkeys(s for s in sources if s))
+        if not unique:
+            return {}
+        found = {}
+        now = time.time()
+        with self._lock:
+            # SQLite caps bound parameters; query in chunks
+            for i in range(0, len(unique), 500):
+                chunk = unique[i:i + 500]
+                marks = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f'SELECT source, result FROM transliterations WHERE version = ? AND source IN ({marks})',
+                    [self.version] + chunk
+                ).fetchall()
+                found.update(rows)
+            if found:
+                self._conn.executemany(
+                    'UPDATE transliterations SET last_used = ? WHERE version = ? AND source = ?',
+                    [(now, self.version, s) for s in found]
+                )
+                self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(unique) - len(found)
+        return found
+
+    def get(self, source):
+        """Cached result for one string, or None"""
+        return self.get_many([source]).get(source)
+
+    def put_many(self, mapping):
+        """Store {source: result} pairs and evict LRU rows past the cap"""
+        items = [(self.version, s, r, time.time()) for s, r in mapping.items() if s and r]
+        if not items:
+            return
+        with self._lock:
+            inserted = self._conn.executemany(
+                'INSERT OR IGNORE INTO transliterations (version, source, result, last_used) VALUES (?, ?, ?, ?)',
+                items
+            ).rowcount
+            self._conn.executemany(
+                'UPDATE transliterations SET result = ?, last_used = ? WHERE version = ? AND source = ?',
+                [(r, used, version, source) for version, source, r, used in items]
+            )
+            self._size += inserted
+            self._writes_since_evict += len(items)
+            # Count rows only occasionally; eviction trims back below the cap
+            if self._writes_since_evict >= 1000 or self.max_entries < 1000:
+                self._evict()
+            self._conn.commit()
+
+    def put(self, source, result):
+        self.put_many({source: result})
+
+    def _evict(self):
+        self._writes_since_evict = 0
+        size = self._conn.execute('SELECT COUNT(*) FROM transliterations').fetchone()[0]
+        excess = size - self.max_entries
+        if excess > 0:
+            self._size -= self._conn.execute(
+                'SELECT COUNT(*) FROM (SELECT version FROM transliterations ORDER BY last_used LIMIT ?) '
+                'WHERE version = ?',
+                (excess, self.version)
+            ).fetchone()[0]
+            self._conn.execute(
+                'DELETE FROM transliterations WHERE rowid IN '
+                '(SELECT rowid FROM transliterations ORDER BY last_used LIMIT ?)',
+                (excess,)
+            )
+            self.evictions += excess
+
+    def clear(self, all_versions=False):
+        """Delete this version's entries (or everything)"""
+        with self._lock:
+            if all_versions:
+                self._conn.execute('DELETE FROM transliterations')
+            else:
+                self._conn.execute('DELETE FROM transliterations WHERE version = ?', (self.version,))
+            self._conn.commit()
+            self._size = 0
+
+    def stats(self):
+        """Hit/miss counters and current size for progress reporting"""
+        size = self._size
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions,
+            'size': size,
+            'max_entries': self.max_entries,
+            'version': self.version
+        }
@@ -0,0 +1,95 @@
+"""
+Corrections Benchmark - Aho-Corasick correction automaton
+Builds the automaton over a large synthetic pattern set (plus the real
+corrections file), checks it against a leftmost-longest regex reference,
+and compares throughput with the old one-str.replace-per-pattern loop.
+
+Usage:
+    python benchmark_corrections.py
+    python benchmark_corrections.py --patterns 50000 --texts 20000
+"""
+import argparse
+import random
+import re
+import time
+
+from backend.corrections import CorrectionAutomaton, MARATHI_CORRECTIONS
+
+CONSONANTS = 'कखगघचछजझटठडढणतथदधनपफबभमयरलवशषसहळ'
+SIGNS = ['', '', 'ा', 'ि', 'ी', 'ु', 'ू', 'े', 'ै', 'ो', 'ं', '्']
+SURNAMES = ['पाटील', 'पवार', 'जाधव', 'आत्राम', 'देशमुख', 'शिंदे', 'मोरे']
+
+
+def random_word(rnd, syllables):
+    return ''.join(rnd.choice(CONSONANTS) + rnd.choice(SIGNS) for _ in range(syllables))
+
+
+def generate_patterns(count, seed=11):
+    rnd = random.Random(seed)
+    patterns = dict(MARATHI_CORRECTIONS)
+    while len(patterns) < count:
+        patterns[random_word(rnd, rnd.randint(2, 4))] = random_word(rnd, rnd.randint(2, 4))
+    return patterns
+
+
+def generate_texts(count, patterns, seed=12):
+    """Names with a pattern embedded in about a third of them"""
+    rnd = random.Random(seed)
+    keys = list(patterns)
+    texts = []
+    for _ in range(count):
+        words = [random_word(rnd, rnd.randint(2, 4)), rnd.choice(SURNAMES)]
+        if rnd.random() < 0.33:
+            words[0] = rnd.choice(keys) + words[0][:2]
+        texts.append(' '.join(words))
+    return texts
+
+
+def reference_apply(pattern_re, patterns, text):
+    """Leftmost-longest via a regex alternation sorted longest first"""
+    return pattern_re.sub(lambda m: patterns[m.group(0)], text)
+
+
+def legacy_apply(patterns, text):
+    for wrong, correct in patterns.items():
+        text = text.replace(wrong, correct)
+    return text
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--patterns', type=int, default=10000, help='number of patterns (default 10000)')
+    ap.add_argument('--texts', type=int, default=20000, help='number of name fields (default 20000)')
+    args = ap.parse_args()
+
+    patterns = generate_patterns(args.patterns)
+    texts = generate_texts(args.texts, patterns)
+
+    started = time.perf_counter()
+    automaton = CorrectionAutomaton(patterns)
+    build_ms = (time.perf_counter() - started) * 1000
+    print(f"🔧 Built automaton: {len(automaton)} patterns, {len(automaton._goto)} states in {build_ms:.0f} ms")
+
+    pattern_re = re.compile('|'.join(re.escape(p) for p in sorted(patterns, key=len, reverse=True)))
+    mismatches = [t for t in texts if automaton.apply(t) != reference_apply(pattern_re, patterns, t)]
+    print(f"🔍 Leftmost-longest check: {len(mismatches)} mismatches in {len(texts)} texts")
+    for t in mismatches[:5]:
+        print(f"   ❌ {t}: '{automaton.apply(t)}' vs '{reference_apply(pattern_re, patterns, t)}'")
+
+    started = time.perf_counter()
+    for t in texts:
+        automaton.apply(t)
+    rate = len(texts) / (time.perf_counter() - started)
+
+    legacy_texts = texts[:max(1, min(len(texts), 200000 // len(patterns)))]
+    started = time.perf_counter()
+    for t in legacy_texts:
+        legacy_apply(patterns, t)
+    legacy_rate = len(legacy_texts) / (time.perf_counter() - started)
+
+    print(f"⏱️ str.replace loop: {legacy_rate:10,.0f} fields/sec")
+    print(f"⏱️ automaton:        {rate:10,.0f} fields/sec ({rate / legacy_rate:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
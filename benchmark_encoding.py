@@ -0,0 +1,210 @@
+"""
+Encoding Benchmark - OCR upload profiles per template
+Measures upload bytes, encode time and parse accuracy of every profile in
+backend/encoding.py against recorded ground truth, then stores the best
+profile per template in backend/encoding_profiles.json (picked up by
+load_template).
+
+Ground truth files: ground_truth/<template_key>/<name>.json
+    {
+      "pdf": "samples/WardWiseData/FinalList_Ward_3.pdf",
+      "pages": {"3": [{"epic": "...", "name_marathi": "...", "age": "42", ...}]}
+    }
+
+Usage:
+    python benchmark_encoding.py
+    python benchmark_encoding.py --dry-run          # report only, keep selections
+    python benchmark_encoding.py --record wardwise samples/WardWiseData/FinalList_Ward_3.pdf 3 4
+        # writes a ground-truth draft from the baseline profile - review it by hand
+
+Note: every profile costs one Vision call per ground-truth page.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import fitz  # PyMuPDF
+
+from backend.api import load_template
+from backend.ocr_engine import OCREngine
+from backend.parser import parse_gcv_blocks, extract_voter_from_block
+from backend.corrections import apply_marathi_corrections
+from backend.renderer import rasterize_page, encode_raster
+from backend.retry import OCRError
+from backend.encoding import (
+    ENCODING_PROFILES, DEFAULT_ENCODING_PROFILE, choose_profile,
+    load_selected_profiles, save_selected_profiles
+)
+
+GROUND_TRUTH_DIR = 'ground_truth'
+REPORT_FILE = 'encoding_benchmark.json'
+FIELDS = ('epic', 'name_marathi', 'relation_name_marathi', 'house_no', 'age', 'gender')
+
+
+def parse_page_voters(word_annotations, image_W, image_H, template):
+    """Grid-parse one OCR'd page into voter dicts (EPIC-bearing blocks only)"""
+    parsed = parse_gcv_blocks(word_annotations, image_W, image_H, template)
+    voters = []
+    for block in parsed.get('blocks', []):
+        if not block.get('text', '').strip():
+            continue
+        voter = extract_voter_from_block(block['text'])
+        if not voter.get('epic'):
+            continue
+        voter['name_marathi'] = apply_marathi_corrections(voter['name_marathi'])
+        voter['relation_name_marathi'] = apply_marathi_corrections(voter['relation_name_marathi'])
+        voters.append(voter)
+    return voters
+
+
+def score_page(expected, got):
+    """Return (matched_fields, total_fields); voters are matched by EPIC"""
+    by_epic = {v['epic']: v for v in got}
+    matched = 0
+    for exp in expected:
+        found = by_epic.get(exp.get('epic'))
+        if not found:
+            continue
+        matched += sum(1 for f in FIELDS if str(found.get(f, '')).strip() == str(exp.get(f, '')).strip())
+    return matched, len(expected) * len(FIELDS)
+
+
+def ocr_voters(ocr, page_image):
+    full_text, word_annotations = ocr.run_ocr_content(page_image['content'])
+    if isinstance(full_text, OCRError) or not word_annotations:
+        return None
+    return parse_page_voters(word_annotations, page_image['width'], page_image['height'], page_image['template'])
+
+
+def iter_ground_truth():
+    """Yield (template_key, path, data) for every ground-truth file"""
+    if not os.path.isdir(GROUND_TRUTH_DIR):
+        return
+    for template_key in sorted(os.listdir(GROUND_TRUTH_DIR)):
+        folder = os.path.join(GROUND_TRUTH_DIR, template_key)
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            if name.endswith('.json'):
+                path = os.path.join(folder, name)
+                with open(path, 'r', encoding='utf-8') as f:
+                    yield template_key, path, json.load(f)
+
+
+def benchmark_template(ocr, template_key, entries):
+    """Run every encoding profile over a template's ground-truth pages"""
+    template = load_template(template_key)
+    results = {name: {'bytes': 0, 'encode_ms': 0.0, 'matched': 0, 'total': 0, 'pages': 0}
+               for name in ENCODING_PROFILES}
+
+    for path, data in entries:
+        doc = fitz.open(data['pdf'])
+        for page_key, expected in data.get('pages', {}).items():
+            page_num = int(page_key) - 1
+            raster = rasterize_page(doc[page_num], template)
+            for name in ENCODING_PROFILES:
+                started = time.perf_counter()
+                page_image = encode_raster(raster, name)
+                encode_ms = (time.perf_counter() - started) * 1000
+
+                voters = ocr_voters(ocr, page_image)
+                matched, total = score_page(expected, voters or [])
+                r = results[name]
+                r['bytes'] += len(page_image['content'])
+                r['encode_ms'] += encode_ms
+                r['matched'] += matched
+                r['total'] += total
+                r['pages'] += 1
+                print(f"   {os.path.basename(path)} p{page_key} {name:16s} "
+                      f"{len(page_image['content']) // 1024:6d} KB {encode_ms:7.1f} ms  {matched}/{total}")
+        doc.close()
+
+    for r in results.values():
+        r['accuracy'] = r['matched'] / r['total'] if r['total'] else 0.0
+    return results
+
+
+def print_report(template_key, results, chosen):
+    print(f"\n📊 {template_key}")
+    print(f"   {'profile':16s} {'KB/page':>8s} {'ms/page':>8s} {'accuracy':>9s}")
+    for name, r in sorted(results.items(), key=lambda kv: kv[1]['bytes']):
+        pages = max(1, r['pages'])
+        mark = '  ⬅ selected' if name == chosen else ''
+        print(f"   {name:16s} {r['bytes'] / pages / 1024:8.1f} {r['encode_ms'] / pages:8.1f} "
+              f"{r['accuracy'] * 100:8.2f}%{mark}")
+
+
+def record_ground_truth(template_key, pdf_path, pages):
+    """Draft ground truth from the baseline profile for manual correction"""
+    ocr = OCREngine()
+    template = load_template(template_key)
+    doc = fitz.open(pdf_path)
+    data = {'pdf': pdf_path, 'pages': {}}
+    for page_no in pages:
+        raster = rasterize_page(doc[page_no - 1], template)
+        voters = ocr_voters(ocr, encode_raster(raster, DEFAULT_ENCODING_PROFILE)) or []
+        data['pages'][str(page_no)] = [{f: v.get(f, '') for f in FIELDS} for v in voters]
+        print(f"   page {page_no}: {len(voters)} voters")
+    doc.close()
+
+    folder = os.path.join(GROUND_TRUTH_DIR, template_key)
+    os.makedirs(folder, exist_ok=True)
+    out = os.path.join(folder, os.path.splitext(os.path.basename(pdf_path))[0] + '.json')
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    print(f"✅ Ground truth draft written: {out} (review and correct before benchmarking)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--record', nargs='+', metavar='ARG',
+                    help='TEMPLATE PDF PAGE [PAGE...]: draft ground truth from the baseline profile')
+    ap.add_argument('--dry-run', action='store_true', help='print results without saving selections')
+    ap.add_argument('--max-drop', type=float, default=0.005,
+                    help='allowed accuracy drop vs jpeg_q95 (default 0.005)')
+    args = ap.parse_args()
+
+    if args.record:
+        if len(args.record) < 3:
+            ap.error('--record needs TEMPLATE PDF PAGE [PAGE...]')
+        record_ground_truth(args.record[0], args.record[1], [int(p) for p in args.record[2:]])
+        return
+
+    by_template = {}
+    for template_key, path, data in iter_ground_truth():
+        by_template.setdefault(template_key, []).append((path, data))
+    if not by_template:
+        print(f"❌ No ground truth found under {GROUND_TRUTH_DIR}/ (use --record first)")
+        sys.exit(1)
+
+    ocr = OCREngine()
+    selections = dict(load_selected_profiles())
+    report = {}
+    for template_key, entries in by_template.items():
+        print(f"🔬 Benchmarking {template_key} ({len(entries)} file(s))...")
+        results = benchmark_template(ocr, template_key, entries)
+        chosen = choose_profile(results, max_accuracy_drop=args.max_drop)
+        print_report(template_key, results, chosen)
+        report[template_key] = {'selected': chosen, 'results': results}
+        selections[template_key] = {
+            'profile': chosen,
+            'accuracy': round(results[chosen]['accuracy'], 4),
+            'kb_per_page': round(results[chosen]['bytes'] / max(1, results[chosen]['pages']) / 1024, 1),
+            'benchmarked': time.strftime('%Y-%m-%d')
+        }
+
+    with open(REPORT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n📝 Full results: {REPORT_FILE}")
+
+    if args.dry_run:
+        print("ℹ️ Dry run - selections not saved")
+    else:
+        save_selected_profiles(selections)
+        print("✅ Selections saved to backend/encoding_profiles.json")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Transliteration Benchmark - offline (table-driven) transliterator
+Checks that transliterate_marathi_many matches the original per-call
+indic-transliteration implementation name for name, then measures
+throughput of the list API (target: 100k names/sec).
+
+Names are generated from common given names/surnames so the run needs no
+sample PDFs; pass a text file (one name per line) to use real data.
+
+Usage:
+    python benchmark_transliteration.py
+    python benchmark_transliteration.py names.txt --count 500000
+"""
+import argparse
+import random
+import re
+import time
+
+from backend.corrections import transliterate_marathi, transliterate_marathi_many
+
+GIVEN = ['प्रसाद', 'सुनील', 'राजेश', 'महेश', 'दिनेश', 'विजय', 'चंदा', 'आशा', 'सतीश', 'गोपाल',
+         'ज्ञानेश्वर', 'क्षितिज', 'संपत', 'अंबादास', 'शंभू', 'गंगा', 'लक्ष्मी', 'सौ.', 'श्रीमती', 'रमेश']
+SURNAMES = ['पाटील', 'पवार', 'जाधव', 'आत्राम', 'देशमुख', 'कुलकर्णी', 'शिंदे', 'आठवले', 'ढ़ोले', 'मोरे']
+TARGET_PER_SEC = 100000
+
+
+def legacy_transliterate_marathi(marathi_text):
+    """The original implementation (library call + chained replaces), for comparison"""
+    if not marathi_text:
+        return ''
+    marathi_text = marathi_text.replace('नाव', '').replace('नांव', '').replace('नव', '').strip()
+    marathi_text = re.sub(r'[\|:]+', ' ', marathi_text)
+    marathi_text = re.sub(r'\s+', ' ', marathi_text).strip()
+    if not marathi_text:
+        return ''
+    from indic_transliteration import sanscript
+    from indic_transliteration.sanscript import transliterate
+    result = transliterate(marathi_text, sanscript.DEVANAGARI, sanscript.HK)
+    result = re.sub(r'M([kg])', r'n\1', result)
+    result = re.sub(r'M([cj])', r'n\1', result)
+    result = re.sub(r'M([pb])', r'm\1', result)
+    result = result.replace('M', 'n')
+    for hk, eng in {'A': 'a', 'I': 'ee', 'U': 'oo', 'R': 'ri', 'G': 'n', 'J': 'n', 'T': 't', 'D': 'd',
+                    'N': 'n', 'z': 'sh', 'S': 'sh', 'H': '', '|': '', "'": ''}.items():
+        result = result.replace(hk, eng)
+    result = result.replace('aa', 'a').replace('ii', 'i')
+    ends_with_vowel = marathi_text.endswith(('ा', 'ी', 'ू', 'े', 'ो', 'ौ', 'ै'))
+    words = result.split()
+    cleaned = []
+    for i, word in enumerate(words):
+        if i == len(words) - 1 and not ends_with_vowel and len(word) > 3 and word.endswith('a'):
+            word = word[:-1]
+        cleaned.append(word.capitalize())
+    return ' '.join(cleaned)
+
+
+def generate_names(count, seed=7):
+    rnd = random.Random(seed)
+    names = []
+    for _ in range(count):
+        parts = [rnd.choice(GIVEN) for _ in range(rnd.randint(1, 2))] + [rnd.choice(SURNAMES)]
+        names.append(' '.join(parts))
+    return names
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('names_file', nargs='?', help='text file with one Marathi name per line')
+    ap.add_argument('--count', type=int, default=200000, help='names to time (default 200000)')
+    ap.add_argument('--check', type=int, default=20000, help='names compared with the legacy version')
+    args = ap.parse_args()
+
+    if args.names_file:
+        with open(args.names_file, 'r', encoding='utf-8') as f:
+            base = [line.strip() for line in f if line.strip()]
+        names = (base * (args.count // max(1, len(base)) + 1))[:args.count]
+    else:
+        names = generate_names(args.count)
+
+    # Identical output
+    sample = names[:args.check]
+    mismatches = [(n, legacy_transliterate_marathi(n), got)
+                  for n, got in zip(sample, transliterate_marathi_many(sample))
+                  if legacy_transliterate_marathi(n) != got]
+    print(f"🔍 Compared {len(sample)} names with the legacy transliterator: {len(mismatches)} mismatches")
+    for name, old, new in mismatches[:10]:
+        print(f"   ❌ {name}: '{old}' vs '{new}'")
+
+    # Throughput
+    started = time.perf_counter()
+    legacy_sample = names[:5000]
+    for name in legacy_sample:
+        legacy_transliterate_marathi(name)
+    legacy_rate = len(legacy_sample) / (time.perf_counter() - started)
+
+    transliterate_marathi(names[0])  # build tables outside the timed run
+    started = time.perf_counter()
+    transliterate_marathi_many(names)
+    rate = len(names) / (time.perf_counter() - started)
+
+    print(f"⏱️ legacy:        {legacy_rate:10,.0f} names/sec")
+    print(f"⏱️ table-driven:  {rate:10,.0f} names/sec ({rate / legacy_rate:.0f}x)")
+    print(("✅" if rate >= TARGET_PER_SEC else "⚠️") + f" target {TARGET_PER_SEC:,} names/sec")
+
+
+if __name__ == '__main__':
+    main()
@@ -20,6 +20,8 @@ def build():
         '--console',  # Show console for debugging
         '--add-data=frontend;frontend',
         '--add-data=google-cloud-vision-key.json;.',
+        '--add-data=backend/name_dictionary.tsv;backend',
+        '--add-data=backend/marathi_corrections.tsv;backend',
         '--hidden-import=webview',
         '--hidden-import=webview.platforms.edgechromium',
         '--hidden-import=google.cloud.vision',
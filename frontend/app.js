@@ -1,5 +1,118 @@
 // Global state
 let currentVoters = [];
+let isProcessing = false;
+
+// ============================================
+// PROGRESS EVENTS
+// ============================================
+
+// Latest progress sections (events carry only the changed ones) and the
+// sequence number of the last log message shown
+const progressState = { seq: 0, sections: {}, lastEventAt: 0 };
+// Without pushes for this long while busy, read progress directly
+const PROGRESS_STALE_MS = 5000;
+
+// Called by the backend (evaluate_js) with coalesced progress deltas
+window.onProgressEvent = function (event) {
+    progressState.lastEventAt = Date.now();
+    if (event.after > progressState.seq) {
+        // Missed an event: fetch what we don't have
+        resyncProgress();
+    }
+    applyProgress(event);
+};
+
+async function resyncProgress() {
+    try {
+        const progress = await pywebview.api.get_progress(progressState.seq);
+        progressState.lastEventAt = Date.now();
+        applyProgress(progress);
+    } catch (e) {
+        console.log('Progress resync error:', e);
+    }
+}
+
+function applyProgress(progress) {
+    const fresh = (progress.messages || []).filter(([seq]) => seq > progressState.seq);
+    if (fresh.length > 0) {
+        appendProgressLog(fresh.map(([, text]) => text));
+    }
+    progressState.seq = Math.max(progressState.seq, progress.seq || 0);
+
+    for (const key of ['status', 'concurrency', 'circuit', 'transliteration', 'export']) {
+        if (key in progress) progressState.sections[key] = progress[key];
+    }
+    if ('status' in progress || 'concurrency' in progress || 'circuit' in progress) {
+        renderProcessingStatus(progressState.sections);
+    }
+    if ('export' in progress) {
+        renderExportJob(progressState.sections.export);
+    }
+}
+
+function appendProgressLog(messages) {
+    const logEl = document.getElementById('logContent');
+    if (logEl.dataset.placeholder) {
+        logEl.innerHTML = '';
+        delete logEl.dataset.placeholder;
+    }
+    messages.forEach(msg => {
+        const line = document.createElement('div');
+        line.innerHTML = msg;
+        logEl.appendChild(line);
+    });
+    // Last 20 messages
+    while (logEl.childElementCount > 20) {
+        logEl.removeChild(logEl.firstElementChild);
+    }
+    logEl.scrollTop = logEl.scrollHeight;
+}
+
+function renderProcessingStatus(progress) {
+    const status = progress.status;
+    if (!status) return;
+    document.getElementById('currentPage').textContent = status.current_page || 0;
+    document.getElementById('totalPages').textContent = status.total_pages || 0;
+    document.getElementById('votersFound').textContent = status.voters_found || 0;
+
+    // Update progress bar
+    if (status.total_pages > 0) {
+        const pct = Math.round((status.current_page / status.total_pages) * 100);
+        document.getElementById('progressFill').style.width = pct + '%';
+        let progressLabel = `Processing page ${status.current_page} of ${status.total_pages}...`;
+        // Show the adaptive OCR concurrency and why it last changed
+        const cc = progress.concurrency;
+        if (cc && cc.history && cc.history.length > 0) {
+            const last = cc.history[cc.history.length - 1];
+            progressLabel += ` (OCR parallel: ${cc.limit}, last: ${last.event})`;
+        }
+        if (progress.circuit && progress.circuit.state === 'open') {
+            progressLabel += ` - OCR paused (high error rate), resuming in ${progress.circuit.reopens_in}s`;
+        }
+        document.getElementById('progressText').textContent = progressLabel;
+    }
+}
+
+// Fallback if pushes stop arriving (e.g. the window was reloaded)
+setInterval(() => {
+    if ((isProcessing || exportJobId) && Date.now() - progressState.lastEventAt > PROGRESS_STALE_MS) {
+        resyncProgress();
+    }
+}, PROGRESS_STALE_MS);
+
+// Hide batch output formats this install can't write (e.g. Parquet without pyarrow)
+window.addEventListener('pywebviewready', async () => {
+    try {
+        const formats = await pywebview.api.get_output_formats();
+        const formatEl = document.getElementById('outputFormat');
+        if (!formatEl || !formats) return;
+        Array.from(formatEl.options)
+            .filter(option => !formats.includes(option.value))
+            .forEach(option => option.remove());
+    } catch (e) {
+        console.warn('Could not read output formats:', e);
+    }
+});
 
 // Upload Single PDF
 async function uploadPDF() {
@@ -44,36 +157,15 @@ async function processFileOrFolder(mode) {
         document.getElementById('currentPage').textContent = '0';
         document.getElementById('totalPages').textContent = '0';
         document.getElementById('votersFound').textContent = '0';
-        document.getElementById('logContent').innerHTML = 'Starting...';
+        const logEl = document.getElementById('logContent');
+        logEl.innerHTML = 'Starting...';
+        logEl.dataset.placeholder = '1';
         document.getElementById('progressFill').style.width = '0%';
         
-        // Start progress polling
-        let progressInterval = setInterval(async () => {
-            try {
-                const progress = await pywebview.api.get_progress();
-                if (progress && progress.status) {
-                    const status = progress.status;
-                    document.getElementById('currentPage').textContent = status.current_page || 0;
-                    document.getElementById('totalPages').textContent = status.total_pages || 0;
-                    document.getElementById('votersFound').textContent = status.voters_found || 0;
-                    
-                    // Update progress bar
-                    if (status.total_pages > 0) {
-                        const pct = Math.round((status.current_page / status.total_pages) * 100);
-                        document.getElementById('progressFill').style.width = pct + '%';
-                        document.getElementById('progressText').textContent = `Processing page ${status.current_page} of ${status.total_pages}...`;
-                    }
-                }
-                if (progress && progress.messages && progress.messages.length > 0) {
-                    const logHtml = progress.messages.map(msg => `<div>${msg}</div>`).join('');
-                    const logEl = document.getElementById('logContent');
-                    logEl.innerHTML = logHtml;
-                    logEl.scrollTop = logEl.scrollHeight;
-                }
-            } catch (e) {
-                console.log('Progress poll error:', e);
-            }
-        }, 500);
+        // Progress is pushed by the backend (onProgressEvent); start from
+        // its current sequence number so only new messages are shown
+        isProcessing = true;
+        await resyncProgress();
 
         if (mode === 'pdf') {
             const filePath = await pywebview.api.select_pdf();
@@ -89,11 +181,12 @@ async function processFileOrFolder(mode) {
                 resetUI(); return; 
             }
             document.getElementById('fileInfo').textContent = `Batch Processing: ${folderPath}`;
-            result = await pywebview.api.process_batch(folderPath);
+            const formatEl = document.getElementById('outputFormat');
+            result = await pywebview.api.process_batch(folderPath, formatEl ? formatEl.value : 'xlsx');
         }
 
         if (result.success) {
-            currentVoters = result.voters;
+            currentVoters = result.voters || [];
             displayResults(result);
             
             // Different messages for single PDF vs batch
@@ -110,14 +203,17 @@ async function processFileOrFolder(mode) {
                 message += `• Total voters extracted: ${result.total_voters}\n\n`;
                 
                 if (filesDetail.length > 0) {
-                    message += `📁 Excel files created in the same folder:\n`;
+                    message += `📁 Output files created in the same folder:\n`;
                     filesDetail.slice(0, 5).forEach(f => {
-                        message += `  • ${f.excel} (${f.voters} voters)\n`;
+                        message += `  • ${f.output} (${f.voters} voters)\n`;
                     });
                     if (filesDetail.length > 5) {
                         message += `  ... and ${filesDetail.length - 5} more files\n`;
                     }
                 }
+                if (result.output_path) {
+                    message += `\nUse "Open Previous Export" to review ${result.output_path.split('\\').pop()}.\n`;
+                }
                 
                 alert(message);
             } else {
@@ -127,8 +223,6 @@ async function processFileOrFolder(mode) {
             alert(`❌ Error: ${result.error}`);
         }
         
-        // Stop progress polling
-        clearInterval(progressInterval);
         try { await pywebview.api.clear_progress(); } catch (e) {}
         
     } catch (error) {
@@ -139,7 +233,41 @@ async function processFileOrFolder(mode) {
     }
 }
 
+// Reopen an earlier Excel/JSONL export for review (no OCR)
+async function importPreviousExport() {
+    const importBtn = document.getElementById('importBtn');
+    try {
+        const filePath = await pywebview.api.select_import_file();
+        if (!filePath) return;
+        importBtn.disabled = true;
+        document.getElementById('fileInfo').textContent = `Opening: ${filePath.split('\\').pop()}`;
+
+        // Current template first, then the other dropdown templates
+        const selectEl = document.getElementById('templateSelect');
+        const options = selectEl ? Array.from(selectEl.options).map(o => o.value).filter(v => v) : [];
+        const preferred = selectEl && selectEl.value ? [selectEl.value, ...options] : options;
+        const result = await pywebview.api.import_session(filePath, preferred);
+
+        if (result.success) {
+            currentVoters = result.voters;
+            if (selectEl && options.includes(result.template)) {
+                selectEl.value = result.template;
+            }
+            displayResults(result);
+            document.getElementById('fileInfo').textContent = `Opened: ${filePath.split('\\').pop()} (${result.total_voters} voters)`;
+        } else {
+            alert(`❌ Error: ${result.error}`);
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        alert(`Error: ${error}`);
+    } finally {
+        importBtn.disabled = false;
+    }
+}
+
 function resetUI() {
+    isProcessing = false;
     document.getElementById('uploadBtn').disabled = false;
     document.getElementById('batchBtn').disabled = false;
     document.getElementById('progressSection').style.display = 'none';
@@ -224,8 +352,11 @@ function renderTable() {
 // Delete Record
 function deleteRecord(index) {
     if (confirm('Are you sure you want to delete this record?')) {
-        currentVoters.splice(index, 1);
+        const [removed] = currentVoters.splice(index, 1);
         renderTable();
+        if (removed && removed.record_id !== undefined && window.pywebview) {
+            pywebview.api.delete_record(removed.record_id).catch(err => console.error('Sync error:', err));
+        }
     }
 }
 
@@ -239,6 +370,9 @@ function clearAllRecords() {
     if (confirm(`Are you sure you want to delete all ${currentVoters.length} records?\n\nThis action cannot be undone.`)) {
         currentVoters = [];
         renderTable();
+        if (window.pywebview) {
+            pywebview.api.clear_data().catch(err => console.error('Sync error:', err));
+        }
         document.getElementById('resultsSection').style.display = 'none';
         alert('✅ All records cleared successfully!');
     }
@@ -278,7 +412,7 @@ function closeModal() {
     document.getElementById('editModal').style.display = 'none';
 }
 
-function saveRecord(event) {
+async function saveRecord(event) {
     event.preventDefault();
     
     const newRecord = {
@@ -299,10 +433,25 @@ function saveRecord(event) {
         newRecord.relation_name_marathi = currentVoters[editIndex].relation_name_marathi; // Keep existing
     }
 
+    // Sync the single change (the backend exports its own copy and learns
+    // recurring OCR fixes); new records get their record_id before they are
+    // shown, so every row in the table can be edited by id
     if (isEditing) {
+        const recordId = currentVoters[editIndex].record_id;
         // Merge with existing to keep other fields
         currentVoters[editIndex] = { ...currentVoters[editIndex], ...newRecord };
+        if (window.pywebview && recordId !== undefined) {
+            pywebview.api.update_record(recordId, newRecord).catch(err => console.error('Sync error:', err));
+        }
     } else {
+        if (window.pywebview) {
+            try {
+                const r = await pywebview.api.add_record(newRecord);
+                if (r && r.success) newRecord.record_id = r.record_id;
+            } catch (err) {
+                console.error('Sync error:', err);
+            }
+        }
         currentVoters.push(newRecord);
     }
     
@@ -310,40 +459,70 @@ function saveRecord(event) {
     renderTable();
 }
 
-// Export to Excel
+// Export to Excel (background job on the backend's copy of the data)
+let exportJobId = null;
+let exportButtonLabel = null;
+
 async function exportExcel() {
     try {
+        // A second click while exporting offers to cancel
+        if (exportJobId) {
+            if (confirm('An export is running. Cancel it?')) {
+                await pywebview.api.cancel_export(exportJobId);
+            }
+            return;
+        }
+        
         if (currentVoters.length === 0) {
             alert('No data to export!');
             return;
         }
         
-        // Push updates to backend before export? 
-        // No, we can just send the currentVoters list back to Python!
-        // Wait, pywebview API is one-way usually? No, we can pass args.
-        // But `excel_export` is checking `self.current_data` in Python.
-        // We need to UPDATE Python's state with our edited data.
-        
-        // Let's add an API method: update_data(data)
-        await pywebview.api.update_data(currentVoters);
-        
         const timestamp = new Date().toISOString().replace(/[:.]/g, '-').slice(0, 19);
         const defaultPath = `voter_data_${timestamp}.xlsx`;
         
-        const result = await pywebview.api.export_to_excel(defaultPath);
-        
-        if (result.success) {
-            alert(`✅ Exported ${result.count} voters to:\n${result.path}`);
-        } else {
-            alert(`❌ Export failed: ${result.error}`);
+        // Edits are synced as they happen, so nothing is shipped back here
+        const started = await pywebview.api.start_export(defaultPath);
+        if (!started.success) {
+            alert(`❌ Export failed: ${started.error}`);
+            return;
         }
+        exportJobId = started.job_id;
+        exportButtonLabel = document.getElementById('exportBtn').textContent;
+        // The job's events may have arrived before its id did
+        renderExportJob(progressState.sections.export);
         
     } catch (error) {
         console.error('Export error:', error);
+        exportJobId = null;
         alert(`Error: ${error}`);
     }
 }
 
+// Export button state from the job's progress events
+function renderExportJob(job) {
+    if (!job || !exportJobId || job.id !== exportJobId) return;
+    const button = document.getElementById('exportBtn');
+    if (job.status === 'running' || job.status === 'queued') {
+        button.textContent = `⏳ Exporting ${job.percent}% (click to cancel)`;
+        return;
+    }
+    
+    exportJobId = null;
+    button.textContent = exportButtonLabel;
+    // Not inside the backend's evaluate_js call: an alert would hold it up
+    setTimeout(() => {
+        if (job.status === 'done') {
+            const files = job.files && job.files.length > 1 ? `\n(${job.files.length} files)` : '';
+            alert(`✅ Exported ${job.records} voters to:\n${job.files[0] || job.path}${files}`);
+        } else if (job.status === 'cancelled') {
+            alert('Export cancelled.');
+        } else {
+            alert(`❌ Export failed: ${job.error}`);
+        }
+    }, 0);
+}
+
 // ============================================
 // SEARCH, FILTER & STATISTICS FUNCTIONS
 // ============================================
@@ -3,6 +3,7 @@ Voter OCR Desktop Application
 Main entry point for PyWebView application
 """
 import webview
+import multiprocessing
 import os
 import sys
 from dotenv import load_dotenv
@@ -64,6 +65,11 @@ def main():
     
     # Start the application with EdgeChromium backend (avoids pythonnet/WinForms dependency)
     webview.start(debug=True, gui='edgechromium')
+    
+    # Window closed: stop the OCR worker pool
+    api.ocr_dispatcher.shutdown()
 
 if __name__ == '__main__':
+    # Consolidated export builds sheets in worker processes (frozen exe support)
+    multiprocessing.freeze_support()
     main()
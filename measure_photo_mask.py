@@ -0,0 +1,103 @@
+"""
+Photo Mask Measurement
+Renders pages with and without the per-cell photo mask, then reports the
+upload bytes saved and any change in parsed OCR output. Use it to pick a
+template's photo_excl_width / photo_excl_top before enabling masking.
+
+Usage:
+    python measure_photo_mask.py wardwise samples/WardWiseData/FinalList_Ward_3.pdf 3 4 --width 330
+    python measure_photo_mask.py wardwise samples/WardWiseData/FinalList_Ward_3.pdf 3 --width 330 --preview
+        # also saves temp/mask_preview_p3.png to check the masked area by eye
+"""
+import argparse
+import os
+
+import fitz  # PyMuPDF
+
+from backend.api import load_template
+from backend.ocr_engine import OCREngine
+from backend.parser import to_relative_template, REFERENCE_PAGE_W
+from backend.renderer import rasterize_page, encode_raster
+from benchmark_encoding import ocr_voters, FIELDS
+
+
+def compare_voters(before, after):
+    """Return (lost, gained, changed_fields) between two parses, matched by EPIC"""
+    before_by_epic = {v['epic']: v for v in before}
+    after_by_epic = {v['epic']: v for v in after}
+    lost = sorted(set(before_by_epic) - set(after_by_epic))
+    gained = sorted(set(after_by_epic) - set(before_by_epic))
+    changed = []
+    for epic in set(before_by_epic) & set(after_by_epic):
+        for f in FIELDS:
+            if before_by_epic[epic].get(f, '') != after_by_epic[epic].get(f, ''):
+                changed.append((epic, f, before_by_epic[epic].get(f, ''), after_by_epic[epic].get(f, '')))
+    return lost, gained, changed
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('template')
+    ap.add_argument('pdf')
+    ap.add_argument('pages', nargs='+', type=int)
+    ap.add_argument('--width', type=float, help='photo_excl_width in 300 DPI px (default: template value)')
+    ap.add_argument('--top', type=float, help='photo_excl_top: fraction of cell height kept above the photo')
+    ap.add_argument('--bottom', type=float, help='photo_excl_bottom: fraction kept below the photo')
+    ap.add_argument('--preview', action='store_true', help='save masked page images to temp/')
+    ap.add_argument('--no-ocr', action='store_true', help='measure bytes only')
+    args = ap.parse_args()
+
+    template = to_relative_template(load_template(args.template))
+    if args.width is not None:
+        template['photo_excl_width'] = args.width / REFERENCE_PAGE_W
+    if args.top is not None:
+        template['photo_excl_top'] = args.top
+    if args.bottom is not None:
+        template['photo_excl_bottom'] = args.bottom
+    if template.get('photo_excl_width', 0) <= 0:
+        print("❌ Template has no photo_excl_width - pass --width")
+        return
+
+    ocr = None if args.no_ocr else OCREngine()
+    doc = fitz.open(args.pdf)
+    total_plain = total_masked = 0
+    total_lost = total_gained = total_changed = 0
+
+    for page_no in args.pages:
+        page = doc[page_no - 1]
+        plain = encode_raster(rasterize_page(page, template, mask_photos=False), template.get('encoding_profile'))
+        raster = rasterize_page(page, template)
+        if args.preview:
+            os.makedirs('temp', exist_ok=True)
+            raster['pix'].save(os.path.join('temp', f'mask_preview_p{page_no}.png'))
+        masked = encode_raster(raster, template.get('encoding_profile'))
+
+        plain_kb, masked_kb = len(plain['content']) / 1024, len(masked['content']) / 1024
+        total_plain += len(plain['content'])
+        total_masked += len(masked['content'])
+        print(f"📃 Page {page_no}: {plain_kb:.0f} KB → {masked_kb:.0f} KB "
+              f"({(1 - masked_kb / plain_kb) * 100:.1f}% saved, {raster['masked_cells']} cells masked)")
+
+        if ocr:
+            before = ocr_voters(ocr, plain) or []
+            after = ocr_voters(ocr, masked) or []
+            lost, gained, changed = compare_voters(before, after)
+            total_lost += len(lost)
+            total_gained += len(gained)
+            total_changed += len(changed)
+            print(f"   voters: {len(before)} → {len(after)} | lost {len(lost)} | gained {len(gained)} | changed fields {len(changed)}")
+            for epic in lost:
+                print(f"   ❌ lost {epic}")
+            for epic, field, old, new in changed[:20]:
+                print(f"   ⚠️ {epic} {field}: '{old}' → '{new}'")
+    doc.close()
+
+    if total_plain:
+        print(f"\n📊 Total: {total_plain / 1024:.0f} KB → {total_masked / 1024:.0f} KB "
+              f"({(1 - total_masked / total_plain) * 100:.1f}% saved)")
+    if ocr:
+        print(f"📊 OCR impact: lost {total_lost} voters, gained {total_gained}, {total_changed} changed fields")
+
+
+if __name__ == '__main__':
+    main()
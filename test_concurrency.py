@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Offline test: AIMD adaptive OCR concurrency (no Vision API calls)
+"""
+
+import os
+import sys
+import threading
+import time
+sys.path.insert(0, os.path.dirname(__file__))
+
+from backend.concurrency import AdaptiveConcurrency
+
+
+def report(label, passed):
+    print(f"   {'✅' if passed else '❌'} {label}")
+    return passed
+
+
+def test_additive_increase():
+    """Healthy calls grow the limit by about one per `limit` calls, up to maximum"""
+    print("📈 Additive increase")
+    controller = AdaptiveConcurrency(initial=2, maximum=4, latency_target=8.0)
+    for _ in range(3):
+        controller.on_success(1.0)
+    results = [report(f"Limit 2 -> {controller.current_limit} after three healthy calls",
+                      controller.current_limit == 3)]
+    for _ in range(100):
+        controller.on_success(1.0)
+    results.append(report(f"Limit capped at maximum ({controller.current_limit})", controller.current_limit == 4))
+    events = [h['event'] for h in controller.snapshot()['history']]
+    results.append(report("Increases recorded in history", events.count('increase') == 2))
+    return all(results)
+
+
+def test_multiplicative_decrease():
+    """Throttles and slow calls halve the limit, once per cooldown"""
+    print("\n📉 Multiplicative decrease")
+    controller = AdaptiveConcurrency(initial=8, minimum=1, maximum=8, cooldown=0.2)
+    controller.on_throttle('429')
+    results = [report(f"Throttle halves the limit (8 -> {controller.current_limit})", controller.current_limit == 4)]
+    controller.on_throttle('429')
+    results.append(report("A second throttle inside the cooldown is ignored",
+                          controller.current_limit == 4 and controller.throttles == 2))
+    time.sleep(0.25)
+    controller.on_success(30.0)
+    results.append(report(f"Latency over target cuts after the cooldown (-> {controller.current_limit})",
+                          controller.current_limit == 2))
+    for _ in range(5):
+        time.sleep(0.21)
+        controller.on_throttle('503')
+    results.append(report("Never drops below minimum", controller.current_limit == 1))
+    return all(results)
+
+
+def test_slots():
+    """acquire() blocks at the limit; release() and increases wake waiters"""
+    print("\n🎟️ Slots")
+    controller = AdaptiveConcurrency(initial=2, maximum=4)
+    controller.acquire()
+    controller.acquire()
+    acquired = threading.Event()
+
+    def third():
+        controller.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=third, daemon=True)
+    thread.start()
+    results = [report("Third acquire blocks at limit 2", not acquired.wait(0.2))]
+    controller.release()
+    results.append(report("release() lets it through", acquired.wait(1.0)))
+
+    acquired.clear()
+    thread = threading.Thread(target=third, daemon=True)
+    thread.start()
+    blocked = not acquired.wait(0.2)
+    for _ in range(3):
+        controller.on_success(1.0)
+    results.append(report("A limit increase wakes a blocked acquire", blocked and acquired.wait(1.0)))
+    snapshot = controller.snapshot()
+    results.append(report(f"Snapshot in_flight {snapshot['in_flight']} / limit {snapshot['limit']}",
+                          snapshot['in_flight'] == 3 and snapshot['limit'] == 3))
+    return all(results)
+
+
+if __name__ == '__main__':
+    passed = [test_additive_increase(), test_multiplicative_decrease(), test_slots()]
+    print("\n" + "=" * 60)
+    if all(passed):
+        print("🎉 Adaptive concurrency test PASSED!")
+    else:
+        print("❌ Adaptive concurrency test FAILED!")
+        sys.exit(1)
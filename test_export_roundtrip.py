@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Offline test: export -> import -> export gives the same file, for every
+template and for .xlsx, .jsonl and consolidated workbooks (no OCR)
+"""
+
+import os
+import sys
+import tempfile
+from collections import Counter
+sys.path.insert(0, os.path.dirname(__file__))
+
+from openpyxl import load_workbook
+
+from backend.consolidated_export import export_consolidated
+from backend.excel_export import export_to_excel
+from backend.flat_export import export_voters
+from backend.session_import import import_export_file
+
+# Sample page headers in each template's layout
+HEADERS = {
+    'boothwise': 'मतदान केंद्र : १ पेपर मिल\nपरिषद नगर बल्लारपूर\nप्रभाग क्र : १ - प्रभाग क्र . १\n'
+                 'यादी भाग क्र . १६२ : ४ - बिहारी किराणा जवळील',
+    'mahanagpalika': 'महानगरपालिका चंद्रपूर\nभानापेठ ११ – प्रभाग क्र : -\nयादी भाग क्र . १५८ : १ - जटपुरागेटरामाला मार्ग',
+    'wardwise': 'महानगरपालिका चंद्रपूर\nभानापेठ ११ – प्रभाग क्र : -\nयादी भाग क्र . १५८ : १ - जटपुरागेटरामाला मार्ग',
+    'zp_boothwise': 'परिषद जिल्हा चंद्रपुर\nमारोडा - निवार्चन निवडणूक विभाग : राजोली - गण ३३\n'
+                    'कोळसा : १ - भाग क्र . ६ यादी\nकोळसा नविन : १ मतदान केंद्र कोळसा , जि.प.प्रा.शाळा पत्ता :',
+    'boothlist_division': 'परिषद जिल्हा चंद्रपुर\nमारोडा - निवार्चन निवडणूक विभाग : राजोली - गण ३३\n'
+                          'कोळसा : १ - भाग क्र . ६ यादी\nकोळसा नविन : १ मतदान केंद्र कोळसा , जि.प.प्रा.शाळा पत्ता :',
+    'ac_wise_low_quality': 'विधानसभा मतदारसंघ क्रमांक आणि नाव : 72-बल्लारपूर\nविभाग क्रमांक आणि नाव 1-पायली भटाळी\n'
+                           'यादी भाग क्रमांक : 12',
+    'default': 'Header',
+}
+
+
+def sample_voters(count, template):
+    return [{
+        'page_number': i // 30 + 1,
+        'extraction_order': i,
+        'epic': f'ABC{i:07d}',
+        'name_marathi': 'रमेश पाटील',
+        'name_english': 'Ramesh Patil',
+        'relation_type': 'Father',
+        'relation_name_marathi': 'सुरेश',
+        'relation_name_english': 'Suresh',
+        'house_no': str(i % 99),
+        'age': str(20 + i % 60),
+        'gender': 'M',
+        'part_no': '5',
+        'header_raw_text': HEADERS[template],
+    } for i in range(count)]
+
+
+def sheet_values(path):
+    wb = load_workbook(path, read_only=True)
+    try:
+        return {ws.title: list(ws.iter_rows(values_only=True)) for ws in wb.worksheets}
+    finally:
+        wb.close()
+
+
+def report(label, passed):
+    print(f"   {'✅' if passed else '❌'} {label}")
+    return passed
+
+
+def test_roundtrip(workdir):
+    """Every template survives xlsx and jsonl round trips unchanged"""
+    results = []
+    for template in HEADERS:
+        print(f"📐 {template}")
+        voters = sample_voters(75, template)
+        first, second = os.path.join(workdir, 'a.xlsx'), os.path.join(workdir, 'b.xlsx')
+        export_to_excel(voters, first, template)
+        imported, key = import_export_file(first, template)
+        export_to_excel(imported, second, key)
+        results.append(report(f"xlsx: {len(imported)} records, template '{key}', same cells",
+                              len(imported) == 75 and sheet_values(first) == sheet_values(second)))
+
+        first, second = os.path.join(workdir, 'a.jsonl'), os.path.join(workdir, 'b.jsonl')
+        export_voters(voters, first, template, 'jsonl')
+        imported, key = import_export_file(first, template)
+        export_voters(imported, second, key, 'jsonl')
+        with open(first, encoding='utf-8') as a, open(second, encoding='utf-8') as b:
+            same = a.read() == b.read()
+        results.append(report(f"jsonl: {len(imported)} records, template '{key}', same lines",
+                              len(imported) == 75 and same))
+    return all(results)
+
+
+def test_consolidated(workdir):
+    """Index sheet restores each row's source PDF across split sheets"""
+    print("\n📚 Consolidated workbook")
+    path = os.path.join(workdir, 'consolidated.xlsx')
+    groups = [('first.pdf', sample_voters(150, 'boothwise')), ('second.pdf', sample_voters(70, 'boothwise'))]
+    export_consolidated(groups, path, 'boothwise', max_rows=100)
+    imported, key = import_export_file(path)
+    sources = Counter(v['source_file'] for v in imported)
+    return report(f"{len(imported)} records, template '{key}', sources {dict(sources)}",
+                  key == 'boothwise' and sources == {'first.pdf': 150, 'second.pdf': 70})
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as workdir:
+        passed = [test_roundtrip(workdir), test_consolidated(workdir)]
+    print("\n" + "=" * 60)
+    if all(passed):
+        print("🎉 Export round-trip test PASSED!")
+    else:
+        print("❌ Export round-trip test FAILED!")
+        sys.exit(1)
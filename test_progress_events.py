@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Offline test: pushed progress events - sequence numbers, coalescing and
+throttling (a fake window collects the evaluate_js calls)
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+sys.path.insert(0, os.path.dirname(__file__))
+
+from backend.progress_events import JS_HANDLER, ProgressEvents
+
+
+class FakeWindow:
+    """Stands in for window.evaluate_js; decodes the pushed events"""
+
+    def __init__(self):
+        self.events = []
+        self.times = []
+        self.lock = threading.Lock()
+
+    def evaluate_js(self, script):
+        prefix = f"window.{JS_HANDLER} && window.{JS_HANDLER}("
+        assert script.startswith(prefix) and script.endswith(')')
+        with self.lock:
+            self.events.append(json.loads(script[len(prefix):-1]))
+            self.times.append(time.monotonic())
+
+
+def report(label, passed):
+    print(f"   {'✅' if passed else '❌'} {label}")
+    return passed
+
+
+def wait_for(predicate, timeout=3.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+def test_sequencing():
+    """Every message arrives once, in order, and each event chains to the last"""
+    print("🔢 Sequencing")
+    window = FakeWindow()
+    state = {'status': {'current': 0}}
+    events = ProgressEvents(lambda: dict(state), window.evaluate_js, max_rate=20)
+
+    for i in range(1, 101):
+        state = {'status': {'current': i}}
+        events.add(f"page {i}")
+        if i % 10 == 0:
+            time.sleep(0.03)
+    wait_for(lambda: window.events and window.events[-1]['seq'] == events.seq)
+
+    pushed = window.events
+    seqs = [seq for event in pushed for seq, _ in event['messages']]
+    chained = all(event['after'] == previous['seq'] for previous, event in zip(pushed, pushed[1:]))
+    results = [
+        report(f"{len(pushed)} events for 100 messages (coalesced)", 1 < len(pushed) < 100),
+        report("Messages delivered once each, in order", seqs == list(range(1, 101))),
+        report("Each event's 'after' is the previous event's 'seq'", pushed[0]['after'] == 0 and chained),
+        report("Last event carries the final section state", pushed[-1].get('status') == {'current': 100}),
+        report("messages(since) resumes after a given seq", [s for s, _ in events.messages(since=95)] == [96, 97, 98, 99, 100]),
+    ]
+
+    before = len(window.events)
+    events.notify()
+    time.sleep(0.3)
+    results.append(report("No event when nothing changed", len(window.events) == before))
+    return all(results)
+
+
+def test_changed_sections_only():
+    """An event carries only the sections that changed"""
+    print("\n🧩 Changed sections")
+    window = FakeWindow()
+    state = {'status': {'current': 1}, 'export': {'status': 'idle'}}
+    events = ProgressEvents(lambda: dict(state), window.evaluate_js, max_rate=20)
+    events.notify()
+    wait_for(lambda: len(window.events) == 1)
+    state = {'status': {'current': 1}, 'export': {'status': 'running'}}
+    events.notify()
+    wait_for(lambda: len(window.events) == 2)
+    first, second = window.events[:2]
+    return all([
+        report("First event has every section", set(first) >= {'status', 'export'}),
+        report("Second event has only 'export'", 'export' in second and 'status' not in second),
+    ])
+
+
+def test_throttle():
+    """No more than max_rate events per second, however many updates arrive"""
+    print("\n⏱️ Throttle")
+    window = FakeWindow()
+    counter = {'value': 0}
+    events = ProgressEvents(lambda: {'status': dict(counter)}, window.evaluate_js, max_rate=5)
+    end = time.monotonic() + 1.2
+    while time.monotonic() < end:
+        counter['value'] += 1
+        events.notify()
+        time.sleep(0.005)
+    wait_for(lambda: window.events and window.events[-1]['status']['value'] == counter['value'])
+    gaps = [b - a for a, b in zip(window.times, window.times[1:])]
+    return all([
+        report(f"{len(window.events)} events for {counter['value']} updates", len(window.events) <= 9),
+        report(f"Smallest gap {min(gaps):.3f}s (limit 0.200s)", min(gaps) >= 0.19),
+        report("Final value delivered", window.events[-1]['status']['value'] == counter['value']),
+    ])
+
+
+if __name__ == '__main__':
+    passed = [test_sequencing(), test_changed_sections_only(), test_throttle()]
+    print("\n" + "=" * 60)
+    if all(passed):
+        print("🎉 Progress events test PASSED!")
+    else:
+        print("❌ Progress events test FAILED!")
+        sys.exit(1)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Offline test: OCR retry policy and circuit breaker (no Vision API calls)
+"""
+
+import os
+import sys
+import threading
+import time
+sys.path.insert(0, os.path.dirname(__file__))
+
+from google.api_core import exceptions as gexc
+
+from backend.retry import CircuitBreaker, OCRError, RetryPolicy
+
+
+def report(label, passed):
+    print(f"   {'✅' if passed else '❌'} {label}")
+    return passed
+
+
+def test_retry_policy():
+    """Retry classification and full-jitter backoff bounds"""
+    print("🔁 Retry policy")
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+    results = [
+        report("429 is retryable and a throttle",
+               policy.is_retryable(gexc.TooManyRequests('quota')) and policy.is_throttle(gexc.TooManyRequests('quota'))),
+        report("503 is retryable", policy.is_retryable(gexc.ServiceUnavailable('down'))),
+        report("504 is retryable but not a throttle",
+               policy.is_retryable(gexc.GatewayTimeout('slow')) and not policy.is_throttle(gexc.GatewayTimeout('slow'))),
+        report("400 is not retryable", not policy.is_retryable(gexc.InvalidArgument('bad image'))),
+        report("Backoff stays within 0..min(max_delay, base * 2^attempt)",
+               all(0 <= policy.backoff(attempt) <= min(5.0, 2 ** attempt)
+                   for attempt in range(6) for _ in range(200))),
+    ]
+    error = OCRError.from_exception(gexc.InvalidArgument('bad image'), retryable=False, attempts=0)
+    results.append(report("OCRError keeps the 'Error: ...' form",
+                          str(error).startswith('Error: ') and error.to_dict()['attempts'] == 0))
+    return all(results)
+
+
+def _tripped_breaker(cooldown=0.2):
+    breaker = CircuitBreaker(threshold=0.5, min_calls=2, window=30.0, cooldown=cooldown)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+
+def _start_waiters(breaker, count, timeout=3.0):
+    """Threads blocking in wait_until_closed; returns (threads, results)"""
+    results = []
+    lock = threading.Lock()
+
+    def wait():
+        passed = breaker.wait_until_closed(time.monotonic() + timeout)
+        with lock:
+            results.append(passed)
+
+    threads = [threading.Thread(target=wait) for _ in range(count)]
+    for t in threads:
+        t.start()
+    return threads, results
+
+
+def test_circuit_breaker():
+    """Tripping, a single half-open probe, closing and re-opening"""
+    print("\n🛑 Circuit breaker")
+    breaker = CircuitBreaker(threshold=0.5, min_calls=4, cooldown=0.2)
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    results = [report("Stays closed below min_calls", breaker.state == CircuitBreaker.CLOSED)]
+    breaker.record_failure()
+    results.append(report("Opens at the failure threshold", breaker.state == CircuitBreaker.OPEN))
+
+    # Half-open: exactly one waiter gets through, its success releases the rest
+    breaker = _tripped_breaker()
+    threads, passed = _start_waiters(breaker, 4)
+    time.sleep(0.5)
+    results.append(report(f"One probe after the cooldown (passed: {len(passed)}/4)",
+                          passed == [True] and breaker.state == CircuitBreaker.HALF_OPEN))
+    breaker.record_success()
+    for t in threads:
+        t.join(2)
+    results.append(report("Probe success closes the breaker and releases every waiter",
+                          breaker.state == CircuitBreaker.CLOSED and passed == [True] * 4))
+
+    # A failed probe re-opens it; waiters wait for the new cooldown
+    breaker = _tripped_breaker()
+    threads, passed = _start_waiters(breaker, 3)
+    time.sleep(0.3)
+    breaker.record_failure()
+    results.append(report("Probe failure re-opens the breaker",
+                          breaker.state == CircuitBreaker.OPEN and breaker.trips == 2 and len(passed) == 1))
+    time.sleep(0.3)
+    results.append(report("Next cooldown lets one new probe through", len(passed) == 2))
+    breaker.record_success()
+    for t in threads:
+        t.join(2)
+    results.append(report("All waiters released after the second probe succeeds", passed == [True] * 3))
+
+    # A probe that ends without a verdict hands the probe to another waiter
+    breaker = _tripped_breaker()
+    threads, passed = _start_waiters(breaker, 2)
+    time.sleep(0.3)
+    breaker.release_probe()
+    time.sleep(0.1)
+    results.append(report("release_probe() lets the next waiter probe",
+                          len(passed) == 2 and breaker.state == CircuitBreaker.HALF_OPEN))
+    for t in threads:
+        t.join(2)
+
+    # Deadline passes while open
+    breaker = _tripped_breaker(cooldown=5.0)
+    start = time.monotonic()
+    timed_out = not breaker.wait_until_closed(time.monotonic() + 0.2)
+    results.append(report("wait_until_closed gives up at the deadline",
+                          timed_out and time.monotonic() - start < 1.0))
+    return all(results)
+
+
+if __name__ == '__main__':
+    passed = [test_retry_policy(), test_circuit_breaker()]
+    print("\n" + "=" * 60)
+    if all(passed):
+        print("🎉 Retry / circuit breaker test PASSED!")
+    else:
+        print("❌ Retry / circuit breaker test FAILED!")
+        sys.exit(1)